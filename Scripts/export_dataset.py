@@ -0,0 +1,27 @@
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from pipeline.dataset import read_dataset, write_dataset
+from pipeline.stages import CSV_EXPORT_PATH, DATASET_PATH
+
+# Converts the processed dataset between formats, picked by file extension:
+# Parquet → CSV for export, or an existing CSV → Parquet (optionally partitioned)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert the processed dataset between Parquet and CSV")
+    parser.add_argument("--input", default=DATASET_PATH, help="Source dataset (.parquet file/directory or .csv)")
+    parser.add_argument("--output", default=CSV_EXPORT_PATH, help="Destination (.csv, or a Parquet path)")
+    parser.add_argument("--columns", default="", help="Comma-separated columns to keep (default: all)")
+    parser.add_argument("--partition-by", default="", help="Comma-separated columns to partition Parquet output by")
+    args = parser.parse_args()
+
+    columns = [name for name in args.columns.split(",") if name] or None
+    partition_cols = [name for name in args.partition_by.split(",") if name] or None
+
+    print(f"📂 Reading {args.input}...")
+    df = read_dataset(args.input, columns=columns)
+
+    print(f"💾 Writing {len(df)} rows x {len(df.columns)} columns to {args.output}...")
+    write_dataset(df, args.output, partition_cols=partition_cols)
+    print("✅ Done.")
@@ -0,0 +1,49 @@
+import argparse
+import json
+import os
+import sys
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from app.ranker import rank_posts_bulk
+
+# Nightly fan-out: rank one shared candidate pool for every simulated user,
+# a chunk of users per predict call, and write one JSON line per user
+LIST_COLUMNS = ["branches_of_interest", "tags_followed", "active_hours", "buddies"]
+
+def load_users(users_path):
+    users_df = pd.read_csv(users_path)
+    for col in LIST_COLUMNS:
+        users_df[col] = users_df[col].apply(json.loads)
+    return users_df
+
+def precompute_feeds(users_df, posts, output_path, top_k=None, chunk_size=500):
+    records = users_df.to_dict("records")
+    with open(output_path, "w") as f:
+        for start in range(0, len(records), chunk_size):
+            chunk = records[start:start + chunk_size]
+            requests = [
+                {"user_id": row["user_id"], "user_profile": {col: row[col] for col in LIST_COLUMNS}}
+                for row in chunk
+            ]
+            for result in rank_posts_bulk(requests, shared_posts=posts, top_k=top_k):
+                f.write(json.dumps(result) + "\n")
+            print(f"  → ranked {min(start + chunk_size, len(records))}/{len(records)} users")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute ranked feeds for all simulated users")
+    parser.add_argument("--posts", required=True, help="JSON file with the candidate posts list")
+    parser.add_argument("--users", default="data/intermediate/simulated_users.csv", help="Simulated users CSV")
+    parser.add_argument("--output", default="data/processed/precomputed_feeds.jsonl", help="Output JSONL path")
+    parser.add_argument("--top-k", type=int, default=None, help="Keep only the first K posts per user")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Users scored per predict call")
+    args = parser.parse_args()
+
+    print("📂 Loading users and candidate posts...")
+    users_df = load_users(args.users)
+    with open(args.posts) as f:
+        posts = json.load(f)
+
+    print(f"⚡ Ranking {len(posts)} posts for {len(users_df)} users...")
+    precompute_feeds(users_df, posts, args.output, top_k=args.top_k, chunk_size=args.chunk_size)
+    print(f"✅ Feeds saved to {args.output}")
@@ -0,0 +1,57 @@
+import argparse
+import json
+import os
+import shutil
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from pipeline.build import DEFAULT_CACHE_DIR, build_pipeline
+from pipeline.embeddings import DEFAULT_STORE_DIR
+from pipeline.stages import CSV_EXPORT_PATH, DATASET_PATH, RAW_POSTS_PATH, USERS_PATH, print_heuristics_report
+
+# Runs the whole feature-engineering chain (relevance score → ... → target
+# label → heuristic checks) as one DAG instead of the individual Scripts/.
+# Unchanged stages are read from the cache; the Parquet dataset is only
+# replaced once every stage has succeeded.
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the processed dataset with the stage pipeline")
+    parser.add_argument("--raw", default=RAW_POSTS_PATH, help="Raw posts Excel file")
+    parser.add_argument("--users", default=USERS_PATH, help="Simulated users CSV")
+    parser.add_argument("--output", default=DATASET_PATH, help="Output dataset (.parquet file or directory)")
+    parser.add_argument("--partition-by", default="", help="Comma-separated columns to partition the Parquet output by")
+    parser.add_argument("--csv", nargs="?", const=CSV_EXPORT_PATH, default=None, help="Also export a CSV copy")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="Stage output cache directory")
+    parser.add_argument("--no-cache", action="store_true", help="Run every stage and store nothing")
+    parser.add_argument("--embedding-dir", default=DEFAULT_STORE_DIR, help="Sentence embedding store directory")
+    parser.add_argument("--embedding-workers", type=int, default=1, help="Processes encoding sentence embeddings (1: in-process, 0: one per core)")
+    parser.add_argument("--clear-cache", action="store_true", help="Delete the cache directory first")
+    parser.add_argument("--workers", type=int, default=4, help="Stages run concurrently")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for the user/author assignment (also makes it cacheable)")
+    parser.add_argument("--force", default="", help="Comma-separated stages to re-run even if cached")
+    parser.add_argument("--targets", default="", help="Comma-separated stages to build (default: write,heuristics)")
+    args = parser.parse_args()
+
+    if args.clear_cache and os.path.isdir(args.cache_dir):
+        shutil.rmtree(args.cache_dir)
+        print(f"🧹 Cleared {args.cache_dir}")
+
+    pipeline = build_pipeline(
+        cache_dir=None if args.no_cache else args.cache_dir, max_workers=args.workers,
+        raw_path=args.raw, users_path=args.users, output_path=args.output, seed=args.seed,
+        partition_cols=[name for name in args.partition_by.split(",") if name] or None, csv_path=args.csv,
+        embedding_dir=args.embedding_dir, embedding_workers=args.embedding_workers,
+    )
+    targets = [name for name in args.targets.split(",") if name] or None
+    force = [name for name in args.force.split(",") if name]
+
+    print(f"⚙️ Running pipeline ({args.workers} workers, cache: {'off' if args.no_cache else args.cache_dir})...")
+    outputs = pipeline.run(targets=targets, force=force)
+
+    if "write" in outputs:
+        print(f"💾 {json.dumps(outputs['write'])}")
+    if "heuristics" in outputs:
+        print_heuristics_report(outputs["heuristics"])
+
+    ran = [row["stage"] for row in pipeline.report if row["status"] == "ran"]
+    cached = [row["stage"] for row in pipeline.report if row["status"] == "cached"]
+    print(f"\n✅ Pipeline done: {len(ran)} stage(s) ran, {len(cached)} from cache")
@@ -0,0 +1,185 @@
+import threading
+import numpy as np
+from .extract_features import parse_timestamps, get_post_hour_bucket
+from .profile import CompiledProfile
+
+# Content type encoding (used during training)
+content_type_map = {"video": 0.08, "image": 0.04, "text": 0.02}
+weekday_type_map = {"Weekday": 0, "Weekend": 1}
+time_period_map = {"Morning": 1, "Afternoon": 2, "Evening": 3, "Night": 2}
+karma_bucket_map = {"low": 0, "medium": 1, "high": 2}
+
+# Encoded "Time Periods" value for every hour of the day
+_hour_period_codes = np.array(
+    [time_period_map.get(get_post_hour_bucket(hour), 0) for hour in range(24)], dtype=np.float64
+)
+
+def encode_time_periods(hours):
+    # -1 marks an unparseable timestamp ("Unknown" bucket)
+    return np.where(hours >= 0, _hour_period_codes[np.clip(hours, 0, 23)], 0.0)
+
+def encode_weekday_type(weekdays):
+    return np.where(
+        weekdays >= 5, weekday_type_map["Weekend"],
+        np.where(weekdays >= 0, weekday_type_map["Weekday"], 0),
+    ).astype(np.float64)
+
+def encode_karma_bucket(karma):
+    return np.where(
+        karma <= 33, karma_bucket_map["low"],
+        np.where(karma <= 66, karma_bucket_map["medium"], karma_bucket_map["high"]),
+    ).astype(np.float64)
+
+class FeatureBuffer:
+    # Reusable per-thread feature matrix that grows to the largest batch seen,
+    # so the inference path does not allocate a new matrix on every request
+
+    def __init__(self, n_columns, dtype=np.float64, initial_rows=1024):
+        self.n_columns = n_columns
+        self.dtype = np.dtype(dtype)
+        self.initial_rows = initial_rows
+        self._local = threading.local()
+
+    def rows(self, n):
+        buf = getattr(self._local, "buf", None)
+        if buf is None or buf.shape[0] < n:
+            capacity = max(n, self.initial_rows, 0 if buf is None else 2 * buf.shape[0])
+            buf = np.empty((capacity, self.n_columns), dtype=self.dtype)
+            self._local.buf = buf
+        return buf[:n]
+
+# Columns that depend only on the post; the rest depend on the user profile
+POST_COLUMNS = ("karma", "Post Type", "Weekday Type", "Time Periods", "karma_bucket")
+USER_COLUMNS = ("time_match_score", "user_follows_tag", "is_buddy_post")
+
+class PostTable:
+    # Post-only features for a candidate pool, computed once and crossed with
+    # any number of profiles. Tags and authors are integer-coded so the
+    # per-user columns are plain array lookups.
+
+    def __init__(self, posts):
+        n = len(posts)
+        hours, minutes, weekdays = parse_timestamps([post.get("created_at", "") for post in posts])
+        self._set_post_columns(
+            [post["post_id"] for post in posts],
+            hours, minutes, weekdays,
+            np.array([post.get("karma", 0) for post in posts], dtype=np.float64),
+            np.array([content_type_map.get(post["content_type"], 0) for post in posts], dtype=np.float64),
+        )
+
+        self.tag_vocab = {}
+        post_tags = [post.get("tags", []) for post in posts]
+        counts = np.fromiter((len(tags) for tags in post_tags), dtype=np.int64, count=n)
+        self.tag_owners = np.repeat(np.arange(n), counts)
+        self.tag_codes = np.fromiter(
+            (self.tag_vocab.setdefault(tag, len(self.tag_vocab)) for tags in post_tags for tag in tags),
+            dtype=np.int64, count=int(counts.sum()),
+        )
+
+        self.author_vocab = {}
+        self.author_codes = np.fromiter(
+            (self.author_vocab.setdefault(post.get("author_id"), len(self.author_vocab)) for post in posts),
+            dtype=np.int64, count=n,
+        )
+
+    @classmethod
+    def from_columns(cls, post_ids, author_ids, karma, created_at, content_types, content_type_codes,
+                     tags, tag_codes, tag_offsets):
+        # Builds the table from columnar, dictionary-encoded input (see app.wire):
+        # created_at is epoch seconds (UTC), content types and tags are integer
+        # codes into their dictionaries, and post i owns tag_codes[tag_offsets[i]:tag_offsets[i + 1]]
+        table = cls.__new__(cls)
+        n = len(post_ids)
+
+        created_at = np.asarray(created_at, dtype=np.int64)
+        days, seconds = np.divmod(created_at, 86400)
+        hours = seconds // 3600
+        minutes = (seconds % 3600) // 60
+        weekdays = (days + 3) % 7  # 1970-01-01 was a Thursday
+
+        post_type_lookup = np.array([content_type_map.get(c, 0) for c in content_types] or [0], dtype=np.float64)
+        table._set_post_columns(
+            list(post_ids), hours, minutes, weekdays,
+            np.asarray(karma, dtype=np.float64),
+            post_type_lookup[np.asarray(content_type_codes, dtype=np.int64)],
+        )
+
+        # Duplicate dictionary entries collapse onto one vocabulary code
+        table.tag_vocab = {}
+        remap = np.array([table.tag_vocab.setdefault(tag, len(table.tag_vocab)) for tag in tags] or [0], dtype=np.int64)
+        tag_offsets = np.asarray(tag_offsets, dtype=np.int64)
+        table.tag_codes = remap[np.asarray(tag_codes, dtype=np.int64)]
+        table.tag_owners = np.repeat(np.arange(n), np.diff(tag_offsets))
+
+        table.author_vocab = {}
+        table.author_codes = np.fromiter(
+            (table.author_vocab.setdefault(author, len(table.author_vocab)) for author in author_ids),
+            dtype=np.int64, count=n,
+        )
+        return table
+
+    def _set_post_columns(self, post_ids, hours, minutes, weekdays, karma, post_type):
+        self.post_ids = post_ids
+        self.index = {post_id: i for i, post_id in enumerate(post_ids)}
+        self.parsed = hours >= 0
+        self.minute_of_day = np.clip(hours * 60 + minutes, 0, 1439)
+        self.columns = {
+            "karma": karma,
+            "Post Type": post_type,
+            "Weekday Type": encode_weekday_type(weekdays),
+            "Time Periods": encode_time_periods(hours),
+            "karma_bucket": encode_karma_bucket(karma),
+        }
+
+    def __len__(self):
+        return len(self.post_ids)
+
+    def user_columns(self, profile):
+        n = len(self.post_ids)
+
+        followed = np.zeros(len(self.tag_vocab), dtype=bool)
+        followed[[self.tag_vocab[tag] for tag in profile.tags_followed if tag in self.tag_vocab]] = True
+        hits = self.tag_owners[followed[self.tag_codes]]
+
+        buddies = np.zeros(len(self.author_vocab), dtype=bool)
+        buddies[[self.author_vocab[b] for b in profile.buddies if b in self.author_vocab]] = True
+
+        return {
+            "time_match_score": np.where(self.parsed, profile.time_match_lut[self.minute_of_day], 0.0),
+            "user_follows_tag": np.bincount(hits, minlength=n) > 0,
+            "is_buddy_post": buddies[self.author_codes],
+        }
+
+def _as_compiled(user_profile):
+    return user_profile if isinstance(user_profile, CompiledProfile) else CompiledProfile(user_profile)
+
+def cross_features(table, user_profiles, columns, out=None):
+    # Feature matrix for every (profile, post) pair, profile-major: rows
+    # [u * P, (u + 1) * P) belong to user_profiles[u]. Post-only columns are
+    # broadcast from the table; only the user columns are computed per profile.
+    n_users, n_posts = len(user_profiles), len(table)
+    if out is None:
+        out = np.empty((n_users * n_posts, len(columns)), dtype=np.float64)
+    elif not out.flags.c_contiguous:
+        raise ValueError("out must be C-contiguous so it can be filled as a (users, posts, columns) view")
+    cube = out.reshape(n_users, n_posts, len(columns))
+
+    for j, column in enumerate(columns):
+        if column in table.columns:
+            cube[:, :, j] = table.columns[column][None, :]
+        elif column not in USER_COLUMNS:
+            raise KeyError(column)
+
+    user_positions = [(j, column) for j, column in enumerate(columns) if column in USER_COLUMNS]
+    for u, user_profile in enumerate(user_profiles):
+        features = table.user_columns(_as_compiled(user_profile))
+        for j, column in user_positions:
+            cube[u, :, j] = features[column]
+    return out
+
+def extract_feature_matrix(posts, user_profile, columns, out=None):
+    # Columnar equivalent of extract_features + the ranker encoding maps,
+    # returning a matrix with one row per post in `columns` order.
+    # user_profile may be a raw dict or a CompiledProfile; `out` is filled in
+    # place when given (e.g. a FeatureBuffer view), otherwise float64 is allocated
+    return cross_features(PostTable(posts), [user_profile], columns, out=out)
@@ -0,0 +1,122 @@
+import asyncio
+import threading
+import time
+import numpy as np
+
+
+class _PendingRequest:
+    __slots__ = ("X", "future", "enqueued_at")
+
+    def __init__(self, X, future):
+        self.X = X
+        self.future = future
+        self.enqueued_at = time.perf_counter()
+
+
+class MicroBatcher:
+    # Collects feature matrices from concurrent requests for up to max_wait_ms
+    # (or until max_batch_rows rows are queued), scores them with a single
+    # score_fn call on a worker thread and hands each request its own slice back
+
+    def __init__(self, score_fn, max_wait_ms=2.0, max_batch_rows=4096):
+        self.score_fn = score_fn
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_batch_rows = max_batch_rows
+        self._loop = None
+        self._queue = None
+        self._worker = None
+        self._lock = threading.Lock()
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self.batches = 0
+        self.requests = 0
+        self.rows = 0
+        self.max_rows_seen = 0
+        self.queue_time_total = 0.0
+        self.queue_time_max = 0.0
+
+    def _ensure_worker(self):
+        # The worker is bound to the running loop; a new loop (e.g. a new
+        # TestClient or server restart) gets a fresh queue and worker task
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+
+    async def submit(self, X):
+        if len(X) == 0:
+            return np.zeros(0, dtype=np.float64)
+        self._ensure_worker()
+        future = self._loop.create_future()
+        await self._queue.put(_PendingRequest(X, future))
+        return await future
+
+    async def _run(self):
+        carry = None
+        while True:
+            first = carry if carry is not None else await self._queue.get()
+            carry = None
+            batch = [first]
+            rows = len(first.X)
+            deadline = self._loop.time() + self.max_wait
+
+            while rows < self.max_batch_rows:
+                timeout = deadline - self._loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if rows + len(item.X) > self.max_batch_rows:
+                    carry = item
+                    break
+                batch.append(item)
+                rows += len(item.X)
+
+            await self._flush(batch, rows)
+
+    async def _flush(self, batch, rows):
+        started = time.perf_counter()
+        X = batch[0].X if len(batch) == 1 else np.concatenate([item.X for item in batch])
+        try:
+            scores = await asyncio.to_thread(self.score_fn, X)
+        except Exception as e:
+            for item in batch:
+                if not item.future.done():
+                    item.future.set_exception(e)
+            return
+
+        offset = 0
+        for item in batch:
+            n = len(item.X)
+            if not item.future.done():
+                item.future.set_result(scores[offset:offset + n])
+            offset += n
+
+        with self._lock:
+            self.batches += 1
+            self.requests += len(batch)
+            self.rows += rows
+            self.max_rows_seen = max(self.max_rows_seen, rows)
+            for item in batch:
+                waited = started - item.enqueued_at
+                self.queue_time_total += waited
+                self.queue_time_max = max(self.queue_time_max, waited)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "max_wait_ms": self.max_wait * 1000.0,
+                "max_batch_rows": self.max_batch_rows,
+                "batches": self.batches,
+                "requests": self.requests,
+                "rows": self.rows,
+                "avg_batch_rows": round(self.rows / self.batches, 2) if self.batches else 0.0,
+                "avg_batch_requests": round(self.requests / self.batches, 2) if self.batches else 0.0,
+                "max_batch_rows_seen": self.max_rows_seen,
+                "avg_queue_ms": round(1000.0 * self.queue_time_total / self.requests, 3) if self.requests else 0.0,
+                "max_queue_ms": round(1000.0 * self.queue_time_max, 3),
+            }
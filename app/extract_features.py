@@ -1,4 +1,6 @@
 from datetime import datetime
+import numpy as np
+from . import time_match
 
 def parse_hour_minute(timestamp):
     try:
@@ -10,32 +12,20 @@ def parse_hour_minute(timestamp):
 def time_to_minutes(hour, minute):
     return hour * 60 + minute
 
-def compute_time_match_score(post_hour, post_minute, active_ranges):
-    post_minutes = time_to_minutes(post_hour, post_minute)
-    min_distance = float("inf")
-
-    for time_range in active_ranges:
-        try:
-            start_str, end_str = time_range.split("-")
-            start_hour, start_minute = map(int, start_str.split(":"))
-            end_hour, end_minute = map(int, end_str.split(":"))
-            start_minutes = time_to_minutes(start_hour, start_minute)
-            end_minutes = time_to_minutes(end_hour, end_minute)
-        except ValueError:
-            continue
-
-        if start_minutes <= end_minutes:
-            if start_minutes <= post_minutes <= end_minutes:
-                return 1.0
-        else:
-            if post_minutes >= start_minutes or post_minutes <= end_minutes:
-                return 1.0
+def parse_active_ranges(active_ranges):
+    # Lenient parsing for request profiles: malformed ranges are skipped
+    return time_match.parse_active_ranges(active_ranges, strict=False)
 
-        distance_to_start = min(abs(post_minutes - start_minutes), 1440 - abs(post_minutes - start_minutes))
-        distance_to_end = min(abs(post_minutes - end_minutes), 1440 - abs(post_minutes - end_minutes))
-        min_distance = min(min_distance, distance_to_start, distance_to_end)
+def compute_time_match_score(post_hour, post_minute, active_ranges):
+    intervals = parse_active_ranges(active_ranges)
+    starts = [start for start, _ in intervals]
+    ends = [end for _, end in intervals]
+    return float(time_match.time_match_scores([time_to_minutes(post_hour, post_minute)], starts, ends)[0])
 
-    return round(max(0.0, 1 - (min_distance / 600)), 2)
+def compute_time_match_scores(post_minutes, intervals):
+    # Scores of an array of post minutes-of-day against one profile's intervals
+    bounds = np.asarray(intervals, dtype=np.int64).reshape(-1, 2)
+    return time_match.time_match_scores(post_minutes, bounds[:, 0], bounds[:, 1])
 
 def get_post_hour_bucket(hour):
     if 5 <= hour < 12:
@@ -61,13 +51,87 @@ def get_karma_bucket(karma):
     else:
         return "high"
 
+# Fixed-width "%Y-%m-%dT%H:%M:%SZ" layout used by the vectorized parser
+_TIMESTAMP_LENGTH = 20
+_DIGIT_POSITIONS = [0, 1, 2, 3, 5, 6, 8, 9, 11, 12, 14, 15, 17, 18]
+_SEPARATORS = {4: "-", 7: "-", 10: "T", 13: ":", 16: ":", 19: "Z"}
+_DAYS_IN_MONTH = np.array([0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31], dtype=np.int64)
+
+def _two_digits(chars, pos):
+    return chars[:, pos] * 10 + chars[:, pos + 1]
+
+def parse_timestamps(timestamps):
+    # Vectorized parse_hour_minute: returns hour, minute, weekday arrays (-1 where unparseable).
+    # Canonical fixed-width strings are decoded as a byte matrix; anything else falls back
+    # to parse_hour_minute so strptime's leniency is preserved exactly.
+    n = len(timestamps)
+    hours = np.full(n, -1, dtype=np.int64)
+    minutes = np.full(n, -1, dtype=np.int64)
+    weekdays = np.full(n, -1, dtype=np.int64)
+
+    fast_idx = np.array([
+        i for i, ts in enumerate(timestamps)
+        if isinstance(ts, str) and len(ts) == _TIMESTAMP_LENGTH and ts.isascii()
+    ], dtype=np.int64)
+    ok = np.zeros(len(fast_idx), dtype=bool)
+
+    if len(fast_idx):
+        raw = "".join(timestamps[i] for i in fast_idx).encode("ascii")
+        chars = np.frombuffer(raw, dtype=np.uint8).reshape(-1, _TIMESTAMP_LENGTH).astype(np.int64)
+        ok = np.ones(len(fast_idx), dtype=bool)
+        for pos, sep in _SEPARATORS.items():
+            ok &= chars[:, pos] == ord(sep)
+        chars = chars - ord("0")
+        ok &= ((chars[:, _DIGIT_POSITIONS] >= 0) & (chars[:, _DIGIT_POSITIONS] <= 9)).all(axis=1)
+
+        year = _two_digits(chars, 0) * 100 + _two_digits(chars, 2)
+        month = _two_digits(chars, 5)
+        day = _two_digits(chars, 8)
+        hour = _two_digits(chars, 11)
+        minute = _two_digits(chars, 14)
+        second = _two_digits(chars, 17)
+
+        leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+        month_days = _DAYS_IN_MONTH[np.clip(month, 0, 12)] + ((month == 2) & leap)
+        ok &= (year >= 1) & (month >= 1) & (month <= 12) & (day >= 1) & (day <= month_days)
+        ok &= (hour <= 23) & (minute <= 59) & (second <= 59)
+
+        # Days since 1970-01-01 (a Thursday) via the civil-from-days algorithm
+        y = year - (month <= 2)
+        era = y // 400
+        yoe = y - era * 400
+        doy = (153 * ((month + 9) % 12) + 2) // 5 + day - 1
+        doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+        days = era * 146097 + doe - 719468
+
+        good = fast_idx[ok]
+        hours[good] = hour[ok]
+        minutes[good] = minute[ok]
+        weekdays[good] = (days[ok] + 3) % 7
+
+    slow = np.ones(n, dtype=bool)
+    slow[fast_idx[ok]] = False
+    for i in np.flatnonzero(slow):
+        hour, minute, dt = parse_hour_minute(timestamps[i])
+        if hour != -1:
+            hours[i], minutes[i], weekdays[i] = hour, minute, dt.weekday()
+
+    return hours, minutes, weekdays
+
 def safe_div(numerator, denominator):
     return numerator / denominator if denominator != 0 else 0.0
 
 def extract_features(post, user_profile):
-    user_followed_tags = user_profile.get("tags_followed", [])
-    buddies = user_profile.get("buddies", [])
-    active_hours = user_profile.get("active_hours", [])
+    # user_profile is either a raw dict or an app.profile.CompiledProfile,
+    # which carries frozensets and a minute-of-day time match lookup table
+    compiled = not isinstance(user_profile, dict)
+    if compiled:
+        user_followed_tags = user_profile.tags_followed
+        buddies = user_profile.buddies
+    else:
+        user_followed_tags = user_profile.get("tags_followed", [])
+        buddies = user_profile.get("buddies", [])
+        active_hours = user_profile.get("active_hours", [])
 
     post_tags = post.get("tags", [])
     author_id = post.get("author_id")
@@ -77,7 +141,10 @@ def extract_features(post, user_profile):
     # Time features
     post_hour, post_minute, dt = parse_hour_minute(post.get("created_at", ""))
     if post_hour != -1:
-        time_match_score = compute_time_match_score(post_hour, post_minute, active_hours)
+        if compiled:
+            time_match_score = user_profile.time_match_score(post_hour, post_minute)
+        else:
+            time_match_score = compute_time_match_score(post_hour, post_minute, active_hours)
         post_hour_bucket = get_post_hour_bucket(post_hour)
         time_periods = get_time_periods(dt)
     else:
@@ -0,0 +1,127 @@
+import threading
+import time
+from bisect import bisect_left
+
+# Latency buckets in seconds and size buckets in posts, Prometheus-style upper bounds
+STAGE_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+SIZE_BUCKETS = (1, 10, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 50000)
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class _StageTimer:
+    __slots__ = ("metrics", "stage", "started")
+
+    def __init__(self, metrics, stage):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe_stage(self.stage, time.perf_counter() - self.started)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class Metrics:
+    # In-process request metrics for the ranking hot path, rendered in the
+    # Prometheus text format. When disabled every call is a flag check that
+    # returns immediately (stage() hands back a shared no-op context manager).
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.stages = {}    # stage -> Histogram of seconds
+        self.statuses = {}  # ranking status -> count
+        self.feed_sizes = Histogram(SIZE_BUCKETS)
+
+    def stage(self, name):
+        if not self.enabled:
+            return _NULL_TIMER
+        return _StageTimer(self, name)
+
+    def observe_stage(self, name, seconds):
+        with self._lock:
+            histogram = self.stages.get(name)
+            if histogram is None:
+                histogram = self.stages[name] = Histogram(STAGE_BUCKETS)
+            histogram.observe(seconds)
+
+    def observe_result(self, status, n_posts):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+            self.feed_sizes.observe(n_posts)
+
+    def reset(self):
+        with self._lock:
+            self.stages = {}
+            self.statuses = {}
+            self.feed_sizes = Histogram(SIZE_BUCKETS)
+
+    def render(self, gauges=()):
+        # gauges: (name, help, value) triples from other components, e.g. cache sizes
+        lines = []
+        with self._lock:
+            if self.stages:
+                lines += ["# HELP feed_stage_seconds Time spent per ranking stage.", "# TYPE feed_stage_seconds histogram"]
+                for name in sorted(self.stages):
+                    lines += _histogram_lines("feed_stage_seconds", self.stages[name], f'stage="{name}"')
+            lines += ["# HELP feed_rank_status_total Ranked feeds by result status.", "# TYPE feed_rank_status_total counter"]
+            for status in sorted(self.statuses):
+                lines.append(f'feed_rank_status_total{{status="{status}"}} {self.statuses[status]}')
+            lines += ["# HELP feed_request_posts Candidate posts per ranked feed.", "# TYPE feed_request_posts histogram"]
+            lines += _histogram_lines("feed_request_posts", self.feed_sizes, "")
+
+        for name, help_text, value in gauges:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name} {_format(value)}"]
+        return "\n".join(lines) + "\n"
+
+
+def _format(value):
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _histogram_lines(name, histogram, labels):
+    prefix = labels + "," if labels else ""
+    lines = []
+    cumulative = 0
+    for bound, count in zip(histogram.buckets, histogram.counts):
+        cumulative += count
+        lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+    lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {histogram.count}')
+    suffix = f"{{{labels}}}" if labels else ""
+    lines.append(f"{name}_sum{suffix} {_format(histogram.sum)}")
+    lines.append(f"{name}_count{suffix} {histogram.count}")
+    return lines
@@ -0,0 +1,182 @@
+import hashlib
+import os
+import threading
+import time
+import numpy as np
+from .tree_scorer import CompiledTreeEnsemble, compile_booster, resolve_engine
+
+
+def validate_model_columns(booster, model_columns, expected_columns):
+    # Checked once at load so the hot path can feed raw arrays without column names.
+    # LightGBM stores feature names with spaces replaced by underscores.
+    if list(model_columns) != list(expected_columns):
+        raise ValueError(f"Model was trained on columns {list(model_columns)}, config expects {list(expected_columns)}")
+    booster_columns = booster.feature_name()
+    if booster_columns != [column.replace(" ", "_") for column in expected_columns]:
+        raise ValueError(f"Booster feature order {booster_columns} does not match config feature_columns")
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class LoadedModel:
+    # One immutable model version; requests hold a reference for their whole
+    # scoring call, so a swap never affects a request already in flight
+    __slots__ = ("model", "booster", "predict", "path", "mtime", "sha256", "loaded_at", "load_seconds")
+
+    def __init__(self, model, booster, predict, path, mtime, sha256, load_seconds):
+        self.model = model
+        self.booster = booster
+        self.predict = predict
+        self.path = path
+        self.mtime = mtime
+        self.sha256 = sha256
+        self.loaded_at = time.time()
+        self.load_seconds = load_seconds
+
+
+class ModelRegistry:
+    # Loads the model lazily on first use (or in a background warm-up thread),
+    # and optionally polls the model file to hot-swap a new version
+
+    def __init__(self, model_path, model_type, expected_columns, compiled_engine="auto", poll_seconds=None,
+                 shared_dir=None):
+        self.model_path = model_path
+        self.model_type = model_type
+        self.expected_columns = list(expected_columns)
+        self.compiled_engine = compiled_engine
+        self.poll_seconds = poll_seconds
+        # Compiled model types can be served from flat arrays exported under
+        # shared_dir and memory-mapped read-only by every worker process
+        self.shared_dir = shared_dir if model_type.endswith("_compiled") else None
+        self._current = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher = None
+        self._created_at = time.perf_counter()
+        self.cold_start_seconds = None
+        self.reloads = 0
+        self.reload_failures = 0
+        self.last_error = None
+
+    def _unpickle(self):
+        # joblib (and lightgbm through unpickling) are only imported when a model is actually needed
+        import joblib
+
+        try:
+            model, model_columns = joblib.load(self.model_path)
+        except Exception as e:
+            print(f"❌ Failed to load model from {self.model_path}")
+            raise e
+        validate_model_columns(model.booster_, model_columns, self.expected_columns)
+        return model
+
+    def export_dir(self, sha256):
+        return os.path.join(self.shared_dir, sha256[:16])
+
+    def _load_shared(self, sha256):
+        # Export once (whichever process gets there first), then map read-only;
+        # workers that find an export never unpickle the model or import lightgbm
+        directory = self.export_dir(sha256)
+        if not os.path.isdir(directory):
+            model = self._unpickle()
+            os.makedirs(self.shared_dir, exist_ok=True)
+            compile_booster(model.booster_, engine="numpy").export(
+                directory, metadata={"model_columns": self.expected_columns, "source_sha256": sha256}
+            )
+        scorer = CompiledTreeEnsemble.load(directory, engine=resolve_engine(self.compiled_engine), mmap=True)
+        if scorer.metadata.get("model_columns") != self.expected_columns:
+            raise ValueError(f"Exported model at {directory} was built for columns {scorer.metadata.get('model_columns')}")
+        return scorer
+
+    def _load(self):
+        started = time.perf_counter()
+        mtime = os.path.getmtime(self.model_path)
+        sha256 = file_sha256(self.model_path)
+
+        if self.shared_dir:
+            model = booster = None
+            predict = self._load_shared(sha256).predict
+        else:
+            model = self._unpickle()
+            booster = model.booster_
+            # "<type>_compiled" model types score with the flat-array tree scorer instead of the booster
+            if self.model_type.endswith("_compiled"):
+                predict = compile_booster(booster, engine=self.compiled_engine).predict
+            else:
+                predict = booster.predict
+        predict(np.zeros((1, len(self.expected_columns))))  # warm up (numba JIT, thread pool) before serving
+
+        return LoadedModel(model, booster, predict, self.model_path, mtime, sha256, time.perf_counter() - started)
+
+    def get(self):
+        current = self._current
+        if current is not None:
+            return current
+        with self._lock:
+            if self._current is None:
+                self._current = self._load()
+                self.cold_start_seconds = time.perf_counter() - self._created_at
+            return self._current
+
+    def reload_if_changed(self):
+        # Cheap mtime check first; the content hash decides whether to swap
+        current = self._current
+        if current is None:
+            return False
+        try:
+            if os.path.getmtime(self.model_path) == current.mtime:
+                return False
+            if file_sha256(self.model_path) == current.sha256:
+                current.mtime = os.path.getmtime(self.model_path)
+                return False
+            new_model = self._load()
+        except Exception as e:
+            # Keep serving the current version if the new file is missing, partial or invalid
+            self.reload_failures += 1
+            self.last_error = repr(e)
+            return False
+        with self._lock:
+            self._current = new_model
+            self.reloads += 1
+        return True
+
+    def start_background(self, warm_up=True):
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+        self._stop.clear()
+        self._watcher = threading.Thread(target=self._background, args=(warm_up,), name="model-registry", daemon=True)
+        self._watcher.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _background(self, warm_up):
+        if warm_up:
+            try:
+                self.get()
+            except Exception as e:
+                self.last_error = repr(e)
+        while self.poll_seconds and not self._stop.wait(self.poll_seconds):
+            self.reload_if_changed()
+
+    def stats(self):
+        current = self._current
+        return {
+            "loaded": current is not None,
+            "model_type": self.model_type,
+            "model_path": self.model_path,
+            "shared_dir": self.export_dir(current.sha256) if current and self.shared_dir else None,
+            "sha256": current.sha256 if current else None,
+            "loaded_at": current.loaded_at if current else None,
+            "load_seconds": round(current.load_seconds, 4) if current else None,
+            "cold_start_seconds": round(self.cold_start_seconds, 4) if self.cold_start_seconds is not None else None,
+            "reloads": self.reloads,
+            "reload_failures": self.reload_failures,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,42 @@
+import hashlib
+import json
+import numpy as np
+from .extract_features import parse_active_ranges, compute_time_match_scores
+
+
+class CompiledProfile:
+    # User profile pre-parsed for feature extraction: set lookups for tags and
+    # buddies, and the time match score for every minute of the day
+    __slots__ = ("user_id", "profile_hash", "tags_followed", "buddies", "intervals", "time_match_lut")
+
+    def __init__(self, user_profile, user_id=None, profile_hash=None):
+        self.user_id = user_id
+        self.profile_hash = profile_hash
+        self.tags_followed = frozenset(user_profile.get("tags_followed", []))
+        self.buddies = frozenset(user_profile.get("buddies", []))
+        self.intervals = tuple(parse_active_ranges(user_profile.get("active_hours", [])))
+        self.time_match_lut = compute_time_match_scores(np.arange(1440), self.intervals)
+        self.time_match_lut.setflags(write=False)
+
+    def time_match_score(self, post_hour, post_minute):
+        return float(self.time_match_lut[post_hour * 60 + post_minute])
+
+
+def compute_profile_hash(user_profile):
+    payload = json.dumps(user_profile, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def get_compiled_profile(user_id, user_profile, cache):
+    # Clients resend the same profile on every page of a session, so compiled
+    # profiles are cached per (user_id, profile hash)
+    if isinstance(user_profile, CompiledProfile):
+        return user_profile
+
+    profile_hash = compute_profile_hash(user_profile)
+    key = (user_id, profile_hash)
+    compiled = cache.get(key)
+    if compiled is None:
+        compiled = CompiledProfile(user_profile, user_id=user_id, profile_hash=profile_hash)
+        cache.set(key, compiled)
+    return compiled
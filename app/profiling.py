@@ -0,0 +1,156 @@
+import cProfile
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+
+
+class StackSampler:
+    # Samples one thread's Python stack every `interval` seconds from a helper
+    # thread and aggregates the stacks in collapsed (flamegraph) form
+
+    def __init__(self, thread_id, interval=0.001):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return self.stacks
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+
+def write_collapsed(stacks, path):
+    with open(path, "w") as f:
+        for stack, count in stacks.most_common():
+            f.write(f"{stack} {count}\n")
+
+
+class RequestProfiler:
+    # Opt-in profiling of /rank-feed requests. Armed from the admin endpoint
+    # for the next N requests and/or for requests slower than slow_ms, or per
+    # request with the X-Profile header (if allowed). Each capture runs the
+    # whole synchronous ranking call (features, predict, ranking) on one thread
+    # under cProfile (.pstats) or the stack sampler (collapsed .folded stacks).
+    # While nothing is armed, begin() is a flag check. cProfile can only have
+    # one active profiler per process (Python 3.12 raises on a second one), so
+    # only one cProfile capture runs at a time; a request that overlaps it
+    # runs unprofiled and is counted in `skipped`.
+
+    MODES = ("cprofile", "sample")
+
+    def __init__(self, output_dir, admin_enabled=False, allow_header=False, sample_interval_ms=1.0, max_captures=100):
+        self.output_dir = output_dir
+        self.admin_enabled = admin_enabled
+        self.allow_header = allow_header
+        self.sample_interval = sample_interval_ms / 1000.0
+        self.captures = deque(maxlen=max_captures)
+        self._lock = threading.Lock()
+        self._cprofile_lock = threading.Lock()
+        self._counter = 0
+        self.skipped = 0
+        self.disarm()
+
+    def arm(self, requests=0, slow_ms=None, mode="cprofile"):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown profiling mode {mode!r}, expected one of {self.MODES}")
+        with self._lock:
+            self.remaining = requests
+            self.slow_ms = slow_ms
+            self.mode = mode
+            self.active = requests > 0 or slow_ms is not None
+
+    def disarm(self):
+        self.arm(0, None, "cprofile")
+
+    def begin(self, headers=None):
+        # Returns (mode, min_ms) for a request that should be profiled, else None.
+        # min_ms: the capture is only kept if the request took at least that long.
+        if self.active:
+            with self._lock:
+                if self.remaining > 0:
+                    self.remaining -= 1
+                    self.active = self.remaining > 0 or self.slow_ms is not None
+                    return self.mode, 0.0
+                if self.slow_ms is not None:
+                    return self.mode, self.slow_ms
+        if self.allow_header and headers is not None:
+            mode = headers.get("x-profile")
+            if mode:
+                return (mode if mode in self.MODES else "cprofile"), 0.0
+        return None
+
+    def run(self, capture, label, fn, *args, **kwargs):
+        mode, min_ms = capture
+        started = time.perf_counter()
+        if mode == "sample":
+            sampler = StackSampler(threading.get_ident(), self.sample_interval)
+            sampler.start()
+            try:
+                result = fn(*args, **kwargs)
+            finally:
+                stacks = sampler.stop()
+        else:
+            if not self._cprofile_lock.acquire(blocking=False):
+                with self._lock:
+                    self.skipped += 1
+                return fn(*args, **kwargs)
+            try:
+                profile = cProfile.Profile()
+                profile.enable()
+                try:
+                    result = fn(*args, **kwargs)
+                finally:
+                    profile.disable()
+            finally:
+                self._cprofile_lock.release()
+        elapsed_ms = 1000.0 * (time.perf_counter() - started)
+
+        if elapsed_ms >= min_ms:
+            with self._lock:
+                self._counter += 1
+                name = f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}-{self._counter:05d}"
+            os.makedirs(self.output_dir, exist_ok=True)
+            if mode == "sample":
+                name += ".folded"
+                write_collapsed(stacks, os.path.join(self.output_dir, name))
+            else:
+                name += ".pstats"
+                profile.dump_stats(os.path.join(self.output_dir, name))
+            self.captures.append({"file": name, "label": label, "mode": mode, "elapsed_ms": round(elapsed_ms, 3)})
+        return result
+
+    def path(self, name):
+        # Only files this profiler wrote can be fetched
+        if not any(capture["file"] == name for capture in self.captures):
+            return None
+        return os.path.join(self.output_dir, name)
+
+    def stats(self):
+        return {
+            "active": self.active,
+            "mode": self.mode,
+            "remaining": self.remaining,
+            "slow_ms": self.slow_ms,
+            "skipped": self.skipped,
+            "allow_header": self.allow_header,
+            "output_dir": self.output_dir,
+            "captures": list(self.captures),
+        }
@@ -1,12 +1,36 @@
+import asyncio
 import json
-import pandas as pd
-import joblib
-from .extract_features import extract_features
+import os
+import numpy as np
+from .cache import TTLCache
+from .score_cache import ScoreCache
+from .sessions import SessionLost, SessionStore
+from .streaming import StreamingRanker
+from .metrics import Metrics
+from .profiling import RequestProfiler
+from .profile import get_compiled_profile
+from .selection import top_k_indices, round_scores
+from .batcher import MicroBatcher
+from .model_registry import ModelRegistry, validate_model_columns
+from .batch_features import (
+    FeatureBuffer,
+    PostTable,
+    cross_features,
+    # Encoding maps (used during training) now live with the batch extractor
+    content_type_map,
+    weekday_type_map,
+    time_period_map,
+    karma_bucket_map,
+)
+
+# Paths in config.json are relative to the project root, independent of the working directory
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+def resolve_path(path):
+    return path if os.path.isabs(path) else os.path.join(ROOT_DIR, path)
 
-# Add root directory to the system path
-# sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 # 🔧 Load config.json
-with open("config/config.json") as f:
+with open(resolve_path("config/config.json")) as f:
     config = json.load(f)
     
 model_type = config.get("model_type", "lightgbm")
@@ -16,81 +40,292 @@ expected_columns = config["feature_columns"].get(model_type)
 if not model_path or not expected_columns:
     raise ValueError(f"Missing model_path or feature_columns for model_type: {model_type}")
 
+# The model itself is loaded on first use (or by warm-up at server startup)
+# and hot-swapped when the file changes, see app/model_registry.py
+model_reload_config = config.get("model_reload", {})
+registry = ModelRegistry(
+    resolve_path(model_path),
+    model_type,
+    expected_columns,
+    compiled_engine=config.get("compiled_engine", "auto"),
+    poll_seconds=model_reload_config.get("poll_seconds") if model_reload_config.get("enabled", False) else None,
+    shared_dir=resolve_path(config["shared_model_dir"]) if config.get("shared_model_dir") else None,
+)
 
-try:
-    model, _ = joblib.load(model_path)
-except Exception as e:
-    print(f"❌ Failed to load model from {model_path}")
-    raise e
-
-
-# Content type encoding (used during training)
-content_type_map = {"video": 0.08, "image": 0.04, "text": 0.02}
-weekday_type_map = {"Weekday": 0, "Weekend": 1}
-time_period_map = {"Morning": 1, "Afternoon": 2, "Evening": 3, "Night": 2}
-karma_bucket_map = {"low": 0, "medium": 1, "high": 2}
-
-def rank_posts(user_id, posts, user_profile):
-    threshold = config.get("model_threshold", 0.5) 
-    feature_list = []
-    post_ids = []
-
-    for post in posts:
-        # Feature extraction
-        features = extract_features(post, user_profile)
-
-        # Convert content_type to numeric
-        features["Post Type"] = content_type_map.get(post["content_type"], 0)
-        features['Weekday Type'] = weekday_type_map.get(features.get('Weekday Type'), 0)
-        features["Time Periods"] = time_period_map.get(features.get("Time Periods"), 0)
-        features['karma_bucket'] = karma_bucket_map.get(features.get("karma_bucket"), 0)
-        # Make sure new features are present (assumed to be added in extract_features)
-        if "Weekday Type" not in features:
-            features["Weekday Type"] = 0  # default if missing
-        if "Time Periods" not in features:
-            features["Time Periods"] = 0  # default if missing
-
-        feature_list.append(features)
-        post_ids.append(post["post_id"])
-
-    # Convert to DataFrame
-    X = pd.DataFrame(feature_list)
-    # Defensive check for empty DataFrame
-    if X.empty:
-        return {
-            "user_id": user_id,
-            "ranked_posts": [],
-            "status": "empty"
-        }
-    # Reorder columns to match expected model input
-    X = X[expected_columns]
-    scores = model.predict(X)
+# Per-stage timings and result counters served on /metrics
+metrics = Metrics(enabled=config.get("metrics", {}).get("enabled", True))
+
+# Opt-in request profiling (admin endpoint / X-Profile header), off by default
+profiling_config = config.get("profiling", {})
+profiler = RequestProfiler(
+    resolve_path(profiling_config.get("output_dir", "profiles")),
+    admin_enabled=profiling_config.get("admin_enabled", False),
+    allow_header=profiling_config.get("allow_header", False),
+    sample_interval_ms=profiling_config.get("sample_interval_ms", 1.0),
+)
+
+def predict(X):
+    model = registry.get()
+    with metrics.stage("predict"):
+        return model.predict(X)
+
+def __getattr__(name):
+    # ranker.model / ranker.booster resolve to the currently served version
+    if name in ("model", "booster"):
+        return getattr(registry.get(), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Reusable inference matrix in config column order (float64 keeps scores identical to training dtype)
+feature_buffer = FeatureBuffer(len(expected_columns), dtype=config.get("inference_dtype", "float64"))
+
+# Compiled user profiles, reused across pages of the same feed session
+profile_cache_config = config.get("profile_cache", {})
+profile_cache = TTLCache(
+    max_size=profile_cache_config.get("max_size", 10000),
+    ttl_seconds=profile_cache_config.get("ttl_seconds", 1800),
+)
+
+# Opt-in score caches for repeated / overlapping candidate lists (see app/score_cache.py)
+score_cache_config = config.get("score_cache", {})
+score_cache = ScoreCache(
+    result_max_size=score_cache_config.get("result_max_size", 10000),
+    post_max_size=score_cache_config.get("post_max_size", 500000),
+    ttl_seconds=score_cache_config.get("ttl_seconds", 300),
+) if score_cache_config.get("enabled", False) else None
+
+# Server-side ranked lists for incremental re-ranking (see rank_session)
+feed_sessions_config = config.get("feed_sessions", {})
+session_store = SessionStore(
+    max_size=feed_sessions_config.get("max_size", 10000),
+    ttl_seconds=feed_sessions_config.get("ttl_seconds", 1800),
+)
+
+def rank_scores(user_id, post_ids, scores, top_k=None, offset=0):
+    # Threshold / fallback ranking over a score array; result dicts are only
+    # built for the requested [offset, offset + top_k) slice
+    with metrics.stage("rank"):
+        result = _rank_scores(user_id, post_ids, scores, top_k=top_k, offset=offset)
+    metrics.observe_result(result["status"], len(scores))
+    return result
+
+def _rank_scores(user_id, post_ids, scores, top_k=None, offset=0):
+    threshold = config.get("model_threshold", 0.5)
+    passing = scores >= threshold
 
     # Check if any score meets the threshold
-    if any(score >= threshold for score in scores):
-        filtered = [
-            {"post_id": pid, "score": float(score)}
-            for pid, score in zip(post_ids, scores)
-            if score >= threshold
-        ]
-        ranked_posts = sorted(filtered, key=lambda x: x["score"], reverse=True)
-        return {
-            "user_id": user_id,
-            "ranked_posts": ranked_posts,
-            "status": "ranked"
-        }
+    if passing.any():
+        candidates = np.flatnonzero(passing)
+        values = scores[candidates]
+        status = "ranked"
     else:
         # fallback: scale down original scores
-        fallback_posts = [
-            {"post_id": pid, "score": round(float(score * 0.8), 4)}  # or any penalty strategy
-            for pid, score in zip(post_ids, scores)
-        ]
-        ranked_posts = sorted(fallback_posts, key=lambda x: x["score"], reverse=True)
-        return {
-            "user_id": user_id,
-            "ranked_posts": ranked_posts,
-            "status": "fallback_used"
-        }
+        candidates = np.arange(len(scores))
+        values = round_scores(scores * 0.8)  # or any penalty strategy
+        status = "fallback_used"
+
+    selected = top_k_indices(values, top_k=top_k, offset=offset)
+    ranked_posts = [
+        {"post_id": post_ids[candidates[i]], "score": float(values[i])}
+        for i in selected
+    ]
+    return {
+        "user_id": user_id,
+        "ranked_posts": ranked_posts,
+        "status": status
+    }
+
+def empty_result(user_id):
+    metrics.observe_result("empty", 0)
+    return {
+        "user_id": user_id,
+        "ranked_posts": [],
+        "status": "empty"
+    }
+
+def build_features(user_id, posts, user_profile, out=None):
+    # posts is a list of post dicts or an already built PostTable (e.g. decoded
+    # from the columnar binary format)
+    with metrics.stage("features"):
+        table = posts if isinstance(posts, PostTable) else PostTable(posts)
+        profile = get_compiled_profile(user_id, user_profile, profile_cache)
+        X = cross_features(table, [profile], expected_columns, out=out)
+    return table.post_ids, X
+
+def cache_scope(user_id, posts, user_profile):
+    # Cached scores are only valid for one model version and one profile; None
+    # bypasses the caches (disabled, columnar input or an unhashed profile)
+    if score_cache is None or isinstance(posts, PostTable):
+        return None
+    profile = get_compiled_profile(user_id, user_profile, profile_cache)
+    if profile.profile_hash is None:
+        return None
+    return (registry.get().sha256, profile.profile_hash)
+
+def rank_posts(user_id, posts, user_profile, top_k=None, offset=0):
+    # Defensive check for empty input
+    if not posts:
+        return empty_result(user_id)
+
+    scope = cache_scope(user_id, posts, user_profile)
+    if scope is not None:
+        keys, request_key, scores, missing = score_cache.lookup(user_id, scope, posts)
+        if missing:
+            missing_posts = [posts[i] for i in missing]
+            _, X = build_features(user_id, missing_posts, user_profile, out=feature_buffer.rows(len(missing_posts)))
+            scores[missing] = predict(X)
+        score_cache.store(keys, request_key, scope, scores, missing)
+        return rank_scores(user_id, [post["post_id"] for post in posts], scores, top_k=top_k, offset=offset)
+
+    # Columnar feature extraction straight into the reusable buffer, scored by the booster
+    post_ids, X = build_features(user_id, posts, user_profile, out=feature_buffer.rows(len(posts)))
+    scores = predict(X)
+
+    return rank_scores(user_id, post_ids, scores, top_k=top_k, offset=offset)
+
+def score_posts(user_id, posts, user_profile):
+    _, X = build_features(user_id, posts, user_profile, out=feature_buffer.rows(len(posts)))
+    return predict(X)
+
+# Streaming mode: candidates are scored chunk by chunk with a running top-K
+streaming_config = config.get("streaming", {})
+
+def open_stream(user_id, user_profile, top_k=None, offset=0):
+    profile = get_compiled_profile(user_id, user_profile, profile_cache)
+    return StreamingRanker(
+        user_id,
+        score_fn=lambda posts: score_posts(user_id, posts, profile),
+        threshold=config.get("model_threshold", 0.5),
+        top_k=top_k or streaming_config.get("default_top_k", 100),
+        offset=offset,
+        chunk_size=streaming_config.get("chunk_size", 1024),
+    )
+
+def rank_session(user_id, user_profile, posts=None, added=None, removed=None, top_k=None, offset=0):
+    # Incremental ranking against the user's last ranked list. `posts` replaces
+    # the whole candidate list (diffed against the session), `added` upserts new
+    # or updated posts and `removed` drops post_ids. Only new or changed posts
+    # are scored, unless the profile or the model changed since the last call.
+    # Without `posts`, the session must still exist (SessionLost otherwise),
+    # so a delta is never ranked on its own against an empty session.
+    profile = get_compiled_profile(user_id, user_profile, profile_cache)
+    scope = (registry.get().sha256, profile.profile_hash)
+    session = session_store.get_or_create(user_id, scope, create=posts is not None)
+    score_fn = lambda batch: score_posts(user_id, batch, profile)
+
+    with session.lock:
+        scored = session.rescore(scope, score_fn) if session.scope != scope else 0
+        if posts is not None:
+            changed, dropped = session.diff(posts)
+            scored += session.apply(changed, dropped, score_fn)
+        scored += session.apply(added or [], removed or [], score_fn)
+        result = session_result(user_id, session, top_k=top_k, offset=offset)
+
+    result["session_size"] = len(session)
+    result["scored_posts"] = scored
+    return result
+
+def session_result(user_id, session, top_k=None, offset=0):
+    # Same output as rank_scores over the session's posts in arrival order,
+    # read straight off the maintained (score desc, arrival) order
+    if len(session) == 0:
+        return empty_result(user_id)
+    threshold = config.get("model_threshold", 0.5)
+    if session.order_scores[0] < threshold:
+        post_ids, scores = session.in_arrival_order()
+        return rank_scores(user_id, post_ids, scores, top_k=top_k, offset=offset)
+
+    passing = int(np.searchsorted(-session.order_scores, -threshold, side="right"))
+    stop = passing if top_k is None else min(passing, offset + top_k)
+    metrics.observe_result("ranked", len(session))
+    return {
+        "user_id": user_id,
+        "ranked_posts": [
+            {"post_id": session.order_ids[i], "score": float(session.order_scores[i])}
+            for i in range(offset, stop)
+        ],
+        "status": "ranked"
+    }
+
+def rank_posts_bulk(requests, shared_posts=None, top_k=None, offset=0):
+    # Ranks many users at once: each request is {"user_id", "user_profile"} plus
+    # either its own "posts" or the shared candidate pool. All rows go into a
+    # single feature matrix and are scored with one predict call. Post-only
+    # features of the shared pool are computed once and broadcast across users.
+    own, shared = [], []
+    for i, request in enumerate(requests):
+        if request.get("posts") is not None:
+            own.append(i)
+        elif shared_posts is not None:
+            shared.append(i)
+        else:
+            raise ValueError(f"No posts given for user {request['user_id']} and no shared candidate pool")
+
+    total = sum(len(requests[i]["posts"]) for i in own) + len(shared) * len(shared_posts or [])
+    X = np.empty((total, len(expected_columns)), dtype=np.float64)
+    spans = [None] * len(requests)
+
+    start = 0
+    for i in own:
+        request = requests[i]
+        n = len(request["posts"])
+        post_ids, _ = build_features(request["user_id"], request["posts"], request["user_profile"], out=X[start:start + n])
+        spans[i] = (post_ids, start, n)
+        start += n
+
+    if shared and shared_posts:
+        with metrics.stage("features"):
+            table = PostTable(shared_posts)
+            profiles = [
+                get_compiled_profile(requests[i]["user_id"], requests[i]["user_profile"], profile_cache) for i in shared
+            ]
+            cross_features(table, profiles, expected_columns, out=X[start:])
+        for i in shared:
+            spans[i] = (table.post_ids, start, len(table))
+            start += len(table)
+    else:
+        for i in shared:
+            spans[i] = ([], start, 0)
+
+    scores = predict(X) if total else np.zeros(0, dtype=np.float64)
+
+    results = []
+    for request, (post_ids, start, n) in zip(requests, spans):
+        if n == 0:
+            results.append(empty_result(request["user_id"]))
+            continue
+        results.append(rank_scores(request["user_id"], post_ids, scores[start:start + n], top_k=top_k, offset=offset))
+    return results
+
+# Concurrent async requests share one predict call through the micro-batcher
+micro_batching_config = config.get("micro_batching", {})
+micro_batching_enabled = micro_batching_config.get("enabled", False)
+micro_batcher = MicroBatcher(
+    predict,
+    max_wait_ms=micro_batching_config.get("max_wait_ms", 2.0),
+    max_batch_rows=micro_batching_config.get("max_batch_rows", 4096),
+)
+
+async def rank_posts_async(user_id, posts, user_profile, top_k=None, offset=0):
+    if not posts:
+        return empty_result(user_id)
+
+    scope = cache_scope(user_id, posts, user_profile)
+    if scope is not None:
+        keys, request_key, scores, missing = score_cache.lookup(user_id, scope, posts)
+        if missing:
+            _, X = await asyncio.to_thread(build_features, user_id, [posts[i] for i in missing], user_profile)
+            scores[missing] = await micro_batcher.submit(X)
+        score_cache.store(keys, request_key, scope, scores, missing)
+        return rank_scores(user_id, [post["post_id"] for post in posts], scores, top_k=top_k, offset=offset)
+
+    # Features are built on a worker thread so the event loop keeps serving
+    # other requests. Each request owns its matrix here: the per-thread buffer
+    # would be overwritten by other coroutines while this one waits for its batch
+    post_ids, X = await asyncio.to_thread(build_features, user_id, posts, user_profile)
+    scores = await micro_batcher.submit(X)
+
+    return rank_scores(user_id, post_ids, scores, top_k=top_k, offset=offset)
+
 def main():
     test_posts = [
         # Buddy + followed tag + high karma + within active hours
@@ -0,0 +1,67 @@
+import hashlib
+import numpy as np
+from .cache import TTLCache
+
+
+def post_key(post):
+    # Every post field the features read, so a post edited under the same
+    # post_id (new author, tags or content type) is scored again
+    return (
+        post["post_id"],
+        post.get("author_id"),
+        tuple(post.get("tags", [])),
+        post.get("content_type", "unknown"),
+        post.get("karma", 0),
+        post.get("created_at", ""),
+    )
+
+
+class ScoreCache:
+    # Two opt-in caches in front of the model, both scoped to the model version
+    # and the profile hash:
+    #   results: whole-request scores keyed by user_id + the set of post keys
+    #   posts:   individual post scores, so overlapping requests only score new posts
+
+    def __init__(self, result_max_size=10000, post_max_size=500000, ttl_seconds=300):
+        self.results = TTLCache(max_size=result_max_size, ttl_seconds=ttl_seconds)
+        self.posts = TTLCache(max_size=post_max_size, ttl_seconds=ttl_seconds)
+
+    @staticmethod
+    def request_key(user_id, scope, keys):
+        digest = hashlib.blake2b(digest_size=16)
+        for key in sorted(keys, key=repr):
+            digest.update(repr(key).encode("utf-8"))
+            digest.update(b"\0")
+        return (user_id, scope, digest.hexdigest())
+
+    def lookup(self, user_id, scope, posts):
+        # Returns (keys, request_key, scores, missing): scores has NaN at the
+        # `missing` positions, which the caller scores and passes to store()
+        keys = [post_key(post) for post in posts]
+        request_key = self.request_key(user_id, scope, keys)
+        by_post = self.results.get(request_key)
+        if by_post is not None:
+            return keys, request_key, np.array([by_post[key] for key in keys], dtype=np.float64), []
+
+        scores = np.empty(len(keys), dtype=np.float64)
+        missing = []
+        for i, key in enumerate(keys):
+            score = self.posts.get((scope, key))
+            if score is None:
+                missing.append(i)
+                scores[i] = np.nan
+            else:
+                scores[i] = score
+        return keys, request_key, scores, missing
+
+    def store(self, keys, request_key, scope, scores, missing):
+        for i in missing:
+            self.posts.set((scope, keys[i]), float(scores[i]))
+        self.results.set(request_key, dict(zip(keys, scores.tolist())))
+
+    def clear(self):
+        self.results.clear()
+        self.posts.clear()
+
+    def stats(self):
+        return {"results": self.results.stats(), "posts": self.posts.stats()}
@@ -0,0 +1,57 @@
+import numpy as np
+
+
+def top_k_indices(values, top_k=None, offset=0):
+    # Indices of `values` in descending order, sliced to [offset, offset + top_k).
+    # Ties keep input order, same as sorted(..., reverse=True) on the result dicts.
+    n = len(values)
+    stop = n if top_k is None else min(n, offset + top_k)
+    if offset >= stop:
+        return np.zeros(0, dtype=np.int64)
+
+    if stop < n:
+        # Partial selection: everything at least as large as the stop-th value,
+        # so ties straddling the cut are still ordered by position
+        kth_value = -np.partition(-values, stop - 1)[stop - 1]
+        candidates = np.flatnonzero(values >= kth_value)
+    else:
+        candidates = np.arange(n)
+
+    order = candidates[np.argsort(-values[candidates], kind="stable")]
+    return order[offset:stop]
+
+
+def round_scores(values, decimals=4):
+    # np.round agrees with Python's round() except within float error of a
+    # half-way point; those few values are re-rounded with round() itself
+    values = np.asarray(values, dtype=np.float64)
+    scale = 10.0 ** decimals
+    rounded = np.round(values, decimals)
+    scaled = values * scale
+    near_half = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    for i in np.flatnonzero(near_half):
+        rounded[i] = round(float(values[i]), decimals)
+    return rounded
+
+
+class RunningTopK:
+    # The k largest values over chunks that arrive in input order, in bounded
+    # memory; ties keep the earlier item, same as top_k_indices over the whole input
+
+    def __init__(self, k):
+        self.k = k
+        self.values = np.zeros(0, dtype=np.float64)
+        self.items = np.zeros(0, dtype=object)
+
+    def push(self, values, items):
+        values = np.concatenate([self.values, np.asarray(values, dtype=np.float64)])
+        items = np.concatenate([self.items, np.asarray(items, dtype=object)])
+        if len(values) > self.k:
+            # Kept positions are re-sorted so the survivors stay in input order
+            keep = np.sort(top_k_indices(values, top_k=self.k))
+            values, items = values[keep], items[keep]
+        self.values, self.items = values, items
+
+    def result(self):
+        order = top_k_indices(self.values)
+        return self.values[order], self.items[order]
@@ -0,0 +1,138 @@
+import threading
+import numpy as np
+from .cache import TTLCache
+
+
+class FeedSession:
+    # The last ranked candidate list of one user. Posts keep their arrival
+    # sequence number, and raw scores are kept sorted by (score desc, seq) so a
+    # delta of added / updated / removed posts is merged into the existing order
+    # instead of re-sorting (or re-scoring) the whole list
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.lock = threading.Lock()
+        self.posts = {}  # post_id -> (seq, post, score)
+        self.next_seq = 0
+        self.order_ids = np.zeros(0, dtype=object)
+        self.order_scores = np.zeros(0, dtype=np.float64)
+        self.order_seq = np.zeros(0, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.posts)
+
+    def diff(self, posts):
+        # Turns a full candidate list into (changed posts, removed post_ids)
+        incoming = {post["post_id"]: post for post in posts}
+        removed = [post_id for post_id in self.posts if post_id not in incoming]
+        return list(incoming.values()), removed
+
+    def apply(self, added, removed, score_fn):
+        # added: new or updated posts; removed: post_ids. Only posts that are
+        # new or differ from the stored copy are passed to score_fn(posts).
+        # Returns the number of posts scored.
+        stale = {post_id for post_id in removed if post_id in self.posts}
+        for post_id in stale:
+            del self.posts[post_id]
+
+        changed = {}
+        for post in added:
+            existing = self.posts.get(post["post_id"])
+            if existing is None or existing[1] != post:
+                changed[post["post_id"]] = post
+        if not stale and not changed:
+            return 0
+
+        seqs = []
+        for post_id in changed:
+            existing = self.posts.get(post_id)
+            if existing is not None:
+                stale.add(post_id)
+                seqs.append(existing[0])
+            else:
+                seqs.append(self.next_seq)
+                self.next_seq += 1
+
+        posts = list(changed.values())
+        scores = np.asarray(score_fn(posts), dtype=np.float64) if posts else np.zeros(0, dtype=np.float64)
+        for post, seq, score in zip(posts, seqs, scores.tolist()):
+            self.posts[post["post_id"]] = (seq, post, score)
+
+        if stale:
+            keep = np.fromiter((post_id not in stale for post_id in self.order_ids), dtype=bool, count=len(self.order_ids))
+            self.order_ids = self.order_ids[keep]
+            self.order_scores = self.order_scores[keep]
+            self.order_seq = self.order_seq[keep]
+        self._merge(np.array([post["post_id"] for post in posts], dtype=object), scores, np.array(seqs, dtype=np.int64))
+        return len(posts)
+
+    def _merge(self, ids, scores, seqs):
+        if len(ids) == 0:
+            return
+        new_order = np.lexsort((seqs, -scores))
+        ids, scores, seqs = ids[new_order], scores[new_order], seqs[new_order]
+
+        # Insertion points in the kept order; equal scores are ordered by seq
+        neg_scores = -self.order_scores
+        left = np.searchsorted(neg_scores, -scores, side="left")
+        right = np.searchsorted(neg_scores, -scores, side="right")
+        positions = left.copy()
+        for i in np.flatnonzero(right > left):
+            positions[i] = left[i] + np.searchsorted(self.order_seq[left[i]:right[i]], seqs[i])
+
+        self.order_ids = np.insert(self.order_ids, positions, ids)
+        self.order_scores = np.insert(self.order_scores, positions, scores)
+        self.order_seq = np.insert(self.order_seq, positions, seqs)
+
+    def rescore(self, scope, score_fn):
+        # Profile or model changed: every stored score is stale
+        self.scope = scope
+        entries = sorted(self.posts.values(), key=lambda entry: entry[0])
+        self.posts = {}
+        self.order_ids = np.zeros(0, dtype=object)
+        self.order_scores = np.zeros(0, dtype=np.float64)
+        self.order_seq = np.zeros(0, dtype=np.int64)
+        if not entries:
+            return 0
+        posts = [post for _, post, _ in entries]
+        scores = np.asarray(score_fn(posts), dtype=np.float64)
+        seqs = np.array([seq for seq, _, _ in entries], dtype=np.int64)
+        for post, seq, score in zip(posts, seqs.tolist(), scores.tolist()):
+            self.posts[post["post_id"]] = (seq, post, score)
+        self._merge(np.array([post["post_id"] for post in posts], dtype=object), scores, seqs)
+        return len(posts)
+
+    def in_arrival_order(self):
+        order = np.argsort(self.order_seq, kind="stable")
+        return self.order_ids[order].tolist(), self.order_scores[order]
+
+
+class SessionLost(LookupError):
+    # A delta-only update for a session that expired or was evicted: the
+    # client has to resend its full candidate list
+    pass
+
+
+class SessionStore:
+    # Bounded FeedSession per user_id, expiring after ttl_seconds without use
+
+    def __init__(self, max_size=10000, ttl_seconds=1800):
+        self.sessions = TTLCache(max_size=max_size, ttl_seconds=ttl_seconds, sliding=True)
+        self._lock = threading.Lock()
+
+    def get_or_create(self, user_id, scope, create=True):
+        # create=False raises SessionLost instead of starting an empty session
+        with self._lock:
+            session = self.sessions.get(user_id)
+            if session is None:
+                if not create:
+                    raise SessionLost(user_id)
+                session = FeedSession(scope)
+                self.sessions.set(user_id, session)
+            return session
+
+    def drop(self, user_id):
+        return self.sessions.pop(user_id) is not None
+
+    def stats(self):
+        return self.sessions.stats()
@@ -0,0 +1,92 @@
+import numpy as np
+from .selection import RunningTopK, round_scores
+
+# Streaming /rank-feed request body: one JSON object per line, the first line is
+# {"user_id", "user_profile", "top_k", "offset"} and every following line is one post.
+# The response is NDJSON too: a summary line, then one line per ranked post.
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+
+def is_ndjson(content_type):
+    return (content_type or "").split(";")[0].strip().lower() in NDJSON_CONTENT_TYPES
+
+
+class StreamingRanker:
+    # Ranks an arbitrarily long stream of posts in fixed-size chunks: each chunk
+    # is scored and folded into running top-K selections, so memory depends on
+    # chunk_size and offset + top_k, not on the number of posts. The result is
+    # the same as rank_scores over the whole list.
+
+    def __init__(self, user_id, score_fn, threshold, top_k, offset=0, chunk_size=1024):
+        self.user_id = user_id
+        self.score_fn = score_fn
+        self.threshold = threshold
+        self.top_k = top_k
+        self.offset = offset
+        self.chunk_size = chunk_size
+        self.pending = []
+        self.total = 0
+        self.any_passing = False
+        # Raw scores for the "ranked" case, penalized scores for "fallback_used";
+        # the latter is only needed until a post passes the threshold
+        self.ranked = RunningTopK(offset + top_k)
+        self.fallback = RunningTopK(offset + top_k)
+
+    def add(self, post):
+        # Returns True once a full chunk is buffered and flush() should run
+        self.pending.append(post)
+        return len(self.pending) >= self.chunk_size
+
+    def flush(self):
+        if not self.pending:
+            return
+        posts, self.pending = self.pending, []
+        scores = np.asarray(self.score_fn(posts), dtype=np.float64)
+        post_ids = [post["post_id"] for post in posts]
+        self.total += len(posts)
+
+        self.ranked.push(scores, post_ids)
+        if not self.any_passing:
+            self.any_passing = bool((scores >= self.threshold).any())
+            if self.any_passing:
+                self.fallback = None
+            else:
+                self.fallback.push(round_scores(scores * 0.8), post_ids)
+
+    def finish(self):
+        self.flush()
+        if self.total == 0:
+            return {"user_id": self.user_id, "ranked_posts": [], "status": "empty", "total_posts": 0}
+
+        if self.any_passing:
+            values, post_ids = self.ranked.result()
+            passing = values >= self.threshold
+            values, post_ids = values[passing], post_ids[passing]
+            status = "ranked"
+        else:
+            values, post_ids = self.fallback.result()
+            status = "fallback_used"
+
+        stop = self.offset + self.top_k
+        return {
+            "user_id": self.user_id,
+            "ranked_posts": [
+                {"post_id": post_id, "score": float(value)}
+                for value, post_id in zip(values[self.offset:stop], post_ids[self.offset:stop])
+            ],
+            "status": status,
+            "total_posts": self.total,
+        }
+
+
+async def iter_lines(chunks):
+    # Splits an async stream of byte chunks into non-empty lines
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line
+    if buffer.strip():
+        yield buffer
@@ -0,0 +1,111 @@
+import numpy as np
+
+# Time match kernel shared by serving (app/extract_features.py, app/profile.py)
+# and the offline dataset build (pipeline/stages.py), so both score a post
+# against a user's active hours the same way:
+#   1.0 if the post minute-of-day falls inside any "HH:MM-HH:MM" range
+#   (ranges whose end is before their start wrap past midnight), otherwise
+#   round(max(0, 1 - d / 600), 2) where d is the circular distance in minutes
+#   to the nearest range edge, i.e. linear decay to 0 over 10 hours.
+MINUTES_PER_DAY = 1440
+DECAY_MINUTES = 600
+CHUNK_SIZE = 1 << 18
+
+
+def parse_time_range(time_range):
+    # "HH:MM-HH:MM" -> (start, end) minutes of day; ValueError when malformed
+    start_str, end_str = time_range.split("-")
+    start_hour, start_minute = map(int, start_str.split(":"))
+    end_hour, end_minute = map(int, end_str.split(":"))
+    return start_hour * 60 + start_minute, end_hour * 60 + end_minute
+
+
+def parse_active_ranges(active_ranges, strict=False):
+    # strict=False skips malformed ranges (serving); strict=True raises (dataset build)
+    intervals = []
+    for time_range in active_ranges:
+        try:
+            intervals.append(parse_time_range(time_range))
+        except ValueError:
+            if strict:
+                raise
+    return intervals
+
+
+def score_from_distance(min_distance):
+    return round(max(0.0, 1 - (min_distance / DECAY_MINUTES)), 2)
+
+
+# Scores for every circular distance between in-range minutes (0..720), taken
+# from Python's round() so the kernel matches the scalar formula exactly
+DISTANCE_SCORES = np.array([score_from_distance(d) for d in range(MINUTES_PER_DAY // 2 + 1)], dtype=np.float64)
+
+
+def pack_intervals(interval_lists):
+    # Ragged per-user interval lists -> (starts, ends, valid) arrays of shape
+    # (n_users, max_intervals), padded where a user has fewer ranges
+    width = max((len(intervals) for intervals in interval_lists), default=0)
+    starts = np.zeros((len(interval_lists), width), dtype=np.int64)
+    ends = np.zeros((len(interval_lists), width), dtype=np.int64)
+    valid = np.zeros((len(interval_lists), width), dtype=bool)
+    for row, intervals in enumerate(interval_lists):
+        if intervals:
+            bounds = np.asarray(intervals, dtype=np.int64)
+            starts[row, :len(bounds)] = bounds[:, 0]
+            ends[row, :len(bounds)] = bounds[:, 1]
+            valid[row, :len(bounds)] = True
+    return starts, ends, valid
+
+
+def time_match_scores(post_minutes, starts, ends, valid=None):
+    # Scores for (post, active-hours) pairs. post_minutes: (n,) minutes of day.
+    # starts/ends: (k,) ranges shared by every post, or (n, k) one row per post;
+    # valid masks padded slots. Rows with no valid range score 0.0.
+    post_minutes = np.asarray(post_minutes, dtype=np.int64)
+    starts = np.asarray(starts, dtype=np.int64)
+    ends = np.asarray(ends, dtype=np.int64)
+    if starts.ndim == 1:
+        starts, ends = starts[None, :], ends[None, :]
+        valid = None if valid is None else np.asarray(valid, dtype=bool)[None, :]
+    elif valid is not None:
+        valid = np.asarray(valid, dtype=bool)
+    n = len(post_minutes)
+    scores = np.zeros(n, dtype=np.float64)
+    if n == 0 or starts.shape[1] == 0:
+        return scores
+
+    per_post = starts.shape[0] != 1
+    for lo in range(0, n, CHUNK_SIZE):
+        hi = min(lo + CHUNK_SIZE, n)
+        block = slice(lo, hi) if per_post else slice(0, 1)
+        scores[lo:hi] = _score_block(
+            post_minutes[lo:hi, None], starts[block], ends[block], None if valid is None else valid[block]
+        )
+    return scores
+
+
+def _score_block(minutes, starts, ends, valid):
+    inside = np.where(
+        starts <= ends,
+        (starts <= minutes) & (minutes <= ends),
+        (minutes >= starts) | (minutes <= ends),
+    )
+
+    distance_to_start = np.abs(minutes - starts)
+    distance_to_start = np.minimum(distance_to_start, MINUTES_PER_DAY - distance_to_start)
+    distance_to_end = np.abs(minutes - ends)
+    distance_to_end = np.minimum(distance_to_end, MINUTES_PER_DAY - distance_to_end)
+    distance = np.minimum(distance_to_start, distance_to_end)
+
+    if valid is not None:
+        inside = inside & valid
+        distance = np.where(valid, distance, np.iinfo(np.int64).max)
+    min_distance = distance.min(axis=1)
+
+    # Out-of-range hours in the inputs can push distances outside the table
+    in_table = (min_distance >= 0) & (min_distance < len(DISTANCE_SCORES))
+    scores = DISTANCE_SCORES[np.where(in_table, min_distance, 0)]
+    for i in np.flatnonzero(~in_table):
+        scores[i] = 0.0 if min_distance[i] == np.iinfo(np.int64).max else score_from_distance(int(min_distance[i]))
+    scores[inside.any(axis=1)] = 1.0
+    return scores
@@ -0,0 +1,224 @@
+import json
+import math
+import os
+import shutil
+import numpy as np
+
+# LightGBM split encoding (see LightGBM tree.h NumericalDecision)
+MISSING_NONE, MISSING_ZERO, MISSING_NAN = 0, 1, 2
+_missing_type_codes = {"None": MISSING_NONE, "Zero": MISSING_ZERO, "NaN": MISSING_NAN}
+_ZERO_THRESHOLD = 1.0000000180025095e-35  # kZeroThreshold (1e-35f) as a double
+
+
+_ARRAY_FIELDS = ("roots", "feature", "threshold", "left", "right", "default_left", "missing_type", "value")
+
+
+class CompiledTreeEnsemble:
+    # Flat array form of a LightGBM booster: every tree's nodes are stored in
+    # shared arrays (leaves have feature -1), and prediction walks all rows and
+    # all trees at once instead of going through the sklearn wrapper
+
+    def __init__(self, model_dump, engine="numpy"):
+        if model_dump.get("num_tree_per_iteration", 1) != 1:
+            raise ValueError("Compiled scorer only supports single-output models")
+
+        self.feature_names = model_dump["feature_names"]
+        self.objective = model_dump.get("objective", "regression").split()
+        self.average_output = model_dump.get("average_output", False)
+
+        feature, threshold, left, right, default_left, missing_type, value = [], [], [], [], [], [], []
+        roots = []
+        max_depth = 0
+
+        for tree in model_dump["tree_info"]:
+            roots.append(len(feature))
+            # Iterative pre-order walk; children indices are patched once known
+            stack = [(tree["tree_structure"], None, False, 0)]
+            while stack:
+                node, parent, is_left, depth = stack.pop()
+                index = len(feature)
+                if parent is not None:
+                    (left if is_left else right)[parent] = index
+                max_depth = max(max_depth, depth)
+
+                if "split_index" in node:
+                    if node.get("decision_type", "<=") != "<=":
+                        raise ValueError("Compiled scorer does not support categorical splits")
+                    feature.append(node["split_feature"])
+                    threshold.append(node["threshold"])
+                    default_left.append(node.get("default_left", True))
+                    missing_type.append(_missing_type_codes[node.get("missing_type", "None")])
+                    value.append(0.0)
+                    left.append(-1)
+                    right.append(-1)
+                    stack.append((node["right_child"], index, False, depth + 1))
+                    stack.append((node["left_child"], index, True, depth + 1))
+                else:
+                    feature.append(-1)
+                    threshold.append(0.0)
+                    default_left.append(False)
+                    missing_type.append(MISSING_NONE)
+                    value.append(node["leaf_value"])
+                    left.append(index)
+                    right.append(index)
+
+        self.roots = np.asarray(roots, dtype=np.int64)
+        self.feature = np.asarray(feature, dtype=np.int64)
+        self.threshold = np.asarray(threshold, dtype=np.float64)
+        self.left = np.asarray(left, dtype=np.int64)
+        self.right = np.asarray(right, dtype=np.int64)
+        self.default_left = np.asarray(default_left, dtype=bool)
+        self.missing_type = np.asarray(missing_type, dtype=np.int8)
+        self.value = np.asarray(value, dtype=np.float64)
+        self.max_depth = max_depth
+        self.engine = engine
+        self._raw_predict = _numba_raw_predict() if engine == "numba" else None
+
+    @classmethod
+    def from_booster(cls, booster, engine="numpy"):
+        return cls(booster.dump_model(), engine=engine)
+
+    def export(self, directory, metadata=None):
+        # Writes one .npy per node array plus meta.json. The directory is built
+        # under a temporary name and renamed into place, so readers never see a
+        # partial export.
+        tmp_dir = f"{directory}.tmp-{os.getpid()}"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        for name in _ARRAY_FIELDS:
+            np.save(os.path.join(tmp_dir, f"{name}.npy"), getattr(self, name))
+        meta = {
+            "feature_names": self.feature_names,
+            "objective": self.objective,
+            "average_output": self.average_output,
+            "max_depth": self.max_depth,
+            **(metadata or {}),
+        }
+        with open(os.path.join(tmp_dir, "meta.json"), "w") as f:
+            json.dump(meta, f)
+        try:
+            os.rename(tmp_dir, directory)
+        except OSError:
+            # Another process exported the same model first
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    @classmethod
+    def load(cls, directory, engine="numpy", mmap=True):
+        # With mmap the node arrays are read-only views of the page cache, so every
+        # worker process mapping the same export shares one physical copy
+        table = cls.__new__(cls)
+        with open(os.path.join(directory, "meta.json")) as f:
+            meta = json.load(f)
+        for name in _ARRAY_FIELDS:
+            array = np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r" if mmap else None)
+            setattr(table, name, np.asarray(array))
+        table.feature_names = meta["feature_names"]
+        table.objective = meta["objective"]
+        table.average_output = meta["average_output"]
+        table.max_depth = meta["max_depth"]
+        table.metadata = meta
+        table.engine = engine
+        table._raw_predict = _numba_raw_predict() if engine == "numba" else None
+        return table
+
+    def _numpy_raw_predict(self, X):
+        n = X.shape[0]
+        rows = np.arange(n)[:, None]
+        nodes = np.broadcast_to(self.roots, (n, len(self.roots))).copy()
+
+        for _ in range(self.max_depth):
+            feature = self.feature[nodes]
+            fval = X[rows, np.maximum(feature, 0)]
+            missing_type = self.missing_type[nodes]
+
+            is_nan = np.isnan(fval)
+            fval = np.where(is_nan & (missing_type != MISSING_NAN), 0.0, fval)
+            use_default = ((missing_type == MISSING_ZERO) & (np.abs(fval) <= _ZERO_THRESHOLD)) | (
+                (missing_type == MISSING_NAN) & is_nan
+            )
+            go_left = np.where(use_default, self.default_left[nodes], fval <= self.threshold[nodes])
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+
+        # cumsum adds trees in order, matching LightGBM's sequential accumulation
+        return np.cumsum(self.value[nodes], axis=1)[:, -1]
+
+    def predict(self, X):
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        if X.shape[0] == 0:
+            return np.zeros(0, dtype=np.float64)
+
+        if self._raw_predict is not None:
+            raw = self._raw_predict(
+                X, self.roots, self.feature, self.threshold, self.left, self.right,
+                self.default_left, self.missing_type, self.value,
+            )
+        else:
+            raw = self._numpy_raw_predict(X)
+
+        if self.average_output:
+            raw = raw / len(self.roots)
+        return self._transform(raw)
+
+    def _transform(self, raw):
+        name = self.objective[0] if self.objective else "regression"
+        if name in ("regression", "regression_l1", "huber", "fair", "quantile", "mape"):
+            return raw
+        if name == "binary":
+            sigmoid = 1.0
+            for param in self.objective[1:]:
+                if param.startswith("sigmoid:"):
+                    sigmoid = float(param.split(":", 1)[1])
+            return 1.0 / (1.0 + np.exp(-sigmoid * raw))
+        raise ValueError(f"Compiled scorer does not support objective: {' '.join(self.objective)}")
+
+
+_numba_kernel = None
+
+def _numba_raw_predict():
+    # Compiled lazily so numba stays an optional dependency
+    global _numba_kernel
+    if _numba_kernel is not None:
+        return _numba_kernel
+
+    import numba
+
+    @numba.njit(cache=False, nogil=True)
+    def raw_predict(X, roots, feature, threshold, left, right, default_left, missing_type, value):
+        out = np.zeros(X.shape[0], dtype=np.float64)
+        for i in range(X.shape[0]):
+            total = 0.0
+            for t in range(roots.shape[0]):
+                node = roots[t]
+                while feature[node] >= 0:
+                    fval = X[i, feature[node]]
+                    mtype = missing_type[node]
+                    if math.isnan(fval) and mtype != MISSING_NAN:
+                        fval = 0.0
+                    if (mtype == MISSING_ZERO and abs(fval) <= _ZERO_THRESHOLD) or (
+                        mtype == MISSING_NAN and math.isnan(fval)
+                    ):
+                        go_left = default_left[node]
+                    else:
+                        go_left = fval <= threshold[node]
+                    node = left[node] if go_left else right[node]
+                total += value[node]
+            out[i] = total
+        return out
+
+    _numba_kernel = raw_predict
+    return raw_predict
+
+
+def resolve_engine(engine="auto"):
+    # engine: "numba", "numpy", or "auto" (numba when importable)
+    if engine == "auto":
+        try:
+            import numba  # noqa: F401
+            return "numba"
+        except ImportError:
+            return "numpy"
+    return engine
+
+
+def compile_booster(booster, engine="auto"):
+    return CompiledTreeEnsemble.from_booster(booster, engine=resolve_engine(engine))
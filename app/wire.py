@@ -0,0 +1,113 @@
+import calendar
+from datetime import datetime
+import numpy as np
+from .batch_features import PostTable
+
+try:
+    import msgpack
+except ImportError:  # optional: only needed for the binary /rank-feed format
+    msgpack = None
+
+# Columnar MessagePack request body for /rank-feed:
+# {
+#   "user_id": str, "user_profile": {...}, "top_k": int | None, "offset": int,
+#   "posts": {
+#     "post_id": [str], "author_id": [str], "karma": [int],
+#     "created_at": [epoch seconds, UTC],
+#     "content_types": [str], "content_type": [code into content_types],
+#     "tags": [str], "tag_codes": [code into tags], "tag_offsets": [n + 1 offsets into tag_codes]
+#   }
+# }
+MSGPACK_CONTENT_TYPES = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+
+
+def is_msgpack(content_type):
+    return (content_type or "").split(";")[0].strip().lower() in MSGPACK_CONTENT_TYPES
+
+
+def _require_msgpack():
+    if msgpack is None:
+        raise RuntimeError("msgpack is not installed; binary /rank-feed requests are unavailable")
+
+
+def posts_to_columns(posts):
+    # Client-side encoder from the JSON post dicts to the columnar layout
+    content_types, tags = {}, {}
+    content_type_codes = [content_types.setdefault(post["content_type"], len(content_types)) for post in posts]
+    tag_codes, tag_offsets = [], [0]
+    for post in posts:
+        for tag in post["tags"]:
+            tag_codes.append(tags.setdefault(tag, len(tags)))
+        tag_offsets.append(len(tag_codes))
+    return {
+        "post_id": [post["post_id"] for post in posts],
+        "author_id": [post["author_id"] for post in posts],
+        "karma": [post["karma"] for post in posts],
+        "created_at": [
+            calendar.timegm(datetime.strptime(post["created_at"], "%Y-%m-%dT%H:%M:%SZ").utctimetuple())
+            for post in posts
+        ],
+        "content_types": list(content_types),
+        "content_type": content_type_codes,
+        "tags": list(tags),
+        "tag_codes": tag_codes,
+        "tag_offsets": tag_offsets,
+    }
+
+
+def encode_rank_request(user_id, user_profile, posts, top_k=None, offset=0):
+    _require_msgpack()
+    return msgpack.packb({
+        "user_id": user_id,
+        "user_profile": user_profile,
+        "posts": posts_to_columns(posts),
+        "top_k": top_k,
+        "offset": offset,
+    })
+
+
+def decode_msgpack(body):
+    # Raises ValueError with a readable message for any malformed body
+    _require_msgpack()
+    try:
+        return msgpack.unpackb(body, raw=False)
+    except (ValueError, msgpack.UnpackException) as e:
+        raise ValueError(f"Invalid MessagePack body: {str(e) or type(e).__name__}") from e
+
+
+def _int64_column(columns, name):
+    try:
+        return np.asarray(columns[name], dtype=np.int64)
+    except OverflowError:
+        raise ValueError(f"posts.{name} has values outside the 64-bit integer range") from None
+
+
+def table_from_columns(columns):
+    # Structural checks the type schema cannot express; raises ValueError
+    n = len(columns["post_id"])
+    for name in ("author_id", "karma", "created_at", "content_type"):
+        if len(columns[name]) != n:
+            raise ValueError(f"posts.{name} has {len(columns[name])} entries, expected {n}")
+
+    created_at = _int64_column(columns, "created_at")
+    offsets = _int64_column(columns, "tag_offsets")
+    if len(offsets) != n + 1 or offsets[0] != 0 or np.any(np.diff(offsets) < 0) \
+            or offsets[-1] != len(columns["tag_codes"]):
+        raise ValueError("posts.tag_offsets must be n + 1 non-decreasing offsets from 0 to len(tag_codes)")
+
+    for codes, dictionary in (("content_type", "content_types"), ("tag_codes", "tags")):
+        values = _int64_column(columns, codes)
+        if len(values) and (values.min() < 0 or values.max() >= len(columns[dictionary])):
+            raise ValueError(f"posts.{codes} contains codes outside posts.{dictionary}")
+
+    return PostTable.from_columns(
+        post_ids=columns["post_id"],
+        author_ids=columns["author_id"],
+        karma=columns["karma"],
+        created_at=created_at,
+        content_types=columns["content_types"],
+        content_type_codes=columns["content_type"],
+        tags=columns["tags"],
+        tag_codes=columns["tag_codes"],
+        tag_offsets=offsets,
+    )
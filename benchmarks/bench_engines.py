@@ -0,0 +1,126 @@
+import argparse
+import ast
+import json
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from benchmarks.loadgen import ROOT_DIR
+from pipeline import engines, stages
+
+# Row-wise apply() vs the vectorized engines (pipeline/engines.py and the
+# time match kernel in app/time_match.py) on a synthetic dataset shaped like
+# scored_posts_with_users; every comparison also checks that both produce
+# bit-for-bit identical output.
+RESULTS_DIR = os.path.join(ROOT_DIR, "benchmarks", "results")
+TIME_SLOTS = ["06:00-09:00", "08:00-11:00", "12:00-14:00", "17:00-19:00", "20:00-23:00", "22:00-02:00"]
+
+
+def make_frame(n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "Likes": rng.integers(0, 700, n_rows),
+        "Comments": rng.integers(0, 150, n_rows),
+        "Shares": rng.integers(0, 150, n_rows),
+        "Impressions": rng.integers(0, 15000, n_rows),
+        "Reach": rng.integers(0, 15000, n_rows),
+        "Engagement Rate": np.round(rng.uniform(0, 120, n_rows), 2),
+        "Sentiment": rng.choice(["Positive", "Neutral", "Negative", "Mixed"], n_rows),
+        "Post Type": rng.choice(["Video", "Image", "Text", "Link"], n_rows),
+        "time_match_score": np.round(rng.random(n_rows), 2),
+        "is_buddy_post": rng.random(n_rows) < 0.4,
+        "user_follows_tag": rng.random(n_rows) < 0.5,
+        "relevance_score": rng.random(n_rows),
+    })
+    df["karma"] = engines.karma_scores(df)
+    return df
+
+
+def make_time_match_inputs(n_rows, n_users=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    users = pd.DataFrame({
+        "user_id": [f"stu_{i:04d}" for i in range(n_users)],
+        "active_hours": [json.dumps(list(rng.choice(TIME_SLOTS, size=2, replace=False))) for _ in range(n_users)],
+    })
+    posts = pd.DataFrame({
+        "user_id": rng.choice(users["user_id"], n_rows),
+        "Time": [f"{h:02d}:{m:02d}:00" for h, m in zip(rng.integers(0, 24, n_rows), rng.integers(0, 60, n_rows))],
+    })
+    return posts, users
+
+
+def row_wise_time_match(posts, users):
+    # What generate_time_match_score.py did before the shared kernel
+    merged_df = posts.merge(users[["user_id", "active_hours"]], on="user_id", how="left")
+    merged_df["active_hours"] = merged_df["active_hours"].apply(ast.literal_eval)
+    return merged_df.apply(lambda row: stages.compute_time_match_score(row["Time"], row["active_hours"]), axis=1)
+
+
+def timed(fn, repeat):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def identical(expected, actual):
+    expected, actual = np.asarray(expected), np.asarray(actual)
+    if expected.dtype.kind == "f":
+        return bool(np.array_equal(expected.view(np.int64), actual.astype(np.float64).view(np.int64)))
+    return expected.tolist() == actual.tolist()
+
+
+def bench(df, repeat, seed=0):
+    posts, users = make_time_match_inputs(len(df), seed=seed)
+    cases = [
+        ("karma", lambda: df.apply(stages.compute_karma, axis=1), lambda: engines.karma_scores(df)),
+        ("karma_bucket", lambda: df["karma"].apply(stages.assign_karma_bucket), lambda: engines.karma_buckets(df["karma"])),
+        ("target_label", lambda: df.apply(stages.compute_target_label, axis=1), lambda: engines.target_labels(df)),
+        ("karma_level", lambda: df["karma"].apply(stages.karma_level), lambda: engines.karma_levels(df["karma"])),
+        ("time_match", lambda: row_wise_time_match(posts, users),
+         lambda: stages.add_time_match_score(posts, users)["time_match_score"]),
+    ]
+    rows = []
+    for name, row_wise, vectorized in cases:
+        apply_seconds, expected = timed(row_wise, 1)
+        vector_seconds, actual = timed(vectorized, repeat)
+        rows.append({
+            "engine": name,
+            "rows": len(df),
+            "apply_s": round(apply_seconds, 4),
+            "vectorized_s": round(vector_seconds, 4),
+            "speedup": round(apply_seconds / vector_seconds, 1),
+            "identical": identical(expected, actual),
+        })
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark apply()-based vs vectorized karma/label/time match engines")
+    parser.add_argument("--rows", default="10000,100000", help="Comma-separated dataset sizes")
+    parser.add_argument("--repeat", type=int, default=5, help="Vectorized runs per case (best is kept)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="Results JSON (default: benchmarks/results/engines-<timestamp>.json)")
+    args = parser.parse_args()
+
+    results = []
+    for n_rows in [int(n) for n in args.rows.split(",")]:
+        print(f"⚡ {n_rows} rows...")
+        results.extend(bench(make_frame(n_rows, seed=args.seed), args.repeat, seed=args.seed))
+
+    print(f"{'engine':<14}{'rows':>9}{'apply s':>10}{'vector s':>10}{'speedup':>9}  identical")
+    for row in results:
+        print(f"{row['engine']:<14}{row['rows']:>9}{row['apply_s']:>10}{row['vectorized_s']:>10}{row['speedup']:>9}  {row['identical']}")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"engines-{time.strftime('%Y%m%dT%H%M%S')}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({"settings": vars(args), "results": results}, f, indent=2)
+    print(f"✅ Results saved to {output}")
+    if not all(row["identical"] for row in results):
+        sys.exit(1)
@@ -0,0 +1,232 @@
+import argparse
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from benchmarks.loadgen import ROOT_DIR, get_profiles, make_requests
+
+# Serving benchmark: latency percentiles and throughput of ranker.rank_posts
+# (in-process) and POST /rank-feed (HTTP, local uvicorn) per candidate-list size.
+# Results are written as JSON and compared against a stored baseline.
+DEFAULT_SIZES = [10, 100, 1000, 10000, 50000]
+DEFAULT_BASELINE = os.path.join(ROOT_DIR, "benchmarks", "baseline.json")
+RESULTS_DIR = os.path.join(ROOT_DIR, "benchmarks", "results")
+
+
+def summarize(mode, n_posts, latencies, elapsed):
+    latencies_ms = np.asarray(latencies) * 1000.0
+    return {
+        "mode": mode,
+        "posts": n_posts,
+        "requests": len(latencies),
+        "mean_ms": round(float(latencies_ms.mean()), 3),
+        "p50_ms": round(float(np.percentile(latencies_ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(latencies_ms, 95)), 3),
+        "p99_ms": round(float(np.percentile(latencies_ms, 99)), 3),
+        "rps": round(len(latencies) / elapsed, 2),
+        "posts_per_s": round(len(latencies) * n_posts / elapsed, 1),
+    }
+
+
+def timed_loop(call, n_items, warmup, min_time, max_iterations):
+    # Calls call(i) until min_time has passed (at least 3 times, at most max_iterations)
+    for i in range(warmup):
+        call(i % n_items)
+    latencies = []
+    started = time.perf_counter()
+    while len(latencies) < max_iterations and (len(latencies) < 3 or time.perf_counter() - started < min_time):
+        t0 = time.perf_counter()
+        call(len(latencies) % n_items)
+        latencies.append(time.perf_counter() - t0)
+    return latencies, time.perf_counter() - started
+
+
+def bench_inprocess(requests, args):
+    from app import ranker
+
+    def call(i):
+        request = requests[i]
+        ranker.rank_posts(request["user_id"], request["posts"], request["user_profile"], top_k=request.get("top_k"))
+
+    return timed_loop(call, len(requests), args.warmup, args.min_time, args.max_iterations)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port, workers=1, log_level="warning"):
+    # Local uvicorn serving main:app; returns once /stats/model reports a loaded model
+    import httpx
+
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", log_level],
+        cwd=ROOT_DIR,
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("uvicorn exited during startup")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/stats/model", timeout=1.0).json().get("loaded"):
+                return process
+        except (httpx.HTTPError, ValueError):
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("uvicorn did not become ready within 60s")
+
+
+def stop_server(process):
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def bench_http(client, url, requests, args):
+    bodies = [json.dumps(request).encode("utf-8") for request in requests]
+    headers = {"Content-Type": "application/json"}
+
+    def call(i):
+        response = client.post(url, content=bodies[i], headers=headers)
+        response.raise_for_status()
+
+    return timed_loop(call, len(bodies), args.warmup, args.min_time, args.max_iterations)
+
+
+def compare(results, baseline, tolerance):
+    # Regressions: latency up or throughput down by more than `tolerance` (fraction)
+    previous = {(row["mode"], row["posts"]): row for row in baseline.get("results", [])}
+    regressions = []
+    for row in results:
+        base = previous.get((row["mode"], row["posts"]))
+        if base is None:
+            continue
+        for metric in ("p50_ms", "p95_ms", "p99_ms"):
+            if base[metric] > 0 and row[metric] > base[metric] * (1 + tolerance):
+                regressions.append({**_key(row), "metric": metric, "baseline": base[metric], "current": row[metric]})
+        if row["rps"] < base["rps"] / (1 + tolerance):
+            regressions.append({**_key(row), "metric": "rps", "baseline": base["rps"], "current": row["rps"]})
+    return regressions
+
+
+def _key(row):
+    return {"mode": row["mode"], "posts": row["posts"]}
+
+
+def run_metadata():
+    from app import ranker
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, capture_output=True, text=True
+        ).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "model_type": ranker.model_type,
+        "micro_batching": ranker.micro_batching_enabled,
+        "score_cache": ranker.score_cache is not None,
+    }
+
+
+def print_table(results):
+    print(f"{'mode':<10}{'posts':>8}{'reqs':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>10}{'posts/s':>12}")
+    for row in results:
+        print(f"{row['mode']:<10}{row['posts']:>8}{row['requests']:>7}{row['p50_ms']:>10}{row['p95_ms']:>10}"
+              f"{row['p99_ms']:>10}{row['rps']:>10}{row['posts_per_s']:>12}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark rank_posts and /rank-feed")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="Comma-separated posts per request")
+    parser.add_argument("--modes", default="inprocess,http", help="inprocess and/or http")
+    parser.add_argument("--profiles", type=int, default=200, help="Distinct user profiles to sample")
+    parser.add_argument("--distinct-requests", type=int, default=8, help="Distinct request bodies per size (reused cyclically)")
+    parser.add_argument("--top-k", type=int, default=None, help="top_k sent with each request")
+    parser.add_argument("--warmup", type=int, default=3, help="Untimed requests per size")
+    parser.add_argument("--min-time", type=float, default=2.0, help="Seconds measured per size and mode")
+    parser.add_argument("--max-iterations", type=int, default=2000, help="Upper bound of timed requests per size")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="Results JSON (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Also store this run as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed relative slowdown before flagging")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit with status 1 on regressions")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    modes = [mode.strip() for mode in args.modes.split(",")]
+    profiles = get_profiles(args.profiles, seed=args.seed)
+    print(f"📂 {len(profiles)} profiles, sizes {sizes}, modes {modes}")
+
+    results = []
+    server = client = None
+    try:
+        if "http" in modes:
+            import httpx
+
+            port = free_port()
+            print(f"🚀 Starting uvicorn on 127.0.0.1:{port}...")
+            server = start_server(port)
+            client = httpx.Client(timeout=120.0)
+
+        for n_posts in sizes:
+            requests = make_requests(
+                min(args.distinct_requests, len(profiles)), n_posts, profiles, seed=args.seed + n_posts, top_k=args.top_k
+            )
+            if "inprocess" in modes:
+                results.append(summarize("inprocess", n_posts, *bench_inprocess(requests, args)))
+                print(f"  → inprocess {n_posts} posts: p50 {results[-1]['p50_ms']} ms")
+            if "http" in modes:
+                results.append(summarize("http", n_posts, *bench_http(client, f"http://127.0.0.1:{port}/rank-feed", requests, args)))
+                print(f"  → http {n_posts} posts: p50 {results[-1]['p50_ms']} ms")
+    finally:
+        if client is not None:
+            client.close()
+        if server is not None:
+            stop_server(server)
+
+    report = {"meta": run_metadata(), "settings": vars(args), "results": results}
+    print_table(results)
+
+    regressions = []
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        report["baseline"] = args.baseline
+        report["regressions"] = regressions
+        for regression in regressions:
+            print(f"⚠️ {regression['mode']} {regression['posts']} posts: {regression['metric']} "
+                  f"{regression['baseline']} → {regression['current']}")
+        if not regressions:
+            print(f"✅ No regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{time.strftime('%Y%m%dT%H%M%S')}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Results saved to {output}")
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Baseline saved to {args.baseline}")
+
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
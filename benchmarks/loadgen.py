@@ -0,0 +1,82 @@
+import json
+import os
+import random
+
+import pandas as pd
+
+# Synthetic /rank-feed requests: profiles follow the simulated_users.csv schema
+# (sampled from the file when it exists), posts mix the vocabulary of the
+# profiles with the tags / content types of the ranker.main() sample posts
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+USERS_PATH = os.path.join(ROOT_DIR, "data", "intermediate", "simulated_users.csv")
+LIST_COLUMNS = ["branches_of_interest", "tags_followed", "active_hours", "buddies"]
+
+BRANCHES = ["AI", "CSE", "DS", "ECE", "IT", "Mech"]
+PROFILE_TAGS = ["career", "internships", "python", "ML", "startups", "events", "coding", "design", "clubs", "project"]
+SAMPLE_POST_TAGS = ["ai", "ml", "coding", "events", "fest", "python", "travel", "food", "sports", "ds", "random"]
+ACTIVE_HOURS = ["06:00-09:00", "08:00-11:00", "12:00-14:00", "17:00-19:00", "20:00-23:00"]
+CONTENT_TYPES = ["text", "image", "video"]
+
+
+def load_profiles(users_path=USERS_PATH, limit=None):
+    # [(user_id, user_profile)] from the simulated users file
+    users_df = pd.read_csv(users_path, nrows=limit)
+    for col in LIST_COLUMNS:
+        users_df[col] = users_df[col].apply(json.loads)
+    return [
+        (row["user_id"], {col: row[col] for col in LIST_COLUMNS})
+        for row in users_df.to_dict("records")
+    ]
+
+
+def synthetic_profiles(n, seed=0):
+    # Same schema as simulated_users.csv, for when the file is not available
+    rng = random.Random(seed)
+    return [
+        (f"stu_{i + 1:04d}", {
+            "branches_of_interest": rng.sample(BRANCHES, rng.randint(1, 2)),
+            "tags_followed": rng.sample(PROFILE_TAGS, rng.randint(2, 5)),
+            "active_hours": rng.sample(ACTIVE_HOURS, 2),
+            "buddies": [f"stu_{rng.randint(1, 5000):04d}" for _ in range(2)],
+        })
+        for i in range(n)
+    ]
+
+
+def get_profiles(n, seed=0, users_path=USERS_PATH):
+    if os.path.exists(users_path):
+        profiles = load_profiles(users_path)
+        return random.Random(seed).sample(profiles, min(n, len(profiles)))
+    return synthetic_profiles(n, seed=seed)
+
+
+def make_posts(n, rng, user_profile=None, buddy_rate=0.05):
+    # Candidate posts in the /rank-feed schema. A share of authors are the
+    # user's buddies so all feature paths are exercised.
+    buddies = (user_profile or {}).get("buddies") or []
+    tags = PROFILE_TAGS + SAMPLE_POST_TAGS
+    posts = []
+    for i in range(n):
+        author = rng.choice(buddies) if buddies and rng.random() < buddy_rate else f"stu_{rng.randint(1, 5000):04d}"
+        posts.append({
+            "post_id": f"p{i + 1}",
+            "author_id": author,
+            "tags": rng.sample(tags, rng.randint(1, 3)),
+            "content_type": rng.choice(CONTENT_TYPES),
+            "karma": rng.randint(0, 100),
+            "created_at": f"2025-05-{rng.randint(19, 31):02d}T{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:00Z",
+        })
+    return posts
+
+
+def make_requests(n_requests, n_posts, profiles, seed=0, top_k=None):
+    # n_requests /rank-feed bodies of n_posts posts each, cycling through profiles
+    rng = random.Random(seed)
+    requests = []
+    for i in range(n_requests):
+        user_id, user_profile = profiles[i % len(profiles)]
+        request = {"user_id": user_id, "user_profile": user_profile, "posts": make_posts(n_posts, rng, user_profile)}
+        if top_k is not None:
+            request["top_k"] = top_k
+        requests.append(request)
+    return requests
@@ -0,0 +1,164 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from benchmarks.loadgen import ROOT_DIR, get_profiles, make_requests
+from benchmarks.bench_serving import free_port, run_metadata, start_server, stop_server
+
+# Open-loop load test: requests are fired on a fixed schedule (constant or
+# Poisson arrivals) whether or not earlier ones have finished, against a local
+# uvicorn started per worker count. Latency is measured from the scheduled send
+# time, so client-side queueing at saturation is included rather than hidden.
+RESULTS_DIR = os.path.join(ROOT_DIR, "benchmarks", "results")
+
+
+def arrival_times(rate, duration, arrivals, rng):
+    # Send offsets in seconds from the start of the run
+    if arrivals == "constant":
+        return np.arange(0.0, duration, 1.0 / rate)
+    gaps = rng.exponential(1.0 / rate, size=int(rate * duration * 1.5) + 10)
+    times = np.cumsum(gaps)
+    return times[times < duration]
+
+
+async def fire(client, url, body, scheduled, started, timeout):
+    # Returns (latency from scheduled time, send lag, error or None)
+    sent = time.perf_counter()
+    try:
+        response = await client.post(url, content=body, headers={"Content-Type": "application/json"}, timeout=timeout)
+        error = None if response.status_code == 200 else f"http_{response.status_code}"
+    except Exception as e:
+        error = type(e).__name__
+    done = time.perf_counter()
+    return done - (started + scheduled), sent - (started + scheduled), error
+
+
+async def run_rate(url, bodies, rate, duration, arrivals, timeout, max_connections, seed):
+    import httpx
+
+    schedule = arrival_times(rate, duration, arrivals, np.random.default_rng(seed))
+    limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+    async with httpx.AsyncClient(limits=limits) as client:
+        tasks = []
+        started = time.perf_counter()
+        for i, offset in enumerate(schedule):
+            delay = started + offset - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(fire(client, url, bodies[i % len(bodies)], offset, started, timeout)))
+        outcomes = await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+    return summarize(rate, outcomes, elapsed, duration)
+
+
+def summarize(rate, outcomes, elapsed, duration):
+    latencies = np.array([latency for latency, _, error in outcomes if error is None]) * 1000.0
+    lags = np.array([lag for _, lag, _ in outcomes]) * 1000.0
+    errors = {}
+    for _, _, error in outcomes:
+        if error is not None:
+            errors[error] = errors.get(error, 0) + 1
+    n_errors = sum(errors.values())
+
+    def percentile(q):
+        return round(float(np.percentile(latencies, q)), 3) if len(latencies) else None
+
+    return {
+        "offered_rps": rate,
+        # Poisson arrivals only average out to the offered rate
+        "sent_rps": round(len(outcomes) / duration, 2),
+        "sent": len(outcomes),
+        "ok": len(outcomes) - n_errors,
+        "errors": errors,
+        "error_rate": round(n_errors / len(outcomes), 4) if outcomes else 0.0,
+        "achieved_rps": round((len(outcomes) - n_errors) / elapsed, 2) if elapsed else 0.0,
+        "drain_seconds": round(elapsed - duration, 3),
+        "p50_ms": percentile(50),
+        "p90_ms": percentile(90),
+        "p99_ms": percentile(99),
+        "max_ms": round(float(latencies.max()), 3) if len(latencies) else None,
+        # Late sends mean the load generator itself could not keep up
+        "p99_send_lag_ms": round(float(np.percentile(lags, 99)), 3) if len(lags) else None,
+    }
+
+
+def find_knee(rows, latency_factor=3.0, max_error_rate=0.01, min_throughput_ratio=0.9):
+    # Highest offered rate before latency, errors or throughput break down:
+    # p99 above latency_factor x the lowest-rate p99, error rate above
+    # max_error_rate, or achieved throughput below min_throughput_ratio x the sent rate
+    rows = sorted(rows, key=lambda row: row["offered_rps"])
+    if not rows:
+        return None
+    base_p99 = rows[0]["p99_ms"]
+    knee = None
+    for row in rows:
+        saturated = (
+            row["p99_ms"] is None
+            or (base_p99 and row["p99_ms"] > latency_factor * base_p99)
+            or row["error_rate"] > max_error_rate
+            or row["achieved_rps"] < min_throughput_ratio * row["sent_rps"]
+        )
+        if saturated:
+            return {"knee_rps": knee, "saturated_at_rps": row["offered_rps"]}
+        knee = row["offered_rps"]
+    return {"knee_rps": knee, "saturated_at_rps": None}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Open-loop HTTP load test of /rank-feed on localhost")
+    parser.add_argument("--rates", default="100,500,1000", help="Comma-separated offered request rates (req/s)")
+    parser.add_argument("--workers", default="1", help="Comma-separated uvicorn worker counts to sweep")
+    parser.add_argument("--arrivals", choices=["constant", "poisson"], default="poisson")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load per rate")
+    parser.add_argument("--posts", type=int, default=100, help="Posts per request")
+    parser.add_argument("--distinct-requests", type=int, default=32, help="Distinct request bodies (reused cyclically)")
+    parser.add_argument("--top-k", type=int, default=20)
+    parser.add_argument("--timeout", type=float, default=10.0, help="Per-request timeout in seconds (counted as an error)")
+    parser.add_argument("--max-connections", type=int, default=1000)
+    parser.add_argument("--cooldown", type=float, default=2.0, help="Pause between rates")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="Results JSON (default: benchmarks/results/loadtest-<timestamp>.json)")
+    args = parser.parse_args()
+
+    rates = [float(rate) for rate in args.rates.split(",")]
+    worker_counts = [int(workers) for workers in args.workers.split(",")]
+    profiles = get_profiles(args.distinct_requests, seed=args.seed)
+    bodies = [
+        json.dumps(request).encode("utf-8")
+        for request in make_requests(args.distinct_requests, args.posts, profiles, seed=args.seed, top_k=args.top_k)
+    ]
+    print(f"📂 {len(bodies)} request bodies of {args.posts} posts, {args.arrivals} arrivals")
+
+    sweeps = []
+    for workers in worker_counts:
+        port = free_port()
+        print(f"🚀 Starting uvicorn with {workers} worker(s) on 127.0.0.1:{port}...")
+        server = start_server(port, workers=workers)
+        rows = []
+        try:
+            for rate in rates:
+                row = asyncio.run(run_rate(
+                    f"http://127.0.0.1:{port}/rank-feed", bodies, rate, args.duration, args.arrivals,
+                    args.timeout, args.max_connections, args.seed,
+                ))
+                rows.append(row)
+                print(f"  → {workers}w @ {rate:g} rps: achieved {row['achieved_rps']} rps, "
+                      f"p50 {row['p50_ms']} ms, p99 {row['p99_ms']} ms, errors {row['error_rate']:.2%}")
+                time.sleep(args.cooldown)
+        finally:
+            stop_server(server)
+        knee = find_knee(rows)
+        print(f"📈 {workers} worker(s): knee at {knee['knee_rps']} rps (saturated at {knee['saturated_at_rps']})")
+        sweeps.append({"workers": workers, "knee": knee, "rates": rows})
+
+    report = {"meta": run_metadata(), "settings": vars(args), "sweeps": sweeps}
+    output = args.output or os.path.join(RESULTS_DIR, f"loadtest-{time.strftime('%Y%m%dT%H%M%S')}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Results saved to {output}")
@@ -0,0 +1,20 @@
+# Multi-worker serving with one shared copy of the model:
+#   gunicorn -c gunicorn.conf.py main:app
+#
+# preload_app imports main:app (and loads the model) in the master before
+# forking, so workers share the model pages copy-on-write. With a
+# "*_compiled" model_type the flattened trees are additionally exported to
+# shared_model_dir and memory-mapped read-only, which keeps them shared even
+# after a hot reload in a worker.
+import os
+
+bind = os.environ.get("BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("WEB_CONCURRENCY", "4"))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+
+
+def on_starting(server):
+    from app import ranker
+    ranker.registry.get()
+    server.log.info(f"Model preloaded in master: {ranker.registry.stats()}")
@@ -1,11 +1,30 @@
-from fastapi import FastAPI
-from pydantic import BaseModel, Field
-from typing import List, Dict, Any
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import FileResponse, PlainTextResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError, model_validator
+from typing import List, Dict, Any, Literal, Optional
+from typing_extensions import Annotated, NotRequired, TypedDict
+from contextlib import asynccontextmanager
 import json
-from app import ranker
+import os
+from app import ranker, streaming, wire
 
+try:
+    import orjson
+except ImportError:  # optional: fall back to the standard library encoder
+    orjson = None
 
-app = FastAPI(title="Feed Ranking API", version="1.0")
+
+@asynccontextmanager
+async def lifespan(app):
+    # Load the model in the background so the first request does not pay for
+    # it, and keep watching the model file for hot reloads
+    ranker.registry.start_background(warm_up=True)
+    yield
+    ranker.registry.stop()
+
+app = FastAPI(title="Feed Ranking API", version="1.0", lifespan=lifespan)
 
 # -------------------- Pydantic Models -------------------- #
 
@@ -27,6 +46,8 @@ class RankRequest(BaseModel):
     user_id: str
     user_profile: UserProfile
     posts: List[PostInput]
+    top_k: Optional[int] = Field(None, ge=1, description="Return only the first top_k ranked posts")
+    offset: int = Field(0, ge=0, description="Number of ranked posts to skip before top_k")
 
 class RankedPost(BaseModel):
     post_id: str
@@ -37,6 +58,159 @@ class RankResponse(BaseModel):
     ranked_posts: List[RankedPost]
     status: str
 
+class BulkRankItem(BaseModel):
+    user_id: str
+    user_profile: UserProfile
+    posts: Optional[List[PostInput]] = Field(None, description="Omit to rank the shared candidate pool")
+
+class BulkRankRequest(BaseModel):
+    requests: List[BulkRankItem]
+    posts: Optional[List[PostInput]] = Field(None, description="Shared candidate pool for requests without posts")
+    top_k: Optional[int] = Field(None, ge=1)
+    offset: int = Field(0, ge=0)
+
+    @model_validator(mode="after")
+    def check_posts_available(self):
+        if self.posts is None and any(item.posts is None for item in self.requests):
+            raise ValueError("Each request needs posts unless a shared posts pool is given")
+        return self
+
+class BulkRankResponse(BaseModel):
+    results: List[RankResponse]
+
+class ProfileRequest(BaseModel):
+    requests: int = Field(0, ge=0, description="Profile the next N /rank-feed requests")
+    slow_ms: Optional[float] = Field(None, gt=0, description="Keep profiles of requests slower than this")
+    mode: Literal["cprofile", "sample"] = "cprofile"
+
+class SessionRankRequest(BaseModel):
+    user_id: str
+    user_profile: UserProfile
+    posts: Optional[List[PostInput]] = Field(None, description="Full candidate list; replaces the session's list")
+    added: List[PostInput] = Field([], description="New posts, or posts whose karma/fields changed")
+    removed: List[str] = Field([], description="post_ids to drop from the session")
+    top_k: Optional[int] = Field(None, ge=1)
+    offset: int = Field(0, ge=0)
+
+class SessionRankResponse(RankResponse):
+    session_size: int
+    scored_posts: int
+
+# -------------------- Fast-path Schemas -------------------- #
+# Same fields and constraints as RankRequest, validated straight from the raw
+# JSON body into plain dicts: no per-post model objects and no model_dump()
+
+class UserProfileDict(TypedDict):
+    branches_of_interest: List[str]
+    tags_followed: List[str]
+    buddies: List[str]
+    active_hours: List[str]
+
+class PostDict(TypedDict):
+    post_id: str
+    author_id: str
+    tags: List[str]
+    content_type: str
+    karma: int
+    created_at: str
+
+class RankRequestDict(TypedDict):
+    user_id: str
+    user_profile: UserProfileDict
+    posts: List[PostDict]
+    top_k: NotRequired[Optional[Annotated[int, Field(ge=1)]]]
+    offset: NotRequired[Annotated[int, Field(ge=0)]]
+
+class ColumnarPostsDict(TypedDict):
+    # Dictionary-encoded columns of the binary format (see app/wire.py)
+    post_id: List[str]
+    author_id: List[str]
+    karma: List[int]
+    created_at: List[int]
+    content_types: List[str]
+    content_type: List[int]
+    tags: List[str]
+    tag_codes: List[int]
+    tag_offsets: List[int]
+
+class ColumnarRankRequestDict(TypedDict):
+    user_id: str
+    user_profile: UserProfileDict
+    posts: ColumnarPostsDict
+    top_k: NotRequired[Optional[Annotated[int, Field(ge=1)]]]
+    offset: NotRequired[Annotated[int, Field(ge=0)]]
+
+class StreamHeaderDict(TypedDict):
+    # First line of a streaming (NDJSON) request, see app/streaming.py
+    user_id: str
+    user_profile: UserProfileDict
+    top_k: NotRequired[Optional[Annotated[int, Field(ge=1)]]]
+    offset: NotRequired[Annotated[int, Field(ge=0)]]
+
+rank_request_adapter = TypeAdapter(RankRequestDict)
+columnar_rank_request_adapter = TypeAdapter(ColumnarRankRequestDict)
+stream_header_adapter = TypeAdapter(StreamHeaderDict)
+post_adapter = TypeAdapter(PostDict)
+
+def _validation_error(e, *loc):
+    # Same 422 shape FastAPI produces for a declared body model
+    return RequestValidationError(
+        [{**error, "loc": ("body", *loc, *error["loc"])} for error in e.errors(include_url=False)]
+    )
+
+def parse_rank_request(body):
+    try:
+        return rank_request_adapter.validate_json(body)
+    except ValidationError as e:
+        raise _validation_error(e)
+
+def parse_columnar_rank_request(body):
+    # Binary body: posts are decoded straight into a PostTable, skipping per-post dicts
+    if wire.msgpack is None:
+        raise HTTPException(status_code=415, detail="Binary request bodies require msgpack")
+    try:
+        data = wire.decode_msgpack(body)
+    except ValueError as e:
+        raise RequestValidationError([{"type": "value_error", "loc": ("body",), "msg": str(e), "input": None}])
+    try:
+        payload = columnar_rank_request_adapter.validate_python(data)
+        payload["posts"] = wire.table_from_columns(payload["posts"])
+    except ValidationError as e:
+        raise _validation_error(e)
+    except ValueError as e:
+        raise RequestValidationError([{"type": "value_error", "loc": ("body", "posts"), "msg": str(e), "input": None}])
+    return payload
+
+def parse_stream_line(adapter, line, line_no):
+    # Errors point at the 1-based line of the NDJSON body
+    try:
+        return adapter.validate_json(line)
+    except ValidationError as e:
+        raise _validation_error(e, line_no)
+
+def dumps(content):
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, separators=(",", ":")).encode("utf-8")
+
+class FastJSONResponse(Response):
+    # Serializes the already well-typed ranker output directly, skipping
+    # response_model re-validation
+    media_type = "application/json"
+
+    def render(self, content):
+        return dumps(content)
+
+def ndjson_lines(result, lines_per_chunk=512):
+    # Summary line first, then one line per ranked post, written in small batches
+    yield dumps({key: value for key, value in result.items() if key != "ranked_posts"}) + b"\n"
+    ranked_posts = result["ranked_posts"]
+    for start in range(0, len(ranked_posts), lines_per_chunk):
+        yield b"".join(dumps(post) + b"\n" for post in ranked_posts[start:start + lines_per_chunk])
+
+rank_request_schema = RankRequest.model_json_schema(ref_template="#/components/schemas/{model}")
+rank_request_schema.pop("$defs", None)
+
 # -------------------- Endpoints -------------------- #
 @app.get("/")
 def read_root():
@@ -50,11 +224,181 @@ def health_check():
 def get_version():
     return {"version": app.version}
 
-@app.post("/rank-feed", response_model=RankResponse)
-def rank_feed(request: RankRequest):
-    result = ranker.rank_posts(
-        user_id=request.user_id,
-        posts=[post.model_dump() for post in request.posts],
-        user_profile=request.user_profile.model_dump()
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    # Prometheus text exposition format
+    model = ranker.registry.stats()
+    batching = ranker.micro_batcher.stats()
+    gauges = [
+        ("feed_metrics_enabled", "Whether per-stage request metrics are recorded.", ranker.metrics.enabled),
+        ("feed_model_loaded", "Whether a model version is loaded.", model["loaded"]),
+        ("feed_model_reloads", "Model hot reloads since start.", model["reloads"]),
+        ("feed_batcher_batches", "Micro-batches scored since start.", batching["batches"]),
+        ("feed_batcher_rows", "Rows scored through the micro-batcher since start.", batching["rows"]),
+        ("feed_batcher_avg_batch_rows", "Average rows per micro-batch.", batching["avg_batch_rows"]),
+        ("feed_profile_cache_hit_rate", "Compiled profile cache hit rate.", ranker.profile_cache.stats()["hit_rate"]),
+        ("feed_sessions", "Live incremental ranking sessions.", len(ranker.session_store.sessions)),
+    ]
+    if ranker.score_cache is not None:
+        cache = ranker.score_cache.stats()
+        gauges += [
+            ("feed_result_cache_hit_rate", "Request-level score cache hit rate.", cache["results"]["hit_rate"]),
+            ("feed_post_cache_hit_rate", "Per-post score cache hit rate.", cache["posts"]["hit_rate"]),
+        ]
+    return PlainTextResponse(ranker.metrics.render(gauges), media_type="text/plain; version=0.0.4")
+
+@app.get("/stats/model")
+def model_stats():
+    return ranker.registry.stats()
+
+@app.get("/stats/batching")
+def batching_stats():
+    return {"enabled": ranker.micro_batching_enabled, **ranker.micro_batcher.stats()}
+
+@app.get("/stats/cache")
+def cache_stats():
+    return {
+        "profiles": ranker.profile_cache.stats(),
+        "scores": ranker.score_cache.stats() if ranker.score_cache is not None else None,
+        "sessions": ranker.session_store.stats(),
+    }
+
+@app.post(
+    "/rank-feed",
+    response_model=RankResponse,
+    response_class=FastJSONResponse,
+    openapi_extra={"requestBody": {"content": {
+        "application/json": {"schema": rank_request_schema},
+        "application/msgpack": {"schema": {"type": "string", "format": "binary"}},
+        "application/x-ndjson": {"schema": {"type": "string", "format": "binary"}},
+    }, "required": True}},
+)
+async def rank_feed(request: Request):
+    # JSON by default; columnar MessagePack when sent as application/msgpack;
+    # streaming mode (NDJSON in and out) when sent as application/x-ndjson
+    if streaming.is_ndjson(request.headers.get("content-type")):
+        return await rank_feed_stream(request)
+    with ranker.metrics.stage("request"):
+        return await _rank_feed(request)
+
+async def _rank_feed(request):
+    body = await request.body()
+    with ranker.metrics.stage("parse"):
+        if wire.is_msgpack(request.headers.get("content-type")):
+            payload = parse_columnar_rank_request(body)
+        else:
+            payload = parse_rank_request(body)
+    kwargs = dict(
+        user_id=payload["user_id"],
+        posts=payload["posts"],
+        user_profile=payload["user_profile"],
+        top_k=payload.get("top_k"),
+        offset=payload.get("offset", 0)
+    )
+    # Micro-batched scoring shares predict calls across concurrent requests;
+    # otherwise the synchronous ranker runs on the threadpool as before.
+    # Profiled requests always take the synchronous path so the whole ranking
+    # call runs on one thread under the profiler.
+    capture = ranker.profiler.begin(request.headers)
+    if capture is not None:
+        result = await run_in_threadpool(ranker.profiler.run, capture, payload["user_id"], ranker.rank_posts, **kwargs)
+    elif ranker.micro_batching_enabled:
+        result = await ranker.rank_posts_async(**kwargs)
+    else:
+        result = await run_in_threadpool(ranker.rank_posts, **kwargs)
+    with ranker.metrics.stage("serialize"):
+        return FastJSONResponse(result)
+
+async def rank_feed_stream(request):
+    # The body is read incrementally and posts are scored in fixed-size chunks,
+    # so no full post list, feature matrix or score array is ever held
+    stream = None
+    line_no = 0
+    async for line in streaming.iter_lines(request.stream()):
+        line_no += 1
+        if stream is None:
+            header = parse_stream_line(stream_header_adapter, line, line_no)
+            stream = ranker.open_stream(
+                header["user_id"], header["user_profile"], top_k=header.get("top_k"), offset=header.get("offset", 0)
+            )
+        elif stream.add(parse_stream_line(post_adapter, line, line_no)):
+            await run_in_threadpool(stream.flush)
+
+    if stream is None:
+        raise RequestValidationError([{"type": "missing", "loc": ("body", 1), "msg": "Missing header line", "input": None}])
+    result = await run_in_threadpool(stream.finish)
+    ranker.metrics.observe_result(result["status"], result["total_posts"])
+    return StreamingResponse(ndjson_lines(result), media_type="application/x-ndjson")
+
+@app.post("/rank-feed/batch", response_model=BulkRankResponse)
+def rank_feed_batch(request: BulkRankRequest):
+    shared_posts = [post.model_dump() for post in request.posts] if request.posts is not None else None
+    results = ranker.rank_posts_bulk(
+        requests=[
+            {
+                "user_id": item.user_id,
+                "user_profile": item.user_profile.model_dump(),
+                "posts": [post.model_dump() for post in item.posts] if item.posts is not None else None
+            }
+            for item in request.requests
+        ],
+        shared_posts=shared_posts,
+        top_k=request.top_k,
+        offset=request.offset
     )
-    return result
+    return {"results": results}
+
+@app.post("/rank-feed/session", response_model=SessionRankResponse)
+def rank_feed_session(request: SessionRankRequest):
+    try:
+        return ranker.rank_session(
+            user_id=request.user_id,
+            user_profile=request.user_profile.model_dump(),
+            posts=[post.model_dump() for post in request.posts] if request.posts is not None else None,
+            added=[post.model_dump() for post in request.added],
+            removed=request.removed,
+            top_k=request.top_k,
+            offset=request.offset
+        )
+    except ranker.SessionLost:
+        # Expired or evicted: ranking the delta alone would silently drop the feed
+        raise HTTPException(
+            status_code=409,
+            detail=f"No feed session for user {request.user_id}; resend the full candidate list as posts"
+        )
+
+@app.delete("/rank-feed/session/{user_id}")
+def drop_feed_session(user_id: str):
+    if not ranker.session_store.drop(user_id):
+        raise HTTPException(status_code=404, detail=f"No feed session for user {user_id}")
+    return {"user_id": user_id, "status": "dropped"}
+
+# -------------------- Profiling (admin) -------------------- #
+def require_profiling_admin():
+    if not ranker.profiler.admin_enabled:
+        raise HTTPException(status_code=404, detail="Profiling admin endpoints are disabled")
+
+@app.get("/admin/profile")
+def profiling_status():
+    require_profiling_admin()
+    return ranker.profiler.stats()
+
+@app.post("/admin/profile")
+def start_profiling(request: ProfileRequest):
+    require_profiling_admin()
+    ranker.profiler.arm(requests=request.requests, slow_ms=request.slow_ms, mode=request.mode)
+    return ranker.profiler.stats()
+
+@app.delete("/admin/profile")
+def stop_profiling():
+    require_profiling_admin()
+    ranker.profiler.disarm()
+    return ranker.profiler.stats()
+
+@app.get("/admin/profile/{name}")
+def download_profile(name: str):
+    require_profiling_admin()
+    path = ranker.profiler.path(name)
+    if path is None or not os.path.exists(path):
+        raise HTTPException(status_code=404, detail=f"No profile named {name}")
+    return FileResponse(path, filename=name)
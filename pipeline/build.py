@@ -0,0 +1,64 @@
+from pipeline import stages
+from pipeline.dag import Pipeline, Stage
+from pipeline.dataset import write_dataset
+from pipeline.embeddings import DEFAULT_STORE_DIR
+
+# The Scripts/ chain as one DAG. Old order (each step re-reading and rewriting
+# the processed dataset): compute_relevance_score → combine_users_posts →
+# generate_time_match_score → create_karma → create_tag_followed →
+# create_tag_related_info → create_extra_features → create_interlinked_features
+# → compute_target_label → validate_heuristics.
+#
+# Stages and their inputs:
+#   raw_posts, users          source files (re-run when the file content changes)
+#   relevance                 raw_posts
+#   assigned                  relevance, users
+#   timed                     assigned, users
+#   karma                     timed
+#   tagged                    karma, users
+#   semantic, extra, labels   tagged (independent, run concurrently)
+#   interlinked               tagged, extra
+#   dataset                   tagged, semantic, extra, interlinked, labels
+#   write, heuristics         dataset
+DEFAULT_CACHE_DIR = ".pipeline_cache"
+
+
+def with_interlinked(tagged, extra):
+    return stages.interlinked_features(stages.assemble_dataset(tagged, extra))
+
+
+def write_outputs(df, path=stages.DATASET_PATH, partition_cols=None, csv_path=None):
+    write_dataset(df, path, partition_cols=partition_cols)
+    if csv_path:
+        write_dataset(df, csv_path)
+    return {"path": path, "csv_path": csv_path, "rows": len(df), "columns": len(df.columns)}
+
+
+def build_pipeline(cache_dir=DEFAULT_CACHE_DIR, max_workers=4, raw_path=stages.RAW_POSTS_PATH,
+                   users_path=stages.USERS_PATH, output_path=stages.DATASET_PATH, partition_cols=None,
+                   csv_path=None, seed=None, embedding_dir=DEFAULT_STORE_DIR, embedding_workers=1, log=print):
+    # seed=None keeps the unseeded user/author assignment of combine_users_posts;
+    # that stage is then not cached (its output would differ on every run)
+    return Pipeline([
+        Stage("raw_posts", stages.load_raw_posts, params={"path": raw_path}, files=[raw_path]),
+        Stage("users", stages.load_users, params={"path": users_path}, files=[users_path]),
+        Stage("relevance", stages.compute_relevance_score, inputs=["raw_posts"]),
+        Stage("assigned", stages.assign_users, inputs=["relevance", "users"], params={"seed": seed},
+              cacheable=seed is not None),
+        Stage("timed", stages.add_time_match_score, inputs=["assigned", "users"]),
+        Stage("karma", stages.add_karma, inputs=["timed"]),
+        # Both embedding stages share one store, so semantic re-encodes nothing
+        Stage("tagged", stages.add_user_follows_tag, inputs=["karma", "users"],
+              params={"store_dir": embedding_dir, "workers": embedding_workers}),
+        Stage("semantic", stages.semantic_tag_features, inputs=["tagged"],
+              params={"store_dir": embedding_dir, "workers": embedding_workers}),
+        # post_recency_hours is measured against the wall clock, so never reused
+        Stage("extra", stages.extra_features, inputs=["tagged"], cacheable=False),
+        Stage("interlinked", with_interlinked, inputs=["tagged", "extra"]),
+        Stage("labels", stages.target_label_features, inputs=["tagged"]),
+        # Same column order as the script chain; labels refills its inputs in place
+        Stage("dataset", stages.assemble_dataset, inputs=["tagged", "semantic", "extra", "interlinked", "labels"]),
+        Stage("write", write_outputs, inputs=["dataset"], cacheable=False,
+              params={"path": output_path, "partition_cols": partition_cols, "csv_path": csv_path}),
+        Stage("heuristics", stages.heuristics_report, inputs=["dataset"]),
+    ], cache_dir=cache_dir, max_workers=max_workers, log=log)
@@ -0,0 +1,256 @@
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import pandas as pd
+
+
+class PipelineError(RuntimeError):
+    def __init__(self, stage, error):
+        super().__init__(f"Stage '{stage}' failed: {error!r}")
+        self.stage = stage
+        self.error = error
+
+
+class Stage:
+    # One step of the pipeline: output = fn(*[inputs artifacts], **params).
+    # `files` are paths read by fn itself (source stages); their content is part
+    # of the cache key. Non-deterministic stages (wall clock, unseeded random)
+    # should be declared with cacheable=False.
+
+    def __init__(self, name, fn, inputs=(), files=(), params=None, cacheable=True):
+        self.name = name
+        self.fn = fn
+        self.inputs = tuple(inputs)
+        self.files = tuple(files)
+        self.params = dict(params or {})
+        self.cacheable = cacheable
+
+    def code_hash(self):
+        # Source of fn plus every function it calls from its own module (or via
+        # a module attribute, e.g. stages.add_karma), so editing a helper
+        # invalidates the stages that use it
+        digest = hashlib.sha256()
+        for fn in _called_functions(self.fn):
+            try:
+                digest.update(inspect.getsource(fn).encode("utf-8"))
+            except (OSError, TypeError):
+                digest.update(repr(fn).encode("utf-8"))
+        return digest.hexdigest()
+
+
+def _called_functions(fn):
+    seen, pending = [], [fn]
+    while pending:
+        current = pending.pop()
+        if current in seen or not inspect.isfunction(current):
+            continue
+        seen.append(current)
+        package = current.__module__.split(".")[0]
+        names = set()
+        codes = [current.__code__]
+        while codes:
+            code = codes.pop()
+            names.update(code.co_names)
+            codes.extend(const for const in code.co_consts if inspect.iscode(const))  # lambdas
+        # Functions captured by closures (wrappers, decorators)
+        pending.extend(cell.cell_contents for cell in current.__closure__ or () if inspect.isfunction(cell.cell_contents))
+        for name in names:
+            value = current.__globals__.get(name)
+            if inspect.isfunction(value) and value.__module__ == current.__module__:
+                pending.append(value)
+            elif inspect.ismodule(value) and value.__name__.split(".")[0] == package:
+                pending.extend(
+                    getattr(value, attr) for attr in names
+                    if inspect.isfunction(getattr(value, attr, None)) and getattr(value, attr).__module__ == value.__name__
+                )
+    return seen
+
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_value(value):
+    # Content hash of an artifact (column names, dtypes and values for frames)
+    digest = hashlib.sha256()
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        columns = list(value.columns) if isinstance(value, pd.DataFrame) else [value.name]
+        dtypes = list(value.dtypes) if isinstance(value, pd.DataFrame) else [value.dtype]
+        digest.update(json.dumps([list(map(str, columns)), list(map(str, dtypes))]).encode("utf-8"))
+        try:
+            digest.update(pd.util.hash_pandas_object(value, index=True).values.tobytes())
+            return digest.hexdigest()
+        except TypeError:
+            pass  # unhashable cells (e.g. parsed list columns): fall back to the pickle
+    digest.update(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    return digest.hexdigest()
+
+
+class _Artifact:
+    # A stage output: always known by hash, loaded from the cache only if a
+    # stage that actually runs needs the value
+    def __init__(self, digest, value=None, path=None):
+        self.digest = digest
+        self._value = value
+        self._path = path
+        self._lock = threading.Lock()
+
+    def get(self):
+        with self._lock:
+            if self._value is None and self._path is not None:
+                with open(self._path, "rb") as f:
+                    self._value = pickle.load(f)
+            return self._value
+
+    def release(self):
+        # No consumer needs the value anymore; the digest stays for cache keys
+        with self._lock:
+            self._value = None
+            self._path = None
+
+
+class Pipeline:
+    # Runs Stage objects as a DAG: a stage starts as soon as all of its inputs
+    # exist, independent stages run concurrently on a thread pool, artifacts
+    # are passed in memory, and each cacheable output is stored under
+    # cache_dir/<stage>/<key>.pkl where key hashes the stage code, params,
+    # input artifact hashes and input files, so unchanged stages are skipped.
+
+    def __init__(self, stages, cache_dir=None, max_workers=4, log=print):
+        self.stages = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"Duplicate stage name '{stage.name}'")
+            self.stages[stage.name] = stage
+        for stage in stages:
+            for name in stage.inputs:
+                if name not in self.stages:
+                    raise ValueError(f"Stage '{stage.name}' depends on unknown stage '{name}'")
+        self.order = self._topological_order()
+        self.cache_dir = cache_dir
+        self.max_workers = max_workers
+        self.log = log
+        self.report = []
+
+    def _topological_order(self):
+        order, state = [], {}
+
+        def visit(name, path):
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "visiting":
+                raise ValueError(f"Cycle in pipeline: {' -> '.join(path + [name])}")
+            state[name] = "visiting"
+            for dependency in self.stages[name].inputs:
+                visit(dependency, path + [name])
+            state[name] = "done"
+            order.append(name)
+
+        for name in self.stages:
+            visit(name, [])
+        return order
+
+    def _required(self, targets):
+        required = set()
+        pending = list(targets)
+        while pending:
+            name = pending.pop()
+            if name not in self.stages:
+                raise ValueError(f"Unknown stage '{name}'")
+            if name not in required:
+                required.add(name)
+                pending.extend(self.stages[name].inputs)
+        return required
+
+    def _cache_paths(self, stage, key):
+        directory = os.path.join(self.cache_dir, stage.name)
+        return os.path.join(directory, f"{key}.pkl"), os.path.join(directory, f"{key}.json")
+
+    def _execute(self, stage, inputs, force):
+        started = time.perf_counter()
+        key = hashlib.sha256(json.dumps({
+            "stage": stage.name,
+            "code": stage.code_hash(),
+            "params": stage.params,
+            "inputs": [artifact.digest for artifact in inputs],
+            "files": [hash_file(path) for path in stage.files],
+        }, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+        use_cache = self.cache_dir is not None and stage.cacheable
+        if use_cache:
+            value_path, meta_path = self._cache_paths(stage, key)
+            if stage.name not in force and os.path.exists(value_path) and os.path.exists(meta_path):
+                with open(meta_path) as f:
+                    digest = json.load(f)["digest"]
+                return _Artifact(digest, path=value_path), "cached", time.perf_counter() - started
+
+        value = stage.fn(*[artifact.get() for artifact in inputs], **stage.params)
+        digest = hash_value(value)
+        artifact = _Artifact(digest, value=value)
+        if use_cache:
+            # Written to temporary files and renamed, so an interrupted run
+            # never leaves a partial cache entry behind
+            os.makedirs(os.path.dirname(value_path), exist_ok=True)
+            with open(value_path + ".tmp", "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            with open(meta_path + ".tmp", "w") as f:
+                json.dump({"digest": digest, "stage": stage.name, "created_at": time.time()}, f)
+            os.replace(value_path + ".tmp", value_path)
+            os.replace(meta_path + ".tmp", meta_path)
+            artifact = _Artifact(digest, value=value, path=value_path)
+        return artifact, "ran", time.perf_counter() - started
+
+    def run(self, targets=None, force=()):
+        # Returns {target: value}; self.report lists what ran, what came from cache and timings
+        targets = list(targets or [name for name in self.order if not self._consumers(name)])
+        required = self._required(targets)
+        force = set(force)
+        remaining_consumers = {
+            name: sum(1 for other in required if name in self.stages[other].inputs) for name in required
+        }
+        artifacts = {}
+        self.report = []
+        pending = [name for name in self.order if name in required]
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            running = {}
+            while pending or running:
+                for name in [name for name in pending if all(dep in artifacts for dep in self.stages[name].inputs)]:
+                    pending.remove(name)
+                    self.log(f"▶️  {name}")
+                    inputs = [artifacts[dependency] for dependency in self.stages[name].inputs]
+                    running[executor.submit(self._execute, self.stages[name], inputs, force)] = name
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        artifact, status, seconds = future.result()
+                    except Exception as e:
+                        for other in running:
+                            other.cancel()
+                        raise PipelineError(name, e) from e
+                    artifacts[name] = artifact
+                    self.report.append({"stage": name, "status": status, "seconds": round(seconds, 3)})
+                    self.log(f"{'⏭️ ' if status == 'cached' else '✅'} {name} ({status}, {seconds:.2f}s)")
+
+                    # Keep data in memory only while a consumer still needs it
+                    for dependency in self.stages[name].inputs:
+                        remaining_consumers[dependency] -= 1
+                        if remaining_consumers[dependency] == 0 and dependency not in targets:
+                            artifacts[dependency].release()
+
+        return {name: artifacts[name].get() for name in targets}
+
+    def _consumers(self, name):
+        return [stage.name for stage in self.stages.values() if name in stage.inputs]
@@ -0,0 +1,94 @@
+import os
+import shutil
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Shared reader/writer for the processed dataset. Parquet keeps the dtypes
+# (bool flags, list columns, timestamps), so nothing has to be re-cast after
+# loading, and columns can be projected: only the requested ones are decoded.
+# A path ending in .csv is read/written as CSV, so older exports still load
+# and CSV stays available for export.
+ROW_GROUP_SIZE = 64 * 1024
+
+
+def is_csv(path):
+    return str(path).lower().endswith(".csv")
+
+
+def _normalize_dtypes(df):
+    # Object columns holding only booleans (flags read back from a CSV with
+    # gaps) are stored as nullable booleans rather than mixed objects
+    df = df.copy()
+    for column in df.columns[df.dtypes == object]:
+        values = df[column].dropna()
+        if len(values) and values.map(type).isin([bool]).all():
+            df[column] = df[column].astype("boolean")
+    return df
+
+
+def read_dataset(path, columns=None, filters=None, memory_map=True):
+    # columns: projection (None reads everything); filters: pyarrow row
+    # filters, e.g. [("karma_bucket", "==", "high")], which also prune partitions
+    if is_csv(path):
+        if filters is not None:
+            raise ValueError("Row filters need a Parquet dataset")
+        return pd.read_csv(path, usecols=columns)
+
+    table = pq.read_table(path, columns=columns, filters=filters, memory_map=memory_map)
+    df = table.to_pandas(split_blocks=True, self_destruct=True)
+
+    # Hive partition keys come back as categoricals; restore the plain values
+    for column in df.columns:
+        if isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = df[column].astype(df[column].cat.categories.dtype)
+    return df
+
+
+def dataset_columns(path):
+    if is_csv(path):
+        return list(pd.read_csv(path, nrows=0).columns)
+    return list(pq.ParquetDataset(path).schema.names)
+
+
+def write_dataset(df, path, partition_cols=None, row_group_size=ROW_GROUP_SIZE):
+    # Atomic: the new file (or partition directory) is written next to the
+    # old one and swapped in, so readers never see a half-written dataset
+    tmp_path = str(path) + ".tmp"
+    if is_csv(path):
+        if partition_cols:
+            raise ValueError("Partitioned writes need a Parquet dataset")
+        df.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, path)
+        return
+
+    parent = os.path.dirname(str(path))
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+    table = pa.Table.from_pandas(_normalize_dtypes(df), preserve_index=False)
+    if not partition_cols:
+        pq.write_table(table, tmp_path, row_group_size=row_group_size)
+        _swap(tmp_path, path)
+        return
+
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    pq.write_to_dataset(table, tmp_path, partition_cols=list(partition_cols), row_group_size=row_group_size)
+    _swap(tmp_path, path)
+
+
+def _swap(tmp_path, path):
+    if os.path.isdir(path):
+        old_path = str(path) + ".old"
+        shutil.rmtree(old_path, ignore_errors=True)
+        os.replace(path, old_path)
+        os.replace(tmp_path, path)
+        shutil.rmtree(old_path)
+    else:
+        if os.path.isdir(tmp_path) and os.path.isfile(path):
+            os.remove(path)  # single file → partitioned directory
+        os.replace(tmp_path, path)
+
+
+def export_csv(path, csv_path, columns=None):
+    write_dataset(read_dataset(path, columns=columns), csv_path)
@@ -0,0 +1,164 @@
+import multiprocessing
+import os
+import re
+import time
+
+import numpy as np
+
+from pipeline.embeddings import DEFAULT_MODEL
+
+# CPU batch encoder for the embedding store: texts are sorted by (approximate)
+# token length so each batch pads to similar lengths, and batches are spread
+# over a pool of worker processes, each holding its own copy of the model and
+# running single-threaded torch (so the cores are not oversubscribed).
+# workers=1 (the default) encodes in this process with torch's own threading.
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+# Per-worker state, set by _init_worker
+_model = None
+_encode_kwargs = None
+
+
+def approx_token_count(text):
+    # Words and punctuation marks: a cheap lower bound of the wordpiece count,
+    # good enough to order texts without loading the tokenizer in the parent
+    return len(_TOKEN_PATTERN.findall(str(text)))
+
+
+def length_sorted_batches(texts, batch_size):
+    # (positions, texts) batches, shortest first; positions map back to the input order
+    order = np.argsort([approx_token_count(text) for text in texts], kind="stable")
+    return [
+        (order[start:start + batch_size], [texts[i] for i in order[start:start + batch_size]])
+        for start in range(0, len(order), batch_size)
+    ]
+
+
+def load_sentence_transformer(model_name):
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name, device="cpu")
+
+
+def _load_model(model_factory, model_name, batch_size):
+    kwargs = {"batch_size": batch_size, "convert_to_numpy": True, "show_progress_bar": False}
+    return model_factory(model_name), kwargs
+
+
+def _init_worker(model_factory, model_name, threads, batch_size):
+    # Pool initializer only: the thread cap applies to the worker process,
+    # never to the parent
+    global _model, _encode_kwargs
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    _model, _encode_kwargs = _load_model(model_factory, model_name, batch_size)
+
+
+def _encode_with(model, kwargs, job):
+    positions, texts = job
+    return positions, np.asarray(model.encode(texts, **kwargs), dtype=np.float32)
+
+
+def _encode_batch(job):
+    return _encode_with(_model, _encode_kwargs, job)
+
+
+def format_seconds(seconds):
+    seconds = int(round(seconds))
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    return f"{hours}h{minutes:02d}m{seconds:02d}s" if hours else f"{minutes}m{seconds:02d}s"
+
+
+class Throughput:
+    # Progress of a long encode: texts/s and ETA, logged at most every `every_seconds`
+    def __init__(self, total, log=print, every_seconds=10.0, label="texts"):
+        self.total = total
+        self.log = log
+        self.every_seconds = every_seconds
+        self.label = label
+        self.done = 0
+        self.started = time.perf_counter()
+        self._last_log = self.started
+
+    def rate(self):
+        elapsed = time.perf_counter() - self.started
+        return self.done / elapsed if elapsed > 0 else 0.0
+
+    def eta_seconds(self):
+        rate = self.rate()
+        return (self.total - self.done) / rate if rate > 0 else None
+
+    def update(self, n):
+        self.done += n
+        now = time.perf_counter()
+        if self.done >= self.total or now - self._last_log >= self.every_seconds:
+            self._last_log = now
+            eta = self.eta_seconds()
+            self.log(f"⏳ {self.done}/{self.total} {self.label} ({self.rate():.1f}/s, "
+                     f"ETA {format_seconds(eta) if eta is not None else '?'})")
+
+    def stats(self):
+        return {
+            "done": self.done,
+            "total": self.total,
+            "seconds": round(time.perf_counter() - self.started, 3),
+            "per_second": round(self.rate(), 2),
+        }
+
+
+class ParallelEncoder:
+    # Callable encoder for EmbeddingStore: encoder(texts) -> (n, dim) float32
+    # in input order. workers=1 encodes in this process (no pool, torch threads
+    # untouched); workers=None uses one process per core.
+
+    def __init__(self, model_name=DEFAULT_MODEL, workers=1, batch_size=64, threads_per_worker=1,
+                 model_factory=load_sentence_transformer):
+        self.model_name = model_name
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.threads_per_worker = threads_per_worker
+        self.model_factory = model_factory
+        self._pool = None
+        self._local = None
+
+    def _map(self, jobs):
+        if self.workers == 1:
+            if self._local is None:
+                self._local = _load_model(self.model_factory, self.model_name, self.batch_size)
+            model, kwargs = self._local
+            return (_encode_with(model, kwargs, job) for job in jobs)
+        if self._pool is None:
+            # spawn: safe to start from the pipeline's worker threads
+            self._pool = multiprocessing.get_context("spawn").Pool(
+                self.workers, initializer=_init_worker,
+                initargs=(self.model_factory, self.model_name, self.threads_per_worker, self.batch_size)
+            )
+        return self._pool.imap_unordered(_encode_batch, jobs)
+
+    def __call__(self, texts, progress=None):
+        texts = list(texts)
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        output = None
+        for positions, vectors in self._map(length_sorted_batches(texts, self.batch_size)):
+            if output is None:
+                output = np.empty((len(texts), vectors.shape[1]), dtype=np.float32)
+            output[positions] = vectors
+            if progress is not None:
+                progress.update(len(positions))
+        return output
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
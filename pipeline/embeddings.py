@@ -0,0 +1,146 @@
+import glob
+import hashlib
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+# Sentence embeddings for the tag-following / semantic features, stored once
+# per distinct text. Vectors are L2-normalized and kept as float16 .npy shards
+# that are memory-mapped on load, so cosine similarity is a row-wise dot
+# product and reruns (or the next stage) only encode texts never seen before.
+DEFAULT_MODEL = "all-MiniLM-L6-v2"
+DEFAULT_STORE_DIR = ".embedding_cache"
+KEY_DTYPE = "S32"  # hex blake2b-128 of the text
+CHECKPOINT_SIZE = 4096  # texts encoded between shard writes
+
+
+def text_key(text):
+    return hashlib.blake2b(str(text).encode("utf-8"), digest_size=16).hexdigest().encode("ascii")
+
+
+def normalize_rows(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+
+def rowwise_cosine(a, b):
+    # cos(a[i], b[i]) for every row, without building the full n x n matrix
+    a = normalize_rows(a)
+    b = normalize_rows(b)
+    return np.einsum("ij,ij->i", a, b)
+
+
+class EmbeddingStore:
+    # On disk: <directory>/<model>/keys-<n>.npy + vectors-<n>.npy, one pair per
+    # checkpoint of newly encoded texts. The vectors file is written before its
+    # keys file, so a shard missing its keys (interrupted write) is ignored and
+    # an interrupted run resumes from the last completed checkpoint.
+
+    def __init__(self, directory=DEFAULT_STORE_DIR, model_name=DEFAULT_MODEL, encoder=None,
+                 checkpoint_size=CHECKPOINT_SIZE, log=print):
+        self.model_name = model_name
+        self.directory = os.path.join(directory, model_name.replace("/", "__"))
+        if encoder is None:
+            from pipeline.embedding_engine import ParallelEncoder
+            encoder = ParallelEncoder(model_name, workers=1)
+        self.encoder = encoder
+        self.checkpoint_size = checkpoint_size
+        self.log = log
+        self.progress = None
+        self._lock = threading.Lock()
+        self._shards = []
+        self._index = {}
+        self.encoded = 0
+        self._load()
+
+    def _load(self):
+        if not os.path.isdir(self.directory):
+            return
+        for keys_path in sorted(glob.glob(os.path.join(self.directory, "keys-*.npy"))):
+            vectors_path = keys_path.replace("keys-", "vectors-")
+            if not os.path.exists(vectors_path):
+                continue
+            self._add_shard(np.load(keys_path), np.load(vectors_path, mmap_mode="r"))
+
+    def _add_shard(self, keys, vectors):
+        shard = len(self._shards)
+        self._shards.append(vectors)
+        for row, key in enumerate(keys.tolist()):
+            self._index[key] = (shard, row)
+
+    def __len__(self):
+        return len(self._index)
+
+    def _write_shard(self, keys, vectors):
+        os.makedirs(self.directory, exist_ok=True)
+        number = len(glob.glob(os.path.join(self.directory, "keys-*.npy")))
+        while os.path.exists(os.path.join(self.directory, f"keys-{number:05d}.npy")):
+            number += 1
+        keys_path = os.path.join(self.directory, f"keys-{number:05d}.npy")
+        vectors_path = os.path.join(self.directory, f"vectors-{number:05d}.npy")
+        for path, array in ((vectors_path, vectors), (keys_path, keys)):
+            with open(path + ".tmp", "wb") as f:
+                np.save(f, array)
+            os.replace(path + ".tmp", path)
+        return np.load(vectors_path, mmap_mode="r")
+
+    def embed(self, texts):
+        # (len(texts), dim) float32 unit vectors; each distinct text is encoded
+        # at most once, then read back from the store
+        codes, unique_texts = pd.factorize(pd.Series(list(texts), dtype=object).astype(str))
+        keys = [text_key(text) for text in unique_texts]
+
+        with self._lock:
+            missing = [i for i, key in enumerate(keys) if key not in self._index]
+            if missing:
+                self._encode_missing([unique_texts[i] for i in missing], [keys[i] for i in missing])
+            locations = np.array([self._index[key] for key in keys], dtype=np.int64).reshape(-1, 2)
+            shards = list(self._shards)
+
+        if not len(locations):
+            return np.zeros((0, 0), dtype=np.float32)
+        unique_vectors = np.empty((len(locations), shards[0].shape[1]), dtype=np.float32)
+        for shard in np.unique(locations[:, 0]):
+            selected = locations[:, 0] == shard
+            unique_vectors[selected] = shards[shard][locations[selected, 1]]
+        return unique_vectors[codes]
+
+    def _encode_missing(self, texts, keys):
+        from pipeline.embedding_engine import Throughput
+
+        # One shard per checkpoint, so progress survives an interruption
+        self.progress = Throughput(len(texts), log=self.log)
+        for start in range(0, len(texts), self.checkpoint_size):
+            chunk = texts[start:start + self.checkpoint_size]
+            vectors = normalize_rows(self.encoder(chunk)).astype(np.float16)
+            new_keys = np.array(keys[start:start + self.checkpoint_size], dtype=KEY_DTYPE)
+            self._add_shard(new_keys, self._write_shard(new_keys, vectors))
+            self.encoded += len(chunk)
+            self.progress.update(len(chunk))
+
+    def close(self):
+        close = getattr(self.encoder, "close", None)
+        if close is not None:
+            close()
+
+    def cosine(self, texts_a, texts_b):
+        # Row-wise cosine between paired texts (renormalized after float16 storage)
+        return rowwise_cosine(self.embed(texts_a), self.embed(texts_b))
+
+    def compact(self):
+        # Merge all shards into one (fewer files to open and map on load)
+        with self._lock:
+            if len(self._shards) <= 1:
+                return
+            keys = np.array(list(self._index), dtype=KEY_DTYPE)
+            vectors = np.concatenate([np.asarray(shard) for shard in self._shards])
+            offsets = np.cumsum([0] + [len(shard) for shard in self._shards])
+            vectors = vectors[[offsets[shard] + row for shard, row in self._index.values()]]
+            old_files = glob.glob(os.path.join(self.directory, "*.npy"))
+            self._shards, self._index = [], {}
+            self._add_shard(keys, self._write_shard(keys, vectors))
+            for path in old_files:
+                os.remove(path)
@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+
+# Column-at-a-time versions of the row-wise rules in pipeline/stages.py
+# (compute_karma, assign_karma_bucket, compute_target_label, karma_level).
+# They return exactly the same values: every float operation is applied in
+# the same order as the scalar code, and np.where/np.select replace the if
+# chains. The scalar versions stay as the reference (test/test_engines.py,
+# benchmarks/bench_engines.py).
+
+
+def _column(df, name, default):
+    # row.get(name, default) for a whole column
+    if name in df.columns:
+        return df[name].to_numpy()
+    return np.full(len(df), default)
+
+
+def _truthy(values):
+    # bool(value) per element, as `if value:` in the scalar code (NaN is truthy)
+    values = pd.Series(values)
+    if values.dtype == bool:
+        return values.to_numpy()
+    return np.array([bool(value) for value in values.tolist()], dtype=bool)
+
+
+def _float(values):
+    return np.asarray(values, dtype=np.float64)
+
+
+def karma_scores(df):
+    likes = _float(_column(df, "Likes", 0))
+    comments = _float(_column(df, "Comments", 0))
+    shares = _float(_column(df, "Shares", 0))
+    impressions = _float(_column(df, "Impressions", 0))
+    reach = _float(_column(df, "Reach", 0))
+    engagement_rate = _float(_column(df, "Engagement Rate", 0))
+    time_match_score = _float(_column(df, "time_match_score", 0))
+    is_buddy = _truthy(_column(df, "is_buddy_post", False))
+
+    # Normalize core metrics to [0, 1]
+    norm_likes = np.minimum(likes / 500, 1.0)
+    norm_comments = np.minimum(comments / 100, 1.0)
+    norm_shares = np.minimum(shares / 100, 1.0)
+    norm_impressions = np.minimum(impressions / 10000, 1.0)
+    norm_reach = np.minimum(reach / 10000, 1.0)
+    norm_engagement = np.minimum(engagement_rate / 100, 1.0)
+
+    # Weighted base score, summed in the scalar order
+    score = np.zeros(len(df))
+    score += norm_likes * 0.15
+    score += norm_comments * 0.15
+    score += norm_shares * 0.15
+    score += norm_engagement * 0.20
+    score += norm_impressions * 0.15
+    score += norm_reach * 0.10
+    score += time_match_score * 0.05
+    score = np.where(is_buddy, score + 0.03, score)
+
+    sentiment = pd.Series(_column(df, "Sentiment", "")).astype(str).str.lower().to_numpy()
+    score = np.where(sentiment == "positive", score + 0.02, score)
+
+    post_type = pd.Series(_column(df, "Post Type", "")).astype(str).str.lower().to_numpy()
+    score = np.select([post_type == "video", post_type == "image"], [score + 0.02, score + 0.01], score)
+
+    # Cap score at 1
+    base_score = np.minimum(score, 1.0)
+
+    # Scaled karma bands; np.rint rounds half to even like round()
+    with np.errstate(invalid="ignore"):
+        low = np.rint(base_score * 33)
+        low = np.where(low == 0, 1, low)  # ensure ≥1
+        medium = np.rint(33 + (base_score - 0.33) * (33 / 0.33))
+        high = np.rint(66 + (base_score - 0.66) * (34 / 0.34))
+    karma = np.select([base_score <= 0.33, base_score <= 0.66], [low, medium], high)
+    return pd.Series(karma.astype(np.int64), index=df.index)
+
+
+KARMA_BUCKETS = np.array(["low", "medium", "high"], dtype=object)
+KARMA_LEVELS = np.array(["Low", "Medium", "High"], dtype=object)
+
+
+def karma_buckets(karma):
+    karma = pd.Series(karma)
+    values = karma.to_numpy()
+    return pd.Series(KARMA_BUCKETS[np.select([values <= 33, values <= 66], [0, 1], 2)], index=karma.index)
+
+
+def karma_levels(karma):
+    karma = pd.Series(karma)
+    values = karma.to_numpy()
+    return pd.Series(KARMA_LEVELS[np.select([values >= 67, values >= 34], [2, 1], 0)], index=karma.index)
+
+
+def target_labels(df):
+    base_score = _float(df["relevance_score"])
+    karma = _float(df["karma"])
+    time_match_score = _float(df["time_match_score"])
+    is_buddy = _truthy(df["is_buddy_post"])
+    follows_tag = _truthy(df["user_follows_tag"])
+
+    # Heuristic 1: Buddy + Tag following (boosted), unrelated posts penalized
+    contextual_score = np.select([is_buddy & follows_tag, is_buddy | follows_tag], [0.6, 0.3], -0.1)
+
+    # Heuristic 2: Karma boost, small penalty for low karma
+    contextual_score = contextual_score + np.select([karma >= 67, karma >= 34], [0.3, 0.2], 0.05)
+    contextual_score = np.select(
+        [karma < 20, karma < 50], [contextual_score - 0.02, contextual_score - 0.01], contextual_score
+    )
+
+    # Heuristic 3: Time match (0–1 scale)
+    contextual_score = contextual_score + 0.2 * time_match_score
+
+    final_score = 0.5 * base_score + 0.5 * np.clip(contextual_score, 0.0, 1.0)
+    return pd.Series(np.minimum(final_score, 1.0), index=df.index)
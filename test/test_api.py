@@ -1,4 +1,5 @@
 from fastapi.testclient import TestClient
+import json
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
@@ -173,3 +174,93 @@ def test_unexpected_extra_field():
     })
     # FastAPI ignores extra fields unless you disallow them explicitly
     assert response.status_code == 200
+def test_rank_feed_top_k():
+    posts = [{
+        "post_id": f"p{i}",
+        "author_id": "u1",
+        "tags": ["ml"],
+        "content_type": "text",
+        "karma": 50 + i,
+        "created_at": "2025-05-27T07:30:00Z"
+    } for i in range(10)]
+    payload = {
+        "user_id": "testuser",
+        "user_profile": {
+            "branches_of_interest": ["AI"],
+            "tags_followed": ["ml"],
+            "buddies": ["u1"],
+            "active_hours": ["07:00-09:00"]
+        },
+        "posts": posts
+    }
+    full = client.post("/rank-feed", json=payload).json()["ranked_posts"]
+    response = client.post("/rank-feed", json={**payload, "top_k": 3, "offset": 2})
+    assert response.status_code == 200
+    assert response.json()["ranked_posts"] == full[2:5]
+    assert client.post("/rank-feed", json={**payload, "top_k": 0}).status_code == 422
+def test_batching_stats_endpoint():
+    response = client.get("/stats/batching")
+    assert response.status_code == 200
+    assert {"batches", "avg_batch_rows", "avg_queue_ms", "max_wait_ms"} <= set(response.json())
+def test_rank_feed_batch_shared_pool():
+    profile = {
+        "branches_of_interest": ["AI"],
+        "tags_followed": ["ml"],
+        "buddies": ["u1"],
+        "active_hours": ["07:00-09:00"]
+    }
+    posts = [{
+        "post_id": f"p{i}",
+        "author_id": ["u1", "u2"][i % 2],
+        "tags": ["ml"],
+        "content_type": "text",
+        "karma": 10 * i,
+        "created_at": "2025-05-27T07:30:00Z"
+    } for i in range(6)]
+    response = client.post("/rank-feed/batch", json={
+        "requests": [{"user_id": "a", "user_profile": profile}, {"user_id": "b", "user_profile": profile, "posts": posts[:2]}],
+        "posts": posts,
+        "top_k": 3
+    })
+    assert response.status_code == 200
+    results = response.json()["results"]
+    single = client.post("/rank-feed", json={"user_id": "a", "user_profile": profile, "posts": posts, "top_k": 3}).json()
+    assert results[0] == single
+    assert len(results[1]["ranked_posts"]) <= 2
+def test_rank_feed_batch_missing_posts():
+    response = client.post("/rank-feed/batch", json={
+        "requests": [{"user_id": "a", "user_profile": {
+            "branches_of_interest": [], "tags_followed": [], "buddies": [], "active_hours": []
+        }}]
+    })
+    assert response.status_code == 422
+def test_fast_request_validation_matches_rank_request_model():
+    import pytest
+    from fastapi.exceptions import RequestValidationError
+    from main import RankRequest, parse_rank_request
+    post = {"post_id": "p1", "author_id": "u1", "tags": ["ml"], "content_type": "text",
+            "karma": 90, "created_at": "2025-05-27T07:30:00Z"}
+    profile = {"branches_of_interest": [], "tags_followed": ["ml"], "buddies": [], "active_hours": []}
+    payloads = [
+        {"user_id": "u", "user_profile": profile, "posts": [post]},
+        {"user_id": "u", "user_profile": profile, "posts": [{**post, "karma": "90"}]},
+        {"user_id": "u", "user_profile": profile, "posts": [{**post, "karma": 90.5}]},
+        {"user_id": "u", "user_profile": profile, "posts": [{**post, "post_id": 1}]},
+        {"user_id": "u", "user_profile": profile, "posts": [{**post, "extra_field": 1}]},
+        {"user_id": "u", "user_profile": profile, "posts": [], "top_k": 0},
+        {"user_id": "u", "user_profile": profile, "posts": [], "top_k": None, "offset": 2},
+        {"user_id": "u", "user_profile": {}, "posts": []},
+    ]
+    for payload in payloads:
+        body = json.dumps(payload)
+        try:
+            model = RankRequest.model_validate_json(body)
+        except Exception:
+            with pytest.raises(RequestValidationError):
+                parse_rank_request(body)
+            continue
+        parsed = parse_rank_request(body)
+        assert parsed["posts"] == [p.model_dump() for p in model.posts]
+        assert parsed["user_profile"] == model.user_profile.model_dump()
+        assert parsed.get("top_k") == model.top_k
+        assert parsed.get("offset", 0) == model.offset
@@ -0,0 +1,109 @@
+# test/test_batch_features.py
+import sys
+import os
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.extract_features import extract_features
+from app.batch_features import (
+    extract_feature_matrix,
+    content_type_map,
+    weekday_type_map,
+    time_period_map,
+    karma_bucket_map,
+)
+
+COLUMNS = [
+    "karma", "time_match_score", "user_follows_tag", "is_buddy_post",
+    "Post Type", "Weekday Type", "Time Periods", "karma_bucket"
+]
+
+user_profile = {
+    "branches_of_interest": ["AI"],
+    "tags_followed": ["python", "ml"],
+    "buddies": ["u1", "u2"],
+    "active_hours": ["07:00-09:00", "22:00-02:00", "bad-range", "7:5-8"]
+}
+
+def reference_row(post, profile):
+    # Per-post path as rank_posts used to build it
+    features = extract_features(post, profile)
+    features["Post Type"] = content_type_map.get(post["content_type"], 0)
+    features["Weekday Type"] = weekday_type_map.get(features.get("Weekday Type"), 0)
+    features["Time Periods"] = time_period_map.get(features.get("Time Periods"), 0)
+    features["karma_bucket"] = karma_bucket_map.get(features.get("karma_bucket"), 0)
+    return [float(features[c]) for c in COLUMNS]
+
+def make_posts():
+    timestamps = [
+        "2025-05-27T07:30:00Z", "2025-05-31T23:59:59Z", "2025-06-01T12:00:00Z",
+        "2024-02-29T16:45:00Z", "2025-02-29T10:00:00Z", "2025-5-27T7:30:00Z",
+        "not a timestamp", "", "2025-05-27T24:00:00Z", "0001-01-01T00:00:00Z",
+        "2025-05-27 07:30:00Z", "2025-13-01T05:00:00Z", "2025-05-27T13:15:00Z",
+    ]
+    posts = []
+    for i, ts in enumerate(timestamps):
+        posts.append({
+            "post_id": f"p{i}",
+            "author_id": f"u{i % 4}",
+            "tags": [["ml"], ["travel", "python"], [], ["food"]][i % 4],
+            "content_type": ["text", "image", "video", "poll"][i % 4],
+            "karma": [0, 33, 34, 66, 67, 100][i % 6],
+            "created_at": ts,
+        })
+    return posts
+
+def test_matrix_matches_per_post_features():
+    posts = make_posts()
+    X = extract_feature_matrix(posts, user_profile, COLUMNS)
+    expected = np.array([reference_row(p, user_profile) for p in posts])
+    assert X.shape == (len(posts), len(COLUMNS))
+    np.testing.assert_array_equal(X, expected)
+
+def test_matrix_respects_column_order():
+    posts = make_posts()
+    reordered = list(reversed(COLUMNS))
+    X = extract_feature_matrix(posts, user_profile, COLUMNS)
+    X_rev = extract_feature_matrix(posts, user_profile, reordered)
+    np.testing.assert_array_equal(X_rev, X[:, ::-1])
+
+def test_matrix_every_minute_of_day():
+    posts = [
+        {"post_id": str(m), "author_id": "x", "tags": [], "content_type": "text", "karma": 5,
+         "created_at": f"2025-05-27T{m // 60:02d}:{m % 60:02d}:00Z"}
+        for m in range(1440)
+    ]
+    X = extract_feature_matrix(posts, user_profile, COLUMNS)
+    expected = np.array([reference_row(p, user_profile) for p in posts])
+    np.testing.assert_array_equal(X, expected)
+
+def test_feature_buffer_is_reused_and_grows():
+    from app.batch_features import FeatureBuffer
+    buffer = FeatureBuffer(len(COLUMNS), initial_rows=4)
+    small = buffer.rows(3)
+    assert small.shape == (3, len(COLUMNS))
+    assert buffer.rows(4).base is small.base
+    large = buffer.rows(10)
+    assert large.shape == (10, len(COLUMNS))
+    posts = make_posts()
+    out = buffer.rows(len(posts))
+    X = extract_feature_matrix(posts, user_profile, COLUMNS, out=out)
+    assert X is out
+    np.testing.assert_array_equal(X, extract_feature_matrix(posts, user_profile, COLUMNS))
+
+def test_cross_features_match_per_user_extraction():
+    from app.batch_features import PostTable, cross_features
+    posts = make_posts()
+    profiles = [
+        user_profile,
+        {"tags_followed": ["food"], "buddies": ["u3", "nobody"], "active_hours": ["12:00-13:00"]},
+        {},
+    ]
+    table = PostTable(posts)
+    X = cross_features(table, profiles, COLUMNS)
+    assert X.shape == (len(profiles) * len(posts), len(COLUMNS))
+    for u, profile in enumerate(profiles):
+        block = X[u * len(posts):(u + 1) * len(posts)]
+        np.testing.assert_array_equal(block, extract_feature_matrix(posts, profile, COLUMNS))
+    assert table.index["p3"] == 3
@@ -0,0 +1,80 @@
+# test/test_batcher.py
+import pytest
+import sys
+import os
+import asyncio
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.batcher import MicroBatcher
+
+def test_concurrent_requests_share_one_batch():
+    calls = []
+
+    def score(X):
+        calls.append(len(X))
+        return X[:, 0] * 2
+
+    batcher = MicroBatcher(score, max_wait_ms=50, max_batch_rows=100)
+
+    async def run():
+        inputs = [np.full((n, 2), float(n)) for n in (1, 3, 5)]
+        return inputs, await asyncio.gather(*(batcher.submit(X) for X in inputs))
+
+    inputs, results = asyncio.run(run())
+    for X, scores in zip(inputs, results):
+        np.testing.assert_array_equal(scores, X[:, 0] * 2)
+    assert calls == [9]
+    stats = batcher.stats()
+    assert stats["batches"] == 1 and stats["requests"] == 3 and stats["rows"] == 9
+
+def test_max_batch_rows_splits_batches():
+    calls = []
+
+    def score(X):
+        calls.append(len(X))
+        return X[:, 0]
+
+    batcher = MicroBatcher(score, max_wait_ms=50, max_batch_rows=4)
+
+    async def run():
+        return await asyncio.gather(*(batcher.submit(np.ones((3, 1))) for _ in range(3)))
+
+    asyncio.run(run())
+    assert calls == [3, 3, 3]
+
+def test_scoring_errors_reach_every_request():
+    def score(X):
+        raise RuntimeError("boom")
+
+    batcher = MicroBatcher(score, max_wait_ms=5)
+
+    async def run():
+        return await asyncio.gather(batcher.submit(np.ones((1, 1))), return_exceptions=True)
+
+    (result,) = asyncio.run(run())
+    assert isinstance(result, RuntimeError)
+
+def test_async_ranking_matches_sync():
+    from app import ranker
+    posts = [{"post_id": f"p{i}", "author_id": ["u1", "u9"][i % 2], "tags": ["ml"], "content_type": "text",
+              "karma": i * 9 % 101, "created_at": "2025-05-27T07:30:00Z"} for i in range(20)]
+    profile = {"tags_followed": ["ml"], "buddies": ["u1"], "active_hours": ["07:00-09:00"]}
+    expected = ranker.rank_posts("user1", posts, profile, top_k=5)
+    assert asyncio.run(ranker.rank_posts_async("user1", posts, profile, top_k=5)) == expected
+
+def test_micro_batched_endpoint_matches_sync(monkeypatch):
+    from fastapi.testclient import TestClient
+    from main import app
+    from app import ranker
+    posts = [{"post_id": f"p{i}", "author_id": ["u1", "u9"][i % 2], "tags": ["ml"], "content_type": "text",
+              "karma": i * 7 % 101, "created_at": "2025-05-27T20:30:00Z"} for i in range(30)]
+    profile = {"branches_of_interest": [], "tags_followed": ["ml"], "buddies": ["u1"], "active_hours": ["20:00-23:00"]}
+    expected = TestClient(app).post("/rank-feed", json={"user_id": "mb_user", "user_profile": profile, "posts": posts}).json()
+
+    monkeypatch.setattr(ranker, "micro_batching_enabled", True)
+    batches = ranker.micro_batcher.stats()["batches"]
+    response = TestClient(app).post("/rank-feed", json={"user_id": "mb_user", "user_profile": profile, "posts": posts})
+    assert response.json() == expected
+    assert ranker.micro_batcher.stats()["batches"] == batches + 1
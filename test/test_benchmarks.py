@@ -0,0 +1,46 @@
+# test/test_benchmarks.py
+import sys
+import os
+import random
+import numpy as np
+
+# Add the root project directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.loadgen import get_profiles, make_posts, make_requests, synthetic_profiles
+from benchmarks.bench_serving import compare
+from benchmarks.loadtest import arrival_times, find_knee
+from main import RankRequest
+
+def test_generated_requests_match_api_schema():
+    profiles = get_profiles(5) + synthetic_profiles(5)
+    for request in make_requests(10, 50, profiles, top_k=10):
+        RankRequest(**request)
+
+def test_generated_posts_include_buddies():
+    profile = {"buddies": ["stu_1111"]}
+    posts = make_posts(2000, random.Random(1), profile)
+    assert any(post["author_id"] == "stu_1111" for post in posts)
+
+def test_compare_flags_slowdowns_only_past_tolerance():
+    row = {"mode": "inprocess", "posts": 100, "p50_ms": 1.0, "p95_ms": 2.0, "p99_ms": 3.0, "rps": 100.0}
+    baseline = {"results": [row]}
+    assert compare([dict(row, p50_ms=1.1)], baseline, tolerance=0.15) == []
+    regressions = compare([dict(row, p95_ms=2.5, rps=80.0)], baseline, tolerance=0.15)
+    assert [regression["metric"] for regression in regressions] == ["p95_ms", "rps"]
+
+def test_arrival_schedules_match_offered_rate():
+    rng = np.random.default_rng(0)
+    assert len(arrival_times(100, 2.0, "constant", rng)) == 200
+    poisson = arrival_times(1000, 5.0, "poisson", rng)
+    assert abs(len(poisson) - 5000) < 300
+    assert np.all(np.diff(poisson) > 0) and poisson[-1] < 5.0
+
+def test_knee_is_last_rate_before_saturation():
+    def row(rate, p99, achieved=None, error_rate=0.0):
+        return {"offered_rps": rate, "sent_rps": rate, "p99_ms": p99,
+                "achieved_rps": rate if achieved is None else achieved, "error_rate": error_rate}
+    assert find_knee([row(100, 10), row(500, 12), row(1000, 400)]) == {"knee_rps": 500, "saturated_at_rps": 1000}
+    assert find_knee([row(100, 10), row(500, 12, achieved=300)])["knee_rps"] == 100
+    assert find_knee([row(100, 10), row(500, 12, error_rate=0.05)])["knee_rps"] == 100
+    assert find_knee([row(100, 10), row(500, 12)]) == {"knee_rps": 500, "saturated_at_rps": None}
@@ -0,0 +1,59 @@
+# test/test_dataset.py
+import sys
+import os
+import pandas as pd
+import pytest
+
+# Add the root project directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from pipeline.dataset import dataset_columns, export_csv, read_dataset, write_dataset
+
+def sample_frame():
+    return pd.DataFrame({
+        "karma": [80, 50, 10, 0],
+        "karma_bucket": ["high", "medium", "low", "low"],
+        "is_buddy_post": [True, False, True, False],
+        "user_follows_tag": pd.Series([True, None, False, True], dtype=object),
+        "active_hours": [["08:00-11:00"], ["20:00-23:00", "06:00-09:00"], [], ["12:00-14:00"]],
+        "Post Timestamp": pd.to_datetime(["2024-01-01 10:00", "2024-01-02 11:00", "2024-01-03 12:00", "2024-01-04 13:00"], utc=True),
+        "target_label": [0.9, 0.6, 0.3, 0.1],
+    })
+
+def test_parquet_round_trip_keeps_dtypes(tmp_path):
+    path = str(tmp_path / "dataset.parquet")
+    write_dataset(sample_frame(), path)
+    df = read_dataset(path)
+    assert df["is_buddy_post"].dtype == bool
+    assert df["user_follows_tag"].tolist()[:1] == [True] and pd.isna(df["user_follows_tag"][1])
+    assert df["active_hours"].map(list).tolist()[1] == ["20:00-23:00", "06:00-09:00"]
+    assert str(df["Post Timestamp"].dt.tz) == "UTC"
+    assert dataset_columns(path) == list(sample_frame().columns)
+
+def test_projection_and_filters(tmp_path):
+    path = str(tmp_path / "dataset.parquet")
+    write_dataset(sample_frame(), path)
+    df = read_dataset(path, columns=["karma", "target_label"])
+    assert list(df.columns) == ["karma", "target_label"]
+    assert read_dataset(path, filters=[("karma", ">=", 50)])["karma"].tolist() == [80, 50]
+
+def test_partitioned_write_replaces_previous_dataset(tmp_path):
+    path = str(tmp_path / "dataset")
+    write_dataset(sample_frame(), path + ".parquet")
+    write_dataset(sample_frame(), path, partition_cols=["karma_bucket"])
+    write_dataset(sample_frame().head(2), path, partition_cols=["karma_bucket"])
+    assert sorted(os.listdir(path)) == ["karma_bucket=high", "karma_bucket=medium"]
+
+    df = read_dataset(path, columns=["karma", "karma_bucket"], filters=[("karma_bucket", "==", "high")])
+    assert df.to_dict("records") == [{"karma": 80, "karma_bucket": "high"}]
+    assert not os.path.exists(path + ".tmp") and not os.path.exists(path + ".old")
+
+def test_csv_export_and_read(tmp_path):
+    path = str(tmp_path / "dataset.parquet")
+    csv_path = str(tmp_path / "dataset.csv")
+    write_dataset(sample_frame(), path)
+    export_csv(path, csv_path, columns=["karma", "is_buddy_post"])
+    assert read_dataset(csv_path).to_dict("list") == {"karma": [80, 50, 10, 0], "is_buddy_post": [True, False, True, False]}
+    assert list(read_dataset(csv_path, columns=["karma"]).columns) == ["karma"]
+    with pytest.raises(ValueError):
+        read_dataset(csv_path, filters=[("karma", ">", 1)])
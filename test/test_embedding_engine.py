@@ -0,0 +1,91 @@
+# test/test_embedding_engine.py
+import sys
+import os
+import types
+import numpy as np
+import pytest
+
+# Add the root project directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from pipeline.embedding_engine import ParallelEncoder, _init_worker, Throughput, approx_token_count, length_sorted_batches
+from pipeline.embeddings import EmbeddingStore
+
+class FakeModel:
+    # Vector = (token count, first character code, process id); records batch lengths
+    batches = []
+
+    def encode(self, texts, **kwargs):
+        FakeModel.batches.append([approx_token_count(text) for text in texts])
+        return np.array([[approx_token_count(text), ord(text[0]), os.getpid()] for text in texts], dtype=np.float32)
+
+def fake_model_factory(model_name):
+    return FakeModel()
+
+def make_texts(n):
+    rng = np.random.default_rng(0)
+    return [f"{chr(97 + i % 26)} " + " ".join(["word"] * int(rng.integers(0, 40))) for i in range(n)]
+
+def test_batches_are_sorted_by_token_length():
+    texts = make_texts(100)
+    batches = length_sorted_batches(texts, 16)
+    lengths = [approx_token_count(text) for _, batch in batches for text in batch]
+    assert lengths == sorted(lengths)
+    assert sorted(int(i) for positions, _ in batches for i in positions) == list(range(100))
+    assert approx_token_count("Hello, world!") == 4
+
+def test_output_keeps_input_order_in_process():
+    FakeModel.batches = []
+    texts = make_texts(50)
+    progress = Throughput(len(texts), log=lambda message: None)
+    vectors = ParallelEncoder("fake", workers=1, batch_size=8, model_factory=fake_model_factory)(texts, progress)
+    assert vectors[:, 0].tolist() == [approx_token_count(text) for text in texts]
+    assert vectors[:, 1].tolist() == [ord(text[0]) for text in texts]
+    assert all(batch == sorted(batch) for batch in FakeModel.batches)
+    assert progress.done == 50 and progress.eta_seconds() == 0
+
+def test_in_process_encoding_leaves_torch_threads_alone(monkeypatch):
+    calls = []
+    monkeypatch.setitem(sys.modules, "torch", types.SimpleNamespace(set_num_threads=calls.append))
+    ParallelEncoder("fake", model_factory=fake_model_factory)(make_texts(10))
+    assert calls == []
+    _init_worker(fake_model_factory, "fake", 1, 8)
+    assert calls == [1]
+
+def test_process_pool_spreads_batches_over_workers():
+    texts = make_texts(400)
+    with ParallelEncoder("fake", workers=2, batch_size=4, model_factory=fake_model_factory) as encoder:
+        vectors = encoder(texts)
+    assert vectors[:, 0].tolist() == [approx_token_count(text) for text in texts]
+    assert os.getpid() not in set(vectors[:, 2].tolist())
+
+class FailingEncoder:
+    def __init__(self, fail_after):
+        self.fail_after = fail_after
+        self.encoded = []
+
+    def __call__(self, texts):
+        if len(self.encoded) >= self.fail_after:
+            raise KeyboardInterrupt
+        self.encoded.extend(texts)
+        return np.ones((len(texts), 4), dtype=np.float32)
+
+def test_interrupted_run_resumes_from_last_checkpoint(tmp_path):
+    texts = [f"text {i}" for i in range(10)]
+    first = FailingEncoder(fail_after=4)
+    with pytest.raises(KeyboardInterrupt):
+        EmbeddingStore(str(tmp_path), "m", encoder=first, checkpoint_size=4, log=lambda message: None).embed(texts)
+    assert first.encoded == texts[:4]
+
+    second = FailingEncoder(fail_after=100)
+    store = EmbeddingStore(str(tmp_path), "m", encoder=second, checkpoint_size=4, log=lambda message: None)
+    assert store.embed(texts).shape == (10, 4)
+    assert second.encoded == texts[4:]
+    assert store.progress.stats()["done"] == 6
+
+def test_throughput_reports_rate_and_eta():
+    messages = []
+    progress = Throughput(100, log=messages.append, every_seconds=0)
+    progress.update(25)
+    assert progress.rate() > 0 and progress.eta_seconds() > 0
+    assert messages[-1].startswith("⏳ 25/100 texts") and "ETA" in messages[-1]
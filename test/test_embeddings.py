@@ -0,0 +1,88 @@
+# test/test_embeddings.py
+import sys
+import os
+import hashlib
+import numpy as np
+import pandas as pd
+
+# Add the root project directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from pipeline import stages
+from pipeline.embeddings import EmbeddingStore, rowwise_cosine
+
+class FakeEncoder:
+    # Deterministic pseudo-embeddings; records every text it is asked to encode
+    def __init__(self, dim=16):
+        self.dim = dim
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        rows = []
+        for text in texts:
+            seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:4], "little")
+            rows.append(np.random.default_rng(seed).normal(size=self.dim))
+        return np.array(rows, dtype=np.float32) * 3.0
+
+def test_rowwise_cosine_matches_full_matrix_diagonal():
+    rng = np.random.default_rng(0)
+    a, b = rng.normal(size=(50, 8)), rng.normal(size=(50, 8))
+    full = (a / np.linalg.norm(a, axis=1, keepdims=True)) @ (b / np.linalg.norm(b, axis=1, keepdims=True)).T
+    assert np.allclose(rowwise_cosine(a, b), np.diag(full), atol=1e-6)
+
+def test_distinct_texts_are_encoded_once(tmp_path):
+    encoder = FakeEncoder()
+    store = EmbeddingStore(str(tmp_path), "test-model", encoder=encoder)
+    vectors = store.embed(["coding events", "python", "coding events", "python", "ML"])
+    assert encoder.calls == [["coding events", "python", "ML"]]
+    assert vectors.shape == (5, 16) and vectors.dtype == np.float32
+    assert np.array_equal(vectors[0], vectors[2])
+    assert np.allclose(np.linalg.norm(vectors, axis=1), 1.0, atol=1e-3)
+
+    store.embed(["python", "design"])
+    assert encoder.calls[-1] == ["design"]
+    assert len(store) == 4 and store.encoded == 4
+
+def test_store_persists_as_memory_mapped_float16(tmp_path):
+    store = EmbeddingStore(str(tmp_path), "test-model", encoder=FakeEncoder())
+    first = store.embed(["a", "b"])
+    store.embed(["c"])
+    store.compact()
+
+    encoder = FakeEncoder()
+    reloaded = EmbeddingStore(str(tmp_path), "test-model", encoder=encoder)
+    assert np.array_equal(reloaded.embed(["b", "a"]), first[::-1])
+    assert encoder.calls == [] and len(reloaded) == 3
+
+    files = sorted(os.listdir(tmp_path / "test-model"))
+    assert files == ["keys-00002.npy", "vectors-00002.npy"]
+    vectors = np.load(tmp_path / "test-model" / "vectors-00002.npy", mmap_mode="r")
+    assert isinstance(vectors, np.memmap) and vectors.dtype == np.float16
+
+def test_interrupted_shard_is_ignored(tmp_path):
+    store = EmbeddingStore(str(tmp_path), "test-model", encoder=FakeEncoder())
+    store.embed(["a"])
+    os.remove(tmp_path / "test-model" / "keys-00000.npy")  # vectors written, keys never were
+    encoder = FakeEncoder()
+    EmbeddingStore(str(tmp_path), "test-model", encoder=encoder).embed(["a"])
+    assert encoder.calls == [["a"]]
+
+def test_tag_stages_share_the_store(tmp_path):
+    encoder = FakeEncoder()
+    store = EmbeddingStore(str(tmp_path), "test-model", encoder=encoder)
+    users = pd.DataFrame({"user_id": ["u1", "u2"], "tags_followed": ['["coding", "ML"]', '["events"]']})
+    contents = ["hackathon", "fest", "workshop", "seminar", "meetup", "hackathon", None]
+    posts = pd.DataFrame({
+        "user_id": ["u1", "u2"] * 3 + ["u1"],
+        "Post Content": contents,
+        "Audience Interests": ["coding"] * 7,
+    })
+    tagged = stages.add_user_follows_tag(posts, users, store=store)
+    assert len(tagged) == 6 and tagged["user_follows_tag"].dtype == bool
+    assert sum(len(call) for call in encoder.calls) == 5 + 2  # distinct post texts + tag texts
+
+    semantic = stages.semantic_tag_features(tagged, store=store)
+    assert len(encoder.calls) == 2  # nothing new to encode
+    expected = store.cosine(tagged["post_text"], tagged["user_tags_text"])
+    assert np.allclose(semantic["semantic_tag_similarity"], expected)
@@ -0,0 +1,49 @@
+# test/test_engines.py
+import sys
+import os
+import numpy as np
+import pandas as pd
+
+# Add the root project directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from pipeline import engines, stages
+from benchmarks.bench_engines import make_frame
+
+def assert_bitwise_equal(expected, actual):
+    expected, actual = np.asarray(expected), np.asarray(actual)
+    assert expected.shape == actual.shape
+    if expected.dtype.kind == "f":
+        assert np.array_equal(expected.view(np.int64), actual.astype(np.float64).view(np.int64))
+    else:
+        assert expected.tolist() == actual.tolist()
+
+def test_karma_matches_row_wise_version():
+    df = make_frame(20000, seed=1)
+    assert_bitwise_equal(df.apply(stages.compute_karma, axis=1), engines.karma_scores(df))
+
+    # Every band edge: one metric swept finely, the rest at zero
+    sweep = pd.DataFrame({"Likes": np.arange(0, 600), "Engagement Rate": np.linspace(0, 120, 600)})
+    assert_bitwise_equal(sweep.apply(stages.compute_karma, axis=1), engines.karma_scores(sweep))
+
+def test_karma_handles_missing_columns_and_loose_types():
+    df = pd.DataFrame({
+        "Likes": [10, 400],
+        "is_buddy_post": pd.Series([np.nan, "False"], dtype=object),  # both truthy, as in the scalar code
+        "Sentiment": [None, "POSITIVE"],
+    })
+    expected = df.apply(stages.compute_karma, axis=1)
+    assert_bitwise_equal(expected, engines.karma_scores(df))
+
+def test_buckets_and_levels_match():
+    karma = pd.Series(np.arange(-3, 110), index=np.arange(1000, 1113))
+    assert_bitwise_equal(karma.apply(stages.assign_karma_bucket), engines.karma_buckets(karma))
+    assert_bitwise_equal(karma.apply(stages.karma_level), engines.karma_levels(karma))
+    assert engines.karma_buckets(karma).index.equals(karma.index)
+
+def test_target_label_matches_row_wise_version():
+    df = stages.fill_label_inputs(make_frame(20000, seed=2))
+    assert_bitwise_equal(df.apply(stages.compute_target_label, axis=1), engines.target_labels(df))
+
+    df.loc[:10, "relevance_score"] = np.nan
+    assert_bitwise_equal(df.apply(stages.compute_target_label, axis=1), engines.target_labels(df))
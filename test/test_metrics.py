@@ -0,0 +1,56 @@
+# test/test_metrics.py
+import sys
+import os
+
+# Add the root project directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from fastapi.testclient import TestClient
+from main import app
+from app.metrics import Metrics
+
+client = TestClient(app)
+
+def test_histogram_buckets_are_cumulative():
+    metrics = Metrics()
+    metrics.observe_stage("predict", 0.0003)
+    metrics.observe_stage("predict", 0.002)
+    metrics.observe_result("ranked", 20)
+    metrics.observe_result("empty", 0)
+    text = metrics.render([("feed_up", "Up.", True)])
+
+    assert 'feed_stage_seconds_bucket{stage="predict",le="0.0005"} 1' in text
+    assert 'feed_stage_seconds_bucket{stage="predict",le="0.0025"} 2' in text
+    assert 'feed_stage_seconds_bucket{stage="predict",le="+Inf"} 2' in text
+    assert 'feed_stage_seconds_count{stage="predict"} 2' in text
+    assert 'feed_rank_status_total{status="ranked"} 1' in text
+    assert 'feed_request_posts_bucket{le="50"} 2' in text
+    assert "feed_up 1" in text
+
+def test_disabled_metrics_record_nothing():
+    metrics = Metrics(enabled=False)
+    with metrics.stage("predict"):
+        pass
+    metrics.observe_result("ranked", 5)
+    assert metrics.stages == {}
+    assert metrics.statuses == {}
+
+def test_metrics_endpoint_reports_stages():
+    response = client.post("/rank-feed", json={
+        "user_id": "metrics_user",
+        "user_profile": {
+            "branches_of_interest": [], "tags_followed": ["ml"], "buddies": [], "active_hours": ["07:00-09:00"]
+        },
+        "posts": [{
+            "post_id": "p1", "author_id": "u1", "tags": ["ml"], "content_type": "text",
+            "karma": 90, "created_at": "2025-05-27T07:30:00Z"
+        }]
+    })
+    assert response.status_code == 200
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    for stage in ("request", "parse", "features", "predict", "rank", "serialize"):
+        assert f'feed_stage_seconds_count{{stage="{stage}"}}' in response.text
+    assert "feed_rank_status_total" in response.text
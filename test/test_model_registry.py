@@ -0,0 +1,66 @@
+# test/test_model_registry.py
+import sys
+import os
+import shutil
+import joblib
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app import ranker
+from app.model_registry import ModelRegistry
+
+def make_registry(tmp_path):
+    path = str(tmp_path / "model.pkl")
+    shutil.copy(ranker.resolve_path(ranker.model_path), path)
+    return path, ModelRegistry(path, "lightgbm", ranker.expected_columns)
+
+def test_model_loads_lazily(tmp_path):
+    _, registry = make_registry(tmp_path)
+    assert registry.stats()["loaded"] is False
+    loaded = registry.get()
+    assert registry.get() is loaded
+    stats = registry.stats()
+    assert stats["loaded"] and stats["load_seconds"] > 0 and stats["cold_start_seconds"] > 0
+
+def test_hot_reload_swaps_changed_model(tmp_path):
+    path, registry = make_registry(tmp_path)
+    old = registry.get()
+    assert registry.reload_if_changed() is False
+
+    # Same model, different bytes on disk
+    model, columns = joblib.load(path)
+    joblib.dump((model, columns), path, compress=3)
+    os.utime(path, (old.mtime + 10, old.mtime + 10))
+
+    assert registry.reload_if_changed() is True
+    new = registry.get()
+    assert new is not old and new.sha256 != old.sha256
+    X = np.zeros((3, len(ranker.expected_columns)))
+    np.testing.assert_array_equal(new.predict(X), old.predict(X))
+    assert registry.stats()["reloads"] == 1
+
+def test_invalid_model_file_keeps_serving_current_version(tmp_path):
+    path, registry = make_registry(tmp_path)
+    old = registry.get()
+    with open(path, "wb") as f:
+        f.write(b"not a pickle")
+    os.utime(path, (old.mtime + 10, old.mtime + 10))
+    assert registry.reload_if_changed() is False
+    assert registry.get() is old
+    assert registry.stats()["reload_failures"] == 1
+
+def test_shared_registry_serves_memory_mapped_export(tmp_path):
+    path = str(tmp_path / "model.pkl")
+    shutil.copy(ranker.resolve_path(ranker.model_path), path)
+    shared_dir = str(tmp_path / "compiled")
+    registry = ModelRegistry(path, "lightgbm_compiled", ranker.expected_columns, compiled_engine="numpy", shared_dir=shared_dir)
+    loaded = registry.get()
+    assert loaded.model is None
+    assert os.path.isdir(registry.stats()["shared_dir"])
+
+    # A second process finding the export maps it without unpickling
+    other = ModelRegistry(path, "lightgbm_compiled", ranker.expected_columns, compiled_engine="numpy", shared_dir=shared_dir)
+    X = np.random.default_rng(0).integers(0, 3, (20, len(ranker.expected_columns))).astype(float)
+    model, _ = joblib.load(path)
+    np.testing.assert_allclose(other.get().predict(X), model.predict(X), rtol=0, atol=1e-12)
@@ -0,0 +1,157 @@
+# test/test_pipeline.py
+import sys
+import os
+import subprocess
+import threading
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add the root project directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from pipeline import stages
+from pipeline.dag import Pipeline, PipelineError, Stage
+
+def source():
+    return pd.DataFrame({"x": [1, 2, 3]})
+
+def double(df):
+    return df.assign(x=df["x"] * 2)
+
+def total(df):
+    return int(df["x"].sum())
+
+def toy_pipeline(cache_dir, calls, double_fn=double):
+    def counted(name, fn):
+        def run(*args):
+            calls.append(name)
+            return fn(*args)
+        return run
+    return Pipeline([
+        Stage("source", counted("source", source)),
+        Stage("double", counted("double", double_fn), inputs=["source"]),
+        Stage("total", counted("total", total), inputs=["double"]),
+    ], cache_dir=cache_dir, log=lambda message: None)
+
+def test_unchanged_stages_come_from_cache(tmp_path):
+    calls = []
+    assert toy_pipeline(str(tmp_path), calls).run() == {"total": 12}
+    assert calls == ["source", "double", "total"]
+
+    calls.clear()
+    pipeline = toy_pipeline(str(tmp_path), calls)
+    assert pipeline.run() == {"total": 12}
+    assert calls == []
+    assert {row["status"] for row in pipeline.report} == {"cached"}
+
+    pipeline.run(force=["double"])
+    assert calls == ["double"]  # same output hash, so total stays cached
+
+def test_changed_input_reruns_downstream(tmp_path):
+    calls = []
+    toy_pipeline(str(tmp_path), calls).run()
+    calls.clear()
+
+    def triple(df):
+        return df.assign(x=df["x"] * 3)
+    assert toy_pipeline(str(tmp_path), calls, double_fn=triple).run() == {"total": 18}
+    assert calls == ["double", "total"]
+
+def test_source_file_content_is_part_of_the_key(tmp_path):
+    path = tmp_path / "input.csv"
+    path.write_text("x\n1\n")
+    pipeline = Pipeline([Stage("load", pd.read_csv, params={"filepath_or_buffer": str(path)}, files=[str(path)])],
+                        cache_dir=str(tmp_path / "cache"), log=lambda message: None)
+    assert pipeline.run()["load"]["x"].tolist() == [1]
+    path.write_text("x\n5\n")
+    assert pipeline.run()["load"]["x"].tolist() == [5]
+    assert pipeline.report[0]["status"] == "ran"
+
+def test_independent_stages_run_concurrently():
+    barrier = threading.Barrier(2, timeout=5)
+
+    def branch(df):
+        barrier.wait()  # raises BrokenBarrierError unless both branches are running at once
+        return len(df)
+
+    pipeline = Pipeline([
+        Stage("source", source),
+        Stage("left", branch, inputs=["source"]),
+        Stage("right", branch, inputs=["source"]),
+    ], max_workers=2, log=lambda message: None)
+    assert pipeline.run() == {"left": 3, "right": 3}
+
+def test_invalid_graphs_and_failures():
+    with pytest.raises(ValueError, match="unknown stage"):
+        Pipeline([Stage("a", source, inputs=["missing"])])
+    with pytest.raises(ValueError, match="Cycle"):
+        Pipeline([Stage("a", double, inputs=["b"]), Stage("b", double, inputs=["a"])])
+
+    def broken(df):
+        raise KeyError("karma")
+    pipeline = Pipeline([Stage("source", source), Stage("broken", broken, inputs=["source"])], log=lambda message: None)
+    with pytest.raises(PipelineError) as info:
+        pipeline.run()
+    assert info.value.stage == "broken"
+
+def test_stage_functions_do_not_modify_inputs():
+    df = pd.DataFrame({
+        "is_buddy_post": [True, False, True, False],
+        "user_follows_tag": [True, True, False, False],
+        "karma": [80, 50, 10, 0],
+        "karma_bucket": ["high", "medium", "low", "low"],
+        "time_match_score": [1.0, 0.5, 0.0, 0.2],
+        "relevance_score": [0.9, 0.4, None, 0.1],
+        "Post Type": ["Video", "Image", None, "Text"],
+        "Post Timestamp": ["2024-01-01 10:00:00", "2024-01-01 00:30:00", "2024-01-02 12:00:00", "2024-01-03 23:59:00"],
+    })
+    before = df.copy()
+    extra = stages.extra_features(df, current_time=pd.Timestamp("2024-01-04", tz="UTC"))
+    interlinked = stages.interlinked_features(stages.assemble_dataset(df, extra))
+    labels = stages.target_label_features(df)
+    pd.testing.assert_frame_equal(df, before)
+
+    assert extra["post_hour"].tolist() == [10, 0, 12, 23]
+    assert interlinked["either_buddy_or_followed"].tolist() == [True, True, True, False]
+    assert not set(interlinked.columns) & set(df.columns)
+    assert labels["relevance_score"].tolist()[2] == 0.5
+
+    dataset = stages.assemble_dataset(df, extra, interlinked, labels)
+    assert list(dataset.columns[:len(df.columns)]) == list(df.columns)
+    assert dataset.columns[-1] == "target_label"
+    assert np.isclose(dataset["target_label"][0], stages.compute_target_label(dataset.iloc[0]))
+
+def test_time_match_accepts_parsed_times():
+    users = pd.DataFrame({"user_id": ["u1"], "active_hours": ['["08:00-11:00", "22:00-02:00"]']})
+    posts = pd.DataFrame({"user_id": ["u1", "u1", "u1"], "Time": ["09:15:00", "01:00:00", pd.Timestamp("2024-01-01 14:00").time()]})
+    scored = stages.add_time_match_score(posts, users)
+    assert scored["time_match_score"].tolist() == [1.0, 1.0, 0.7]
+    assert "active_hours" not in scored.columns
+
+ASSIGN_SCRIPT = """
+import json, sys
+import pandas as pd
+sys.path.insert(0, sys.argv[1])
+from pipeline import stages
+users = pd.DataFrame({
+    "user_id": [f"user_{i}" for i in range(20)],
+    "buddies": [json.dumps([f"user_{(i + 1) % 20}"]) for i in range(20)],
+})
+posts = pd.DataFrame({"Post ID": range(400)})
+assigned = stages.assign_users(posts, users, total_posts_needed=400, seed=7)
+print(json.dumps(assigned[["user_id", "author_id"]].values.tolist()))
+"""
+
+def test_seeded_assignment_is_the_same_across_processes():
+    # String hashing is randomized per process, so any set iteration order
+    # that reaches the rng would make the cached stage non-deterministic
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    outputs = [
+        subprocess.run(
+            [sys.executable, "-c", ASSIGN_SCRIPT, root], capture_output=True, text=True, check=True,
+            env=dict(os.environ, PYTHONHASHSEED=hash_seed),
+        ).stdout
+        for hash_seed in ("1", "2", "3")
+    ]
+    assert outputs[0] and outputs[0] == outputs[1] == outputs[2]
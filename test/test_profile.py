@@ -0,0 +1,54 @@
+# test/test_profile.py
+import sys
+import os
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.cache import TTLCache
+from app.extract_features import extract_features, compute_time_match_score
+from app.profile import CompiledProfile, get_compiled_profile
+
+user_profile = {
+    "branches_of_interest": ["AI"],
+    "tags_followed": ["python", "ml"],
+    "buddies": ["u1"],
+    "active_hours": ["07:00-09:00", "22:30-01:15", "oops"]
+}
+
+def test_lookup_table_matches_scalar_score():
+    compiled = CompiledProfile(user_profile)
+    for minute in range(1440):
+        expected = compute_time_match_score(minute // 60, minute % 60, user_profile["active_hours"])
+        assert compiled.time_match_score(minute // 60, minute % 60) == expected
+
+def test_extract_features_accepts_compiled_profile():
+    post = {"post_id": "p1", "author_id": "u1", "tags": ["ml"], "content_type": "text",
+            "karma": 40, "created_at": "2025-05-27T10:10:00Z"}
+    assert extract_features(post, CompiledProfile(user_profile)) == extract_features(post, user_profile)
+
+def test_compiled_profile_cache_hits_and_misses():
+    cache = TTLCache(max_size=10)
+    first = get_compiled_profile("user1", user_profile, cache)
+    second = get_compiled_profile("user1", dict(user_profile), cache)
+    assert first is second
+    changed = dict(user_profile, buddies=["u2"])
+    assert get_compiled_profile("user1", changed, cache) is not first
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+
+def test_cache_lru_eviction_and_ttl():
+    cache = TTLCache(max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+
+    expiring = TTLCache(max_size=2, ttl_seconds=0.01)
+    expiring.set("a", 1)
+    time.sleep(0.02)
+    assert expiring.get("a") is None
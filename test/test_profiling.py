@@ -0,0 +1,94 @@
+# test/test_profiling.py
+import sys
+import os
+import pstats
+import threading
+
+# Add the root project directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from fastapi.testclient import TestClient
+from main import app
+from app import ranker
+from app.profiling import RequestProfiler
+
+client = TestClient(app)
+
+payload = {
+    "user_id": "profiled_user",
+    "user_profile": {
+        "branches_of_interest": [], "tags_followed": ["ml"], "buddies": ["u1"], "active_hours": ["07:00-09:00"]
+    },
+    "posts": [
+        {
+            "post_id": f"p{i}", "author_id": f"u{i % 5}", "tags": ["ml"], "content_type": "text",
+            "karma": i % 100, "created_at": "2025-05-27T07:30:00Z"
+        }
+        for i in range(200)
+    ]
+}
+
+def test_admin_endpoints_disabled_by_default():
+    assert client.get("/admin/profile").status_code == 404
+
+def test_profiles_next_n_requests(monkeypatch, tmp_path):
+    monkeypatch.setattr(ranker, "profiler", RequestProfiler(str(tmp_path), admin_enabled=True))
+    assert client.post("/admin/profile", json={"requests": 2}).json()["active"] is True
+
+    for _ in range(3):
+        assert client.post("/rank-feed", json=payload).status_code == 200
+
+    status = client.get("/admin/profile").json()
+    assert status["active"] is False
+    assert len(status["captures"]) == 2
+
+    name = status["captures"][0]["file"]
+    stats = pstats.Stats(str(tmp_path / name))
+    functions = {function for _, _, function in stats.stats}
+    assert {"rank_posts", "build_features", "predict"} <= functions
+    assert client.get(f"/admin/profile/{name}").status_code == 200
+    assert client.get("/admin/profile/unknown.pstats").status_code == 404
+
+def test_slow_threshold_and_sampling(monkeypatch, tmp_path):
+    monkeypatch.setattr(ranker, "profiler", RequestProfiler(str(tmp_path), admin_enabled=True, sample_interval_ms=0.1))
+    client.post("/admin/profile", json={"slow_ms": 60000, "mode": "sample"})
+    client.post("/rank-feed", json=payload)
+    assert client.get("/admin/profile").json()["captures"] == []
+
+    client.post("/admin/profile", json={"slow_ms": 0.001, "mode": "sample"})
+    client.post("/rank-feed", json=payload)
+    captures = client.delete("/admin/profile").json()["captures"]
+    assert len(captures) == 1 and captures[0]["file"].endswith(".folded")
+    for line in (tmp_path / captures[0]["file"]).read_text().splitlines():
+        stack, count = line.rsplit(" ", 1)
+        assert int(count) > 0
+
+def test_profile_header(monkeypatch, tmp_path):
+    monkeypatch.setattr(ranker, "profiler", RequestProfiler(str(tmp_path), allow_header=True))
+    client.post("/rank-feed", json=payload)
+    client.post("/rank-feed", json=payload, headers={"X-Profile": "cprofile"})
+    assert [path.suffix for path in tmp_path.iterdir()] == [".pstats"]
+
+def test_overlapping_cprofile_captures_run_unprofiled(tmp_path):
+    profiler = RequestProfiler(str(tmp_path), admin_enabled=True)
+    profiler.arm(slow_ms=0.0)
+    started, release = threading.Event(), threading.Event()
+
+    def slow_request():
+        started.set()
+        release.wait(5)
+        return "first"
+
+    results = []
+    first = threading.Thread(target=lambda: results.append(profiler.run(profiler.begin(), "a", slow_request)))
+    first.start()
+    assert started.wait(5)
+    # A second capture while the first is still profiling must not raise
+    assert profiler.run(profiler.begin(), "b", lambda: "second") == "second"
+    release.set()
+    first.join()
+
+    assert results == ["first"]
+    status = profiler.stats()
+    assert status["skipped"] == 1
+    assert [capture["label"] for capture in status["captures"]] == ["a"]
@@ -41,3 +41,51 @@ def test_fallback_trigger():
     posts = [sample_post("p3", 2, "u9", ["unknown"])]
     result = rank_posts("user1", posts, user_profile)
     assert len(result["ranked_posts"]) == 1  # should not crash
+
+def test_booster_scores_match_sklearn_predict():
+    import numpy as np
+    import pandas as pd
+    from app import ranker
+    from app.batch_features import extract_feature_matrix
+    posts = [sample_post(f"p{i}", i * 7 % 101, ["u1", "u9"][i % 2], [["ml"], ["random"]][i % 3 % 2]) for i in range(50)]
+    X = extract_feature_matrix(posts, user_profile, ranker.expected_columns)
+    expected = ranker.model.predict(pd.DataFrame(X, columns=ranker.expected_columns))
+    result = rank_posts("user1", posts, user_profile)
+    scores = {p["post_id"]: p["score"] for p in result["ranked_posts"]}
+    for post, score in zip(posts, expected):
+        if post["post_id"] in scores:
+            assert scores[post["post_id"]] == float(score)
+
+def test_validate_model_columns_rejects_reordered_columns():
+    from app import ranker
+    reordered = list(reversed(ranker.expected_columns))
+    with pytest.raises(ValueError):
+        ranker.validate_model_columns(ranker.booster, reordered, ranker.expected_columns)
+
+def test_top_k_and_offset_slice_full_ranking():
+    posts = [sample_post(f"p{i}", i * 13 % 101, ["u1", "u9"][i % 2], [["ml"], ["random"]][i % 3 % 2]) for i in range(40)]
+    full = rank_posts("user1", posts, user_profile)
+    page = rank_posts("user1", posts, user_profile, top_k=5, offset=3)
+    assert page["status"] == full["status"]
+    assert page["ranked_posts"] == full["ranked_posts"][3:8]
+
+def test_bulk_ranking_matches_per_user_ranking():
+    from app.ranker import rank_posts_bulk
+    pool = [sample_post(f"p{i}", i * 11 % 101, ["u1", "u2", "u9"][i % 3], [["ml"], ["python"], ["random"]][i % 3]) for i in range(30)]
+    other_profile = dict(user_profile, tags_followed=["random"], buddies=["u2"])
+    requests = [
+        {"user_id": "a", "user_profile": user_profile},
+        {"user_id": "b", "user_profile": other_profile},
+        {"user_id": "c", "user_profile": user_profile, "posts": pool[:5]},
+        {"user_id": "d", "user_profile": user_profile, "posts": []},
+    ]
+    results = rank_posts_bulk(requests, shared_posts=pool, top_k=10)
+    assert results[0] == rank_posts("a", pool, user_profile, top_k=10)
+    assert results[1] == rank_posts("b", pool, other_profile, top_k=10)
+    assert results[2] == rank_posts("c", pool[:5], user_profile, top_k=10)
+    assert results[3]["status"] == "empty"
+
+def test_bulk_ranking_requires_posts():
+    from app.ranker import rank_posts_bulk
+    with pytest.raises(ValueError):
+        rank_posts_bulk([{"user_id": "a", "user_profile": user_profile}])
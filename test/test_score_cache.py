@@ -0,0 +1,93 @@
+# test/test_score_cache.py
+import sys
+import os
+
+# Add the root project directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app import ranker
+from app.score_cache import ScoreCache
+
+
+user_profile = {
+    "branches_of_interest": ["AI"],
+    "tags_followed": ["python", "ml"],
+    "buddies": ["u1"],
+    "active_hours": ["07:00-09:00", "20:00-23:00"]
+}
+
+def sample_posts(n, start=0):
+    return [
+        {
+            "post_id": f"p{i}",
+            "author_id": "u1" if i % 3 == 0 else f"u{i}",
+            "tags": ["ml"] if i % 2 == 0 else ["random"],
+            "content_type": "text",
+            "karma": (i * 17) % 100,
+            "created_at": f"2025-05-27T{i % 24:02d}:30:00Z"
+        }
+        for i in range(start, start + n)
+    ]
+
+def test_result_cache_ignores_candidate_order():
+    cache = ScoreCache()
+    posts = sample_posts(5)
+    keys, request_key, scores, missing = cache.lookup("u", "scope", posts)
+    assert missing == [0, 1, 2, 3, 4]
+    scores[:] = [0.1, 0.2, 0.3, 0.4, 0.5]
+    cache.store(keys, request_key, "scope", scores, missing)
+
+    _, _, cached, missing = cache.lookup("u", "scope", posts[::-1])
+    assert missing == []
+    assert cached.tolist() == [0.5, 0.4, 0.3, 0.2, 0.1]
+    assert cache.stats()["results"]["hits"] == 1
+
+def test_karma_change_invalidates_post_score():
+    cache = ScoreCache()
+    posts = sample_posts(2)
+    keys, request_key, scores, missing = cache.lookup("u", "scope", posts)
+    scores[:] = [0.1, 0.2]
+    cache.store(keys, request_key, "scope", scores, missing)
+
+    posts[1] = dict(posts[1], karma=posts[1]["karma"] + 1)
+    _, _, _, missing = cache.lookup("u", "scope", posts)
+    assert missing == [1]
+
+def test_edited_post_fields_invalidate_post_score():
+    cache = ScoreCache()
+    posts = sample_posts(4)
+    keys, request_key, scores, missing = cache.lookup("u", "scope", posts)
+    scores[:] = [0.1, 0.2, 0.3, 0.4]
+    cache.store(keys, request_key, "scope", scores, missing)
+
+    edited = [
+        posts[0],
+        dict(posts[1], author_id="u_new"),
+        dict(posts[2], tags=["python"]),
+        dict(posts[3], content_type="video"),
+    ]
+    _, _, _, missing = cache.lookup("u", "scope", edited)
+    assert missing == [1, 2, 3]
+
+def test_cached_ranking_matches_uncached(monkeypatch):
+    posts = sample_posts(40)
+    expected = ranker.rank_posts("user1", posts, user_profile, top_k=10)
+
+    monkeypatch.setattr(ranker, "score_cache", ScoreCache())
+    assert ranker.rank_posts("user1", posts, user_profile, top_k=10) == expected
+    assert ranker.rank_posts("user1", posts, user_profile, top_k=10) == expected
+    assert ranker.score_cache.stats()["results"]["hits"] == 1
+
+def test_overlapping_request_only_scores_new_posts(monkeypatch):
+    monkeypatch.setattr(ranker, "score_cache", ScoreCache())
+    ranker.rank_posts("user1", sample_posts(30), user_profile)
+
+    scored_rows = []
+    predict = ranker.predict
+    monkeypatch.setattr(ranker, "predict", lambda X: scored_rows.append(len(X)) or predict(X))
+    posts = sample_posts(35, start=5)
+    result = ranker.rank_posts("user1", posts, user_profile)
+
+    assert scored_rows == [10]
+    monkeypatch.setattr(ranker, "score_cache", None)
+    assert result == ranker.rank_posts("user1", posts, user_profile)
@@ -0,0 +1,22 @@
+# test/test_selection.py
+import sys
+import os
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.selection import top_k_indices, round_scores
+
+def test_top_k_matches_stable_sorted_with_ties():
+    rng = np.random.default_rng(1)
+    values = rng.integers(0, 20, 500).astype(float)
+    expected = sorted(range(len(values)), key=lambda i: values[i], reverse=True)
+    for top_k, offset in [(None, 0), (10, 0), (10, 25), (1, 0), (600, 0), (5, 498), (5, 500)]:
+        stop = len(values) if top_k is None else offset + top_k
+        assert list(top_k_indices(values, top_k, offset)) == expected[offset:stop]
+
+def test_round_scores_matches_builtin_round():
+    rng = np.random.default_rng(2)
+    values = np.concatenate([rng.random(10000), np.arange(0, 1, 0.00005), [0.00005, 0.12345, 0.99995]])
+    expected = [round(float(v), 4) for v in values]
+    assert round_scores(values).tolist() == expected
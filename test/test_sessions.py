@@ -0,0 +1,113 @@
+# test/test_sessions.py
+import sys
+import os
+import random
+import pytest
+
+# Add the root project directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from fastapi.testclient import TestClient
+from main import app
+from app import cache, ranker
+from app.sessions import SessionLost, SessionStore
+
+client = TestClient(app)
+
+user_profile = {
+    "branches_of_interest": ["AI"],
+    "tags_followed": ["python", "ml"],
+    "buddies": ["u1"],
+    "active_hours": ["07:00-09:00", "20:00-23:00"]
+}
+
+def make_post(i, karma=None):
+    return {
+        "post_id": f"p{i}",
+        "author_id": "u1" if i % 3 == 0 else f"u{i}",
+        "tags": ["ml"] if i % 2 == 0 else ["random"],
+        "content_type": "text",
+        "karma": (i * 17) % 100 if karma is None else karma,
+        "created_at": f"2025-05-27T{i % 24:02d}:30:00Z"
+    }
+
+def strip(result):
+    return {key: result[key] for key in ("user_id", "ranked_posts", "status")}
+
+def test_incremental_updates_match_full_ranking():
+    ranker.session_store.drop("inc_user")
+    rng = random.Random(7)
+    current = {f"p{i}": make_post(i) for i in range(200)}
+    result = ranker.rank_session("inc_user", user_profile, posts=list(current.values()), top_k=20)
+    assert result["scored_posts"] == 200
+
+    next_id = 200
+    for _ in range(10):
+        added = [make_post(next_id + j) for j in range(5)]
+        next_id += 5
+        removed = rng.sample(sorted(current), 3)
+        for post_id in removed:
+            del current[post_id]
+        updated = [dict(post, karma=rng.randint(0, 100)) for post in rng.sample(list(current.values()), 2)]
+        for post in added + updated:
+            current[post["post_id"]] = post
+
+        result = ranker.rank_session("inc_user", user_profile, added=added + updated, removed=removed, top_k=20)
+        assert result["scored_posts"] <= 7
+        assert result["session_size"] == len(current)
+        expected = ranker.rank_posts("inc_user", list(current.values()), user_profile, top_k=20)
+        assert strip(result) == expected
+
+def test_resending_same_list_scores_nothing():
+    ranker.session_store.drop("same_user")
+    posts = [make_post(i) for i in range(30)]
+    ranker.rank_session("same_user", user_profile, posts=posts)
+    assert ranker.rank_session("same_user", user_profile, posts=posts)["scored_posts"] == 0
+
+def test_profile_change_rescores_session():
+    ranker.session_store.drop("profile_user")
+    posts = [make_post(i) for i in range(30)]
+    ranker.rank_session("profile_user", user_profile, posts=posts)
+    new_profile = dict(user_profile, tags_followed=["random"])
+    result = ranker.rank_session("profile_user", new_profile)
+    assert result["scored_posts"] == 30
+    assert strip(result) == ranker.rank_posts("profile_user", posts, new_profile)
+
+def test_session_endpoint():
+    client.delete("/rank-feed/session/api_user")
+    response = client.post("/rank-feed/session", json={
+        "user_id": "api_user", "user_profile": user_profile, "posts": [make_post(i) for i in range(10)], "top_k": 3
+    })
+    assert response.status_code == 200
+    assert response.json()["scored_posts"] == 10
+
+    response = client.post("/rank-feed/session", json={
+        "user_id": "api_user", "user_profile": user_profile, "added": [make_post(10)], "removed": ["p0"], "top_k": 3
+    })
+    data = response.json()
+    assert data["scored_posts"] == 1
+    assert data["session_size"] == 10
+    assert len(data["ranked_posts"]) == 3
+
+    assert client.delete("/rank-feed/session/api_user").status_code == 200
+    assert client.delete("/rank-feed/session/api_user").status_code == 404
+
+def test_session_ttl_restarts_on_use(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(ranker, "session_store", SessionStore(ttl_seconds=60))
+    ranker.rank_session("ttl_user", user_profile, posts=[make_post(i) for i in range(5)])
+
+    # Used every 40 s: still alive well past the original 60 s
+    for i in range(5, 8):
+        now[0] += 40
+        result = ranker.rank_session("ttl_user", user_profile, added=[make_post(i)])
+        assert result["session_size"] == i + 1
+
+    now[0] += 61
+    with pytest.raises(SessionLost):
+        ranker.rank_session("ttl_user", user_profile, added=[make_post(8)])
+    response = client.post("/rank-feed/session", json={
+        "user_id": "ttl_user", "user_profile": user_profile, "added": [make_post(8)]
+    })
+    assert response.status_code == 409
@@ -0,0 +1,92 @@
+# test/test_streaming.py
+import sys
+import os
+import json
+import numpy as np
+
+# Add the root project directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from fastapi.testclient import TestClient
+from main import app
+from app import ranker
+from app.selection import RunningTopK, top_k_indices
+from app.streaming import StreamingRanker
+
+client = TestClient(app)
+
+user_profile = {
+    "branches_of_interest": ["AI"],
+    "tags_followed": ["python", "ml"],
+    "buddies": ["u1"],
+    "active_hours": ["07:00-09:00", "20:00-23:00"]
+}
+
+def make_post(i):
+    return {
+        "post_id": f"p{i}",
+        "author_id": "u1" if i % 3 == 0 else f"u{i}",
+        "tags": ["ml"] if i % 2 == 0 else ["random"],
+        "content_type": "text",
+        "karma": (i * 17) % 100,
+        "created_at": f"2025-05-27T{i % 24:02d}:30:00Z"
+    }
+
+def test_running_top_k_matches_full_selection():
+    rng = np.random.default_rng(3)
+    values = rng.integers(0, 20, size=1000).astype(np.float64)
+    topk = RunningTopK(37)
+    for start in range(0, len(values), 64):
+        topk.push(values[start:start + 64], list(range(start, min(start + 64, len(values)))))
+    kept_values, items = topk.result()
+    expected = top_k_indices(values, top_k=37)
+    assert items.tolist() == expected.tolist()
+    assert kept_values.tolist() == values[expected].tolist()
+
+def stream_rank(posts, user_id, profile, top_k, offset, chunk_size):
+    stream = StreamingRanker(
+        user_id,
+        score_fn=lambda chunk: ranker.score_posts(user_id, chunk, profile),
+        threshold=ranker.config.get("model_threshold", 0.5),
+        top_k=top_k,
+        offset=offset,
+        chunk_size=chunk_size,
+    )
+    for post in posts:
+        if stream.add(post):
+            stream.flush()
+    return stream.finish()
+
+def test_streaming_matches_rank_posts():
+    posts = [make_post(i) for i in range(500)]
+    no_match = {**user_profile, "tags_followed": [], "buddies": [], "active_hours": []}
+    for profile in (user_profile, no_match):
+        for top_k, offset, chunk_size in ((10, 0, 64), (25, 40, 100), (1000, 0, 7)):
+            result = stream_rank(posts, "s_user", profile, top_k, offset, chunk_size)
+            assert result.pop("total_posts") == 500
+            assert result == ranker.rank_posts("s_user", posts, profile, top_k=top_k, offset=offset)
+
+def ndjson(*objects):
+    return "".join(json.dumps(obj) + "\n" for obj in objects)
+
+def test_rank_feed_streaming_endpoint():
+    posts = [make_post(i) for i in range(300)]
+    body = ndjson({"user_id": "s_user", "user_profile": user_profile, "top_k": 5}, *posts)
+    response = client.post("/rank-feed", content=body, headers={"Content-Type": "application/x-ndjson"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    expected = ranker.rank_posts("s_user", posts, user_profile, top_k=5)
+    assert lines[0] == {"user_id": "s_user", "status": expected["status"], "total_posts": 300}
+    assert lines[1:] == expected["ranked_posts"]
+
+def test_rank_feed_streaming_reports_bad_line():
+    bad_post = {k: v for k, v in make_post(2).items() if k != "karma"}
+    body = ndjson({"user_id": "s_user", "user_profile": user_profile}, make_post(1), bad_post)
+    response = client.post("/rank-feed", content=body, headers={"Content-Type": "application/x-ndjson"})
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["body", 3, "karma"]
+
+    response = client.post("/rank-feed", content="", headers={"Content-Type": "application/x-ndjson"})
+    assert response.status_code == 422
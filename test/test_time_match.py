@@ -0,0 +1,72 @@
+# test/test_time_match.py
+import sys
+import os
+import json
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add the root project directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app import time_match
+from app.extract_features import compute_time_match_score, compute_time_match_scores, parse_active_ranges
+from pipeline import stages
+
+def minutes(hhmm):
+    hour, minute = map(int, hhmm.split(":"))
+    return hour * 60 + minute
+
+@pytest.mark.parametrize("post, ranges, expected", [
+    ("09:30", ["08:00-11:00"], 1.0),              # inside
+    ("11:00", ["08:00-11:00"], 1.0),              # edges are inclusive
+    ("14:00", ["08:00-11:00"], 0.7),              # 180 min away: 1 - 180/600
+    ("21:00", ["08:00-11:00"], 0.0),              # 600 min away: fully decayed
+    ("23:00", ["08:00-11:00"], 0.1),              # 540 min to 08:00 going past midnight
+    ("01:00", ["22:00-02:00"], 1.0),              # overnight range wraps past midnight
+    ("03:30", ["22:00-02:00"], 0.85),             # 90 min after the overnight end
+    ("23:50", ["00:10-01:00"], 0.97),             # circular distance across midnight: 20 min
+    ("12:00", ["10:00-10:00"], 0.8),              # zero-length range
+    ("12:00", [], 0.0),                           # no ranges
+    ("06:01", ["06:00-09:00", "20:00-23:00"], 1.0),
+    ("10:05", ["06:00-09:00", "10:10-11:00"], 0.99),  # nearest of several ranges
+])
+def test_kernel_pins_decay_and_wrap_around(post, ranges, expected):
+    intervals = parse_active_ranges(ranges)
+    assert compute_time_match_scores([minutes(post)], intervals).tolist() == [expected]
+    assert compute_time_match_score(*map(int, post.split(":")), ranges) == expected
+    assert stages.compute_time_match_score(post + ":00", ranges) == expected
+
+def test_ragged_pairs_match_per_profile_scores():
+    rng = np.random.default_rng(0)
+    slots = ["06:00-09:00", "08:00-11:00", "12:00-14:00", "17:00-19:00", "20:00-23:00", "22:00-02:00", "23:30-00:30"]
+    profiles = [list(rng.choice(slots, size=rng.integers(0, 4), replace=False)) for _ in range(50)]
+    interval_lists = [parse_active_ranges(ranges) for ranges in profiles]
+    starts, ends, valid = time_match.pack_intervals(interval_lists)
+
+    users = rng.integers(0, len(profiles), 20000)
+    post_minutes = rng.integers(0, 1440, 20000)
+    scores = time_match.time_match_scores(post_minutes, starts[users], ends[users], valid[users])
+    for user in range(len(profiles)):
+        expected = compute_time_match_scores(post_minutes[users == user], interval_lists[user])
+        assert np.array_equal(scores[users == user], expected)
+
+def test_dataset_scores_match_scalar_reference():
+    rng = np.random.default_rng(1)
+    ranges = [["08:00-11:00", "20:00-23:00"], ["22:00-02:00"], ["10:00-10:00", "23:30-00:30"], [], ["5:7-6:8"]]
+    users = pd.DataFrame({"user_id": [f"u{i}" for i in range(len(ranges))], "active_hours": [json.dumps(r) for r in ranges]})
+    posts = pd.DataFrame({
+        "user_id": rng.choice(users["user_id"], 5000),
+        "Time": [f"{h:02d}:{m:02d}:{s:02d}" for h, m, s in zip(rng.integers(0, 24, 5000), rng.integers(0, 60, 5000), rng.integers(0, 60, 5000))],
+    })
+    scored = stages.add_time_match_score(posts, users)
+    active_hours = dict(zip(users["user_id"], ranges))
+    expected = [stages.compute_time_match_score(t, active_hours[u]) for u, t in zip(posts["user_id"], posts["Time"])]
+    assert scored["time_match_score"].tolist() == expected
+
+def test_dataset_build_rejects_malformed_ranges():
+    users = pd.DataFrame({"user_id": ["u1"], "active_hours": [json.dumps(["8am-11am"])]})
+    posts = pd.DataFrame({"user_id": ["u1"], "Time": ["09:00:00"]})
+    with pytest.raises(ValueError):
+        stages.add_time_match_score(posts, users)
+    assert parse_active_ranges(["8am-11am", "08:00-11:00"]) == [(480, 660)]  # serving skips them
@@ -0,0 +1,61 @@
+# test/test_tree_scorer.py
+import pytest
+import sys
+import os
+import numpy as np
+import joblib
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.tree_scorer import CompiledTreeEnsemble, compile_booster
+
+MODEL_PATH = "models/lightGBM_model_with_columns.pkl"
+
+def random_features(n, seed=0):
+    rng = np.random.default_rng(seed)
+    X = np.column_stack([
+        rng.integers(0, 101, n),
+        rng.choice([0.0, 0.5, 0.83, 1.0], n),
+        rng.integers(0, 2, n),
+        rng.integers(0, 2, n),
+        rng.choice([0.0, 0.02, 0.04, 0.08], n),
+        rng.integers(0, 2, n),
+        rng.integers(0, 4, n),
+        rng.integers(0, 3, n),
+    ]).astype(np.float64)
+    X[::37, 1] = np.nan
+    return X
+
+@pytest.mark.parametrize("engine", ["numpy", "numba"])
+def test_compiled_scorer_matches_model_predict(engine):
+    if engine == "numba":
+        pytest.importorskip("numba")
+    model, _ = joblib.load(MODEL_PATH)
+    X = random_features(2000)
+    scorer = compile_booster(model.booster_, engine=engine)
+    np.testing.assert_allclose(scorer.predict(X), model.predict(X), rtol=0, atol=1e-12)
+    assert scorer.predict(X[:0]).shape == (0,)
+
+def test_compiled_scorer_rejects_categorical_splits():
+    dump = {
+        "num_tree_per_iteration": 1,
+        "feature_names": ["a"],
+        "objective": "regression",
+        "tree_info": [{"tree_structure": {
+            "split_index": 0, "split_feature": 0, "threshold": "1||2", "decision_type": "==",
+            "left_child": {"leaf_value": 1.0}, "right_child": {"leaf_value": 0.0},
+        }}],
+    }
+    with pytest.raises(ValueError):
+        CompiledTreeEnsemble(dump)
+
+def test_exported_arrays_load_memory_mapped(tmp_path):
+    model, _ = joblib.load(MODEL_PATH)
+    scorer = compile_booster(model.booster_, engine="numpy")
+    directory = str(tmp_path / "export")
+    scorer.export(directory, metadata={"source": "test"})
+    mapped = CompiledTreeEnsemble.load(directory, engine="numpy", mmap=True)
+    assert not mapped.threshold.flags.writeable
+    assert mapped.metadata["source"] == "test"
+    X = random_features(500, seed=3)
+    np.testing.assert_array_equal(mapped.predict(X), scorer.predict(X))
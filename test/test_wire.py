@@ -0,0 +1,84 @@
+# test/test_wire.py
+import pytest
+import sys
+import os
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+msgpack = pytest.importorskip("msgpack")
+
+from fastapi.testclient import TestClient
+from app import wire
+from app.batch_features import PostTable, cross_features
+from main import app
+
+client = TestClient(app)
+
+COLUMNS = [
+    "karma", "time_match_score", "user_follows_tag", "is_buddy_post",
+    "Post Type", "Weekday Type", "Time Periods", "karma_bucket"
+]
+
+user_profile = {
+    "branches_of_interest": ["AI"],
+    "tags_followed": ["ml", "python"],
+    "buddies": ["u1"],
+    "active_hours": ["07:00-09:00", "22:00-01:00"]
+}
+
+posts = [{
+    "post_id": f"p{i}",
+    "author_id": ["u1", "u2", "u3"][i % 3],
+    "tags": [["ml"], ["python", "ai"], [], ["food", "ml"]][i % 4],
+    "content_type": ["text", "image", "video", "poll"][i % 4],
+    "karma": i * 7 % 101,
+    "created_at": f"2025-05-{20 + i % 10:02d}T{i % 24:02d}:{i * 13 % 60:02d}:00Z"
+} for i in range(40)]
+
+def test_columnar_table_matches_dict_table():
+    columns = wire.posts_to_columns(posts)
+    table = wire.table_from_columns(columns)
+    expected = cross_features(PostTable(posts), [user_profile], COLUMNS)
+    np.testing.assert_array_equal(cross_features(table, [user_profile], COLUMNS), expected)
+    assert table.post_ids == [p["post_id"] for p in posts]
+
+def test_msgpack_request_matches_json_request():
+    payload = {"user_id": "u", "user_profile": user_profile, "posts": posts, "top_k": 10}
+    expected = client.post("/rank-feed", json=payload).json()
+    response = client.post(
+        "/rank-feed",
+        content=wire.encode_rank_request("u", user_profile, posts, top_k=10),
+        headers={"content-type": "application/msgpack"},
+    )
+    assert response.status_code == 200
+    assert response.json() == expected
+
+def test_msgpack_request_rejects_inconsistent_columns():
+    columns = wire.posts_to_columns(posts)
+    columns["tag_codes"][0] = 999
+    body = msgpack.packb({"user_id": "u", "user_profile": user_profile, "posts": columns})
+    response = client.post("/rank-feed", content=body, headers={"content-type": "application/msgpack"})
+    assert response.status_code == 422
+
+    del columns["karma"]
+    body = msgpack.packb({"user_id": "u", "user_profile": user_profile, "posts": columns})
+    response = client.post("/rank-feed", content=body, headers={"content-type": "application/msgpack"})
+    assert response.status_code == 422
+    assert client.post("/rank-feed", content=b"\xc1", headers={"content-type": "application/msgpack"}).status_code == 422
+
+def test_msgpack_request_errors_are_422_with_messages():
+    headers = {"content-type": "application/msgpack"}
+    for body in (b"\xc1", b"\x92\x01", b"\xa2\xff\xfe"):
+        response = client.post("/rank-feed", content=body, headers=headers)
+        assert response.status_code == 422
+        [error] = response.json()["detail"]
+        assert error["loc"] == ["body"] and error["msg"].startswith("Invalid MessagePack body: ")
+
+    columns = wire.posts_to_columns(posts)
+    columns["created_at"][0] = 2 ** 63
+    body = msgpack.packb({"user_id": "u", "user_profile": user_profile, "posts": columns})
+    response = client.post("/rank-feed", content=body, headers=headers)
+    assert response.status_code == 422
+    [error] = response.json()["detail"]
+    assert error["loc"] == ["body", "posts"] and "posts.created_at" in error["msg"]
@@ -1,11 +1,14 @@
 import os
 import joblib
 import json
-import pandas as pd
 import shap
 import matplotlib.pyplot as plt
 import seaborn as sns
 import argparse
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from pipeline.dataset import read_dataset
 
 sns.set(style="whitegrid")
 
@@ -88,7 +91,7 @@ def main(config):
     model, _ = joblib.load(model_path)
 
     print("📂 Reading dataset...")
-    df = pd.read_csv(data_path)
+    df = read_dataset(data_path, columns=feature_names + [target_col])
 
     print("🧼 Preprocessing features...")
     X_test = preprocess_dataframe(df, feature_names)
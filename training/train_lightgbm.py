@@ -5,20 +5,26 @@ from sklearn.model_selection import train_test_split, cross_val_score, GridSearc
 from sklearn.metrics import mean_squared_error, r2_score, mean_absolute_error
 import joblib
 import json
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from pipeline.dataset import read_dataset
 
 # Load config
 with open("config/config.json") as f:
     config = json.load(f)
 
-CSV_PATH = config.get("data_path", "data/processed/scored_posts_with_users.csv")
+DATA_PATH = config.get("data_path", "data/processed/scored_posts_with_users.parquet")
 FEATURE_COLUMNS = config["feature_columns"]["lightgbm"]
 TARGET_COLUMN = config.get("target_column", "target_label")
 PARAM_GRID = config["hyperparameters"]["lightgbm"]
 MODEL_PATH = config["model_path"]["lightgbm"]
 
 # Load and preprocess training data
-def load_training_data(csv_path):
-    df = pd.read_csv(csv_path)
+def load_training_data(data_path):
+    # Only the model features and the target are read (.parquet or .csv)
+    df = read_dataset(data_path, columns=FEATURE_COLUMNS + [TARGET_COLUMN])
 
     df["user_follows_tag"] = df["user_follows_tag"].astype(int)
     df["is_buddy_post"] = df["is_buddy_post"].astype(int)
@@ -46,7 +52,7 @@ def load_training_data(csv_path):
     return X, y, FEATURE_COLUMNS
 
 # Load data
-X, y, feature_cols = load_training_data(CSV_PATH)
+X, y, feature_cols = load_training_data(DATA_PATH)
 
 # Split data
 X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)